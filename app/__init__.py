@@ -1,71 +1,73 @@
 import os
-from flask import Flask, jsonify
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
 import logging
-from datetime import datetime
-from app import config
-from flask_cors import CORS
-from sqlalchemy.orm import scoped_session, sessionmaker, declarative_base
-from flask_mail import Message
 
-from .extensions import db, migrate, jwt, cors, mail
+from dotenv import load_dotenv
+from flask import Flask
+
+from app import config
 
 load_dotenv()
 
-def str_to_bool(value):
-    return str(value).strip().lower() in ['true', '1', 't', 'yes', 'y']
+logger = logging.getLogger(__name__)
+
+def create_app(config_name=None):
+    """Fabrique de l'application ; ``config_name`` : development, testing ou production (défaut : APP_ENV).
+
+    Extensions, blueprints, commandes et routes de santé sont importés par
+    leurs fonctions d'enregistrement : importer ``app`` reste léger.
+    """
+    from .utils.json_provider import init_json_provider
+    from .utils.db_pool import build_engine_options
+    from .utils.log_config import configure_logging
 
-def create_app():
     app = Flask(__name__)
-    
-    app.config.from_object(config)
-
-    # === CONFIGURATION FLASK ===
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default_secret_key')
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI', 'sqlite:///default.db')
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'default_jwt_secret')
-
-    CORS(app, origins=["*"])  # Enable CORS for all origins
-
-    # Configuration du logging
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-        handlers=[
-            logging.StreamHandler()
-        ]
-    )
-    logger = logging.getLogger(__name__)
-    logger.info("Initialisation de l'application Flask")
-
-    # === CONFIGURATION MAIL ===
-    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
-    
-    # Configuration email
-    app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER')
-    app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
-    app.config['MAIL_USE_TLS'] = str_to_bool(os.getenv('MAIL_USE_TLS', 'True'))
-    app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
-    app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
-    app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER')
-    
-    # Dossier uploads
-    base_dir = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
-    app.config['UPLOAD_FOLDER'] = os.path.join(base_dir, 'app', 'static', 'uploads')
-    app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB
-
-    # Logging
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
-        handlers=[logging.StreamHandler()]
-    )
-
-    # Initialisation des extensions
+    init_json_provider(app)
+
+    # === CONFIGURATION ===
+    # Valeurs lues dans l'environnement par les classes de app/config.py
+    config_class = config.get_config(config_name)
+    app.config.from_object(config_class)
+    if app.config['SECRET_KEY'] is None or app.config['JWT_SECRET_KEY'] is None:
+        raise RuntimeError("SECRET_KEY et JWT_SECRET_KEY doivent être définis en production")
+
+    # Valeurs dérivées
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config)
+    app.config['USE_X_SENDFILE'] = app.config['IMAGE_SERVE_MODE'] == 'x-sendfile'
+
+    # Configuration du logging : file + thread d'écriture, JSON avec identifiant de requête
+    configure_logging(app)
+    logger.info("Initialisation de l'application Flask (%s)", config_class.__name__)
+
+    register_extensions(app)
+    register_commands(app)
+
+    # Dossier d'uploads : créé au déploiement en production
+    if app.config['CREATE_UPLOAD_FOLDER'] and not os.path.exists(app.config['UPLOAD_FOLDER']):
+        os.makedirs(app.config['UPLOAD_FOLDER'])
+        app.logger.info("Dossier upload créé : %s", app.config['UPLOAD_FOLDER'])
+
+    register_blueprints(app)
+
+    # Routes de mise au point (absentes en production)
+    if app.config['ENABLE_TEST_ROUTES']:
+        register_test_routes(app)
+
+    register_health_routes(app)
+    return app
+
+
+def register_extensions(app):
+    from flask_cors import CORS
+
+    from .extensions import db, migrate, jwt, cors, mail, response_cache
+    from .utils.db_pool import init_pool_metrics
+    from .utils.db_routing import ReplicaRouter
+
+    CORS(app, origins=app.config['ALLOWED_ORIGINS'])
+
+    ReplicaRouter(app)  # déclare les réplicas dans SQLALCHEMY_BINDS avant la création des moteurs
     db.init_app(app)
+    init_pool_metrics(app, db)
     logger.debug("Extension SQLAlchemy initialisée")
     migrate.init_app(app, db)
     logger.debug("Extension Flask-Migrate initialisée")
@@ -74,21 +76,33 @@ def create_app():
     cors.init_app(app)
     logger.debug("Extension Flask-CORS initialisée")
     mail.init_app(app)
+    response_cache.init_app(app)
 
-    # Configuration de la session DB
-    engine = create_engine(app.config['SQLALCHEMY_DATABASE_URI'])
-    app.db_session = scoped_session(sessionmaker(
-        bind=engine,
-        autocommit=False,
-        autoflush=False
-    ))
+    from app.modules.auth.revocation import revocation_store
+    revocation_store.init_app(app)
+    from app.modules.event.search import event_search
+    event_search.init_app(app)
+    from app.modules.event.images import image_processor
+    image_processor.init_app(app)
+    from app.utils.instrumentation import instrumentation
+    instrumentation.init_app(app)
+    from app.utils.metrics import metrics
+    metrics.init_app(app)
+
+
+def register_commands(app):
+    from app.modules.outbox import outbox_cli
+    from app.modules.outbox.worker import init_outbox_worker
+    from app.modules.dashboard.commands import dashboard_cli
+    from app.modules.event.commands import events_cli
+
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(dashboard_cli)
+    app.cli.add_command(events_cli)
+    init_outbox_worker(app)
 
-    # Créer le dossier d'uploads
-    if not os.path.exists(app.config['UPLOAD_FOLDER']):
-        os.makedirs(app.config['UPLOAD_FOLDER'])
-        app.logger.info(f"Dossier upload créé : {app.config['UPLOAD_FOLDER']}")
 
-    # Enregistrement des blueprints
+def register_blueprints(app):
     from app.modules.user.routes import user_bp
     from app.modules.auth import auth_bp
     from app.modules.category.routes import category_bp
@@ -103,32 +117,18 @@ def create_app():
     app.register_blueprint(registration_bp, url_prefix='/api/registrations')
     app.register_blueprint(dashboard_bp)
 
-    # Route de test email - Version corrigée et simplifiée
-    @app.route('/test-email', methods=['GET'])
-    def test_email():
-        try:
-            test_email = os.getenv('TEST_EMAIL', 'test@example.com')
-            
-            # Création du message avec les paramètres positionnels corrects
-            msg = Message(
-                "Test Email Service - API Événements",  # Sujet
-                recipients=[test_email],  # Destinataires
-                body="Ceci est un test du service email de l'API Événements."  # Corps
-            )
-            
-            mail.send(msg)  # Envoi via l'extension mail
-            
-            app.logger.info(f"Email de test envoyé à {test_email}")
-            return jsonify({
-                "message": "Email de test envoyé avec succès",
-                "recipient": test_email
-            }), 200
-        except Exception as e:
-            app.logger.error(f"Erreur envoi email: {str(e)}")
-            return jsonify({
-                "error": str(e),
-                "message": "Échec de l'envoi de l'email de test"
-            }), 500
+
+def register_health_routes(app):
+    from datetime import datetime
+
+    from flask import jsonify
+    from sqlalchemy import text
+
+    from flask_jwt_extended import jwt_required
+
+    from .extensions import db
+    from .utils.db_pool import pool_stats
+    from .utils.role_required import role_required
 
     # Route de santé
     @app.route('/health')
@@ -136,7 +136,7 @@ def create_app():
         logger.debug("Appel de la route /health")
         try:
             # Vérification de la base de données
-            db.session.execute('SELECT 1')
+            db.session.execute(text('SELECT 1'))
             
             # Vérification de la configuration email
             email_configured = bool(
@@ -160,4 +160,60 @@ def create_app():
                 'database': 'error'
             }), 500
 
-    return app
\ No newline at end of file
+    # Vivacité : le processus répond, sans dépendance externe
+    @app.route('/health/live')
+    def liveness():
+        return jsonify({'status': 'alive'}), 200
+
+    # Disponibilité : la base primaire accepte une requête
+    @app.route('/health/ready')
+    def readiness():
+        try:
+            with db.engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception as e:
+            logger.warning("Base de données indisponible: %s", e)
+            return jsonify({'status': 'unavailable', 'database': 'error'}), 503
+        return jsonify({'status': 'ready', 'database': 'ok'}), 200
+
+    # Statistiques du pool de connexions du processus (dimensionnement par worker),
+    # réservées aux administrateurs : /metrics expose les mêmes compteurs agrégés
+    @app.route('/health/db-pool')
+    @jwt_required()
+    @role_required(['admin', 'super_admin'])
+    def db_pool_stats():
+        return jsonify({'pid': os.getpid(), 'pools': pool_stats(app)}), 200
+
+
+def register_test_routes(app):
+    """Routes de mise au point, enregistrées seulement si ENABLE_TEST_ROUTES."""
+    from flask import jsonify
+    from flask_mail import Message
+
+    from .extensions import mail
+
+    @app.route('/test-email', methods=['GET'])
+    def test_email():
+        try:
+            test_email = os.getenv('TEST_EMAIL', 'test@example.com')
+        
+            # Création du message avec les paramètres positionnels corrects
+            msg = Message(
+                "Test Email Service - API Événements",  # Sujet
+                recipients=[test_email],  # Destinataires
+                body="Ceci est un test du service email de l'API Événements."  # Corps
+            )
+        
+            mail.send(msg)  # Envoi via l'extension mail
+        
+            app.logger.info("Email de test envoyé à %s", test_email)
+            return jsonify({
+                "message": "Email de test envoyé avec succès",
+                "recipient": test_email
+            }), 200
+        except Exception as e:
+            app.logger.error("Erreur envoi email: %s", e)
+            return jsonify({
+                "error": str(e),
+                "message": "Échec de l'envoi de l'email de test"
+            }), 500
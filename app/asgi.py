@@ -0,0 +1,122 @@
+"""Mode ASGI : uvicorn asgi:app
+
+Les chemins dominés par les attentes base de données (listing public des
+événements, inscription) sont servis par des vues asynchrones sur le moteur
+SQLAlchemy asyncio ; toutes les autres routes sont déléguées à l'application
+Flask (WSGIMiddleware, exécutée dans un pool de threads). Un worker uvicorn
+garde ainsi des milliers de connexions ouvertes sans un thread par requête.
+
+Les modèles, la validation et les services (register_user, enqueue_email,
+sérialiseurs) sont ceux de l'application Flask.
+"""
+import logging
+from contextlib import asynccontextmanager
+
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import ExpiredSignatureError, InvalidTokenError
+
+from app import create_app
+from app.utils.async_db import init_async_db
+from app.utils.role_required import has_role
+
+try:
+    from starlette.applications import Starlette
+    from starlette.concurrency import run_in_threadpool
+    from starlette.responses import Response
+    from starlette.routing import Mount
+except ImportError:  # starlette est optionnel : seul le mode WSGI est disponible
+    Starlette = None
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:  # adaptateur de starlette (déprécié) à défaut de a2wsgi
+    try:
+        from starlette.middleware.wsgi import WSGIMiddleware
+    except ImportError:
+        WSGIMiddleware = None
+
+logger = logging.getLogger(__name__)
+
+
+class AuthError(Exception):
+    """Refus d'authentification ; ``payload`` reprend le format des réponses Flask-JWT-Extended."""
+
+    def __init__(self, payload, status=401):
+        super().__init__(payload)
+        self.payload = payload
+        self.status = status
+
+
+def json_response(request, payload, status=200):
+    """Réponse JSON encodée par le fournisseur de l'application Flask (orjson si présent)."""
+    body = request.app.state.flask_app.json.dumps(payload)
+    return Response(body, status_code=status, media_type='application/json')
+
+
+def image_url_prefix(request):
+    """Équivalent de serializers.image_url_prefix, sans contexte de requête Flask."""
+    adapter = request.app.state.flask_app.url_map.bind(
+        request.url.netloc, script_name=request.scope.get('root_path') or '/', url_scheme=request.url.scheme
+    )
+    return adapter.build('event.get_image', {'filename': '_'}, force_external=True)[:-1]
+
+
+def _is_revoked(flask_app, jti):
+    # Peut interroger la base ou Redis : exécuté dans un thread, avec son propre contexte
+    with flask_app.app_context():
+        return flask_app.extensions['revocation_store'].is_revoked(jti)
+
+
+async def authenticate(request, roles):
+    """Vérifie le jeton comme @jwt_required + @role_required ; retourne ``(user_id, claims)``.
+
+    À appeler dans le contexte de l'application Flask (clé et options JWT).
+    """
+    flask_app = request.app.state.flask_app
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        raise AuthError({"msg": "Missing Authorization Header"})
+    try:
+        claims = decode_token(header[len('Bearer '):])
+    except ExpiredSignatureError:
+        raise AuthError({"msg": "Token has expired"})
+    except (InvalidTokenError, JWTExtendedException) as e:
+        raise AuthError({"msg": str(e)}, 422)
+    if claims.get('type') != 'access':
+        raise AuthError({"msg": "Only non-refresh tokens are allowed"}, 422)
+    if await run_in_threadpool(_is_revoked, flask_app, claims['jti']):
+        raise AuthError({"msg": "Token has been revoked"})
+    if not has_role(claims.get('role'), roles):
+        raise AuthError({
+            "message": "Accès refusé : rôle insuffisant.",
+            "required_roles": roles,
+            "your_role": claims.get('role')
+        }, 403)
+    return int(claims[flask_app.config['JWT_IDENTITY_CLAIM']]), claims
+
+
+def create_asgi_app(config_name=None):
+    """Application Starlette : vues asynchrones + application Flask montée sur « / »."""
+    if Starlette is None or WSGIMiddleware is None:
+        raise RuntimeError("Mode ASGI indisponible : pip install -r requirements-asgi.txt")
+
+    flask_app = create_app(config_name)
+    engine, sessions = init_async_db(flask_app)
+
+    from app.modules.event.async_routes import routes as event_routes
+    from app.modules.registration.async_routes import routes as registration_routes
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+
+    app = Starlette(
+        routes=[*event_routes, *registration_routes, Mount('/', app=WSGIMiddleware(flask_app))],
+        lifespan=lifespan
+    )
+    app.state.flask_app = flask_app
+    app.state.sessions = sessions
+    logger.info("Application ASGI initialisée (%s)", engine.url.drivername)
+    return app
@@ -5,16 +5,41 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
-    # Configuration de base
+    # Configuration de base, commune aux environnements (voir les classes plus bas)
+    DEBUG = False
+    TESTING = False
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URI", "sqlite:///default.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv("SECRET_KEY", "default_secret_key")
 
+    # Pool de connexions, par processus : prévoir (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    # x nombre de workers gunicorn sous la limite max_connections du serveur.
+    # DB_STATEMENT_TIMEOUT_MS : délai maximal par requête (0 = désactivé)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))      # attente d'une connexion libre (s)
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))    # < wait_timeout côté MySQL
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() in ['true', '1']
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+
+    # Réplicas en lecture, URIs séparées par des virgules (vide = tout sur le primaire).
+    # Les GET y lisent en tourniquet ; après une écriture, le client reste sur le
+    # primaire pendant REPLICA_STICKY_SECONDS
+    DATABASE_REPLICA_URIS = os.getenv("DATABASE_REPLICA_URIS", "")
+    REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
     # JWT
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "59825f4e67e7ec00a57d9c3ae534b643")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=30)  
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=14)    
 
+    # Révocation des JWT : 'sql' (table revoked_tokens) ou 'redis'. Chaque processus
+    # garde un cache local resynchronisé au plus toutes les REVOCATION_SYNC_INTERVAL
+    # secondes (0 = interroger le backend à chaque requête)
+    REVOCATION_BACKEND = os.getenv("REVOCATION_BACKEND", "sql")
+    REVOCATION_REDIS_URL = os.getenv("REVOCATION_REDIS_URL", "redis://localhost:6379/1")
+    REVOCATION_SYNC_INTERVAL = int(os.getenv("REVOCATION_SYNC_INTERVAL", 5))
+
     # Email
     MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
     MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
@@ -23,9 +48,147 @@ class Config:
     MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
 
+    # File d'envoi des emails (table email_outbox). Le worker intégré est activé en
+    # développement ; en production gunicorn.conf.py lance `flask outbox worker`
+    # dans un processus dédié et asgi.py active le worker intégré.
+    OUTBOX_WORKER_ENABLED = os.getenv("OUTBOX_WORKER_ENABLED", "False").lower() in ['true', '1']
+    OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", 4))
+    OUTBOX_BATCH_SIZE = 50
+    OUTBOX_POLL_INTERVAL = 2
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))
+    OUTBOX_BACKOFF_BASE = 30    # secondes, doublé à chaque échec
+    OUTBOX_BACKOFF_MAX = 3600
+    OUTBOX_LEASE_SECONDS = 300  # au-delà, un envoi interrompu est repris
+    # Les emails envoyés (codes de réinitialisation dans le corps) sont supprimés
+    # après OUTBOX_RETENTION_HOURS, par le worker au plus toutes les OUTBOX_PURGE_INTERVAL s
+    OUTBOX_RETENTION_HOURS = int(os.getenv("OUTBOX_RETENTION_HOURS", 24))
+    OUTBOX_PURGE_INTERVAL = 3600
+
+    # Compteurs matérialisés des tableaux de bord (table stat_counters), maintenus
+    # à chaque écriture ; lus après `flask dashboard rebuild-counters`
+    DASHBOARD_COUNTERS_ENABLED = os.getenv("DASHBOARD_COUNTERS_ENABLED", "False").lower() in ['true', '1']
+
+    # Cache des réponses publiques : 'memory' (par processus), 'redis' ou 'null'.
+    # Avec 'memory', une invalidation n'atteint que le processus qui écrit :
+    # avertissement au démarrage si WEB_CONCURRENCY annonce plusieurs workers
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_DEFAULT_TIMEOUT = int(os.getenv("CACHE_DEFAULT_TIMEOUT", 60))
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+    WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+
+    # Recherche plein texte : 'auto' (FTS5 sous SQLite, FULLTEXT sous MySQL, sinon
+    # index en mémoire), 'fts5', 'fulltext' ou 'memory'. L'index en mémoire est
+    # reconstruit au plus toutes les SEARCH_REBUILD_INTERVAL secondes
+    SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+    SEARCH_REBUILD_INTERVAL = int(os.getenv("SEARCH_REBUILD_INTERVAL", 300))
+
+    # Export CSV : taille des lots lus côté serveur
+    EXPORT_YIELD_PER = 1000
+
+    # Variantes d'images générées après l'upload par un pool de IMAGE_WORKERS threads
+    # (Pillow requis, sinon seul l'original est servi)
+    IMAGE_VARIANTS_ENABLED = os.getenv("IMAGE_VARIANTS_ENABLED", "True").lower() in ['true', '1']
+    IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))
+    IMAGE_WEBP_QUALITY = 80
+    IMAGE_JPEG_QUALITY = 85
+    # Largeur x hauteur maximale acceptée à l'upload et au décodage (bombes de décompression)
+    IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", 40_000_000))
+
+    # Service des images. Les noms d'upload (uuid / SHA-256) sont immuables : un an
+    # de cache avec `immutable`. IMAGE_SERVE_MODE = 'x-accel' délègue l'envoi à nginx :
+    #     location /_uploads/ { internal; alias /chemin/vers/app/static/uploads/; }
+    IMAGE_SERVE_MODE = os.getenv("IMAGE_SERVE_MODE", "direct")
+    IMAGE_ACCEL_PREFIX = os.getenv("IMAGE_ACCEL_PREFIX", "/_uploads/")
+    IMAGE_CACHE_MAX_AGE = int(os.getenv("IMAGE_CACHE_MAX_AGE", 31536000))
+    IMAGE_FALLBACK_MAX_AGE = 300  # original servi à la place d'une variante pas encore générée
+
+    # Instrumentation par requête (voir utils/instrumentation.py). En production,
+    # un échantillonnage de 1 à 10 % suffit ; les requêtes SQL plus lentes que
+    # SLOW_QUERY_MS sont journalisées quel que soit l'échantillonnage (0 = désactivé).
+    PERF_INSTRUMENTATION = os.getenv("PERF_INSTRUMENTATION", "True").lower() in ['true', '1']
+    PERF_SAMPLE_RATE = float(os.getenv("PERF_SAMPLE_RATE", 1.0))
+    PERF_SERVER_TIMING = True
+    PERF_N_PLUS_ONE_THRESHOLD = 10  # même instruction exécutée N fois dans une requête
+    SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", 200))
+    SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", 1000))
+
+    # /metrics au format Prometheus. Sous gunicorn, définir PROMETHEUS_MULTIPROC_DIR
+    # (voir gunicorn.conf.py) pour agréger les métriques de tous les workers.
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() in ['true', '1']
+
+    # Journalisation : niveau, format ('json' ou 'text') et écriture depuis un thread
+    # dédié (QueueHandler/QueueListener) pour ne pas bloquer les requêtes sur stderr
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    LOG_ASYNC = os.getenv("LOG_ASYNC", "True").lower() in ['true', '1']
+
+    # Imports en masse : lignes par requête et par transaction
+    BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", 5000))
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 500))
+
     # Configuration des uploads
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
-    MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10MB max par requête (formulaire + image, imports CSV)
+    # Vérifiées sur l'extension et sur les premiers octets du fichier (voir event/uploads.py)
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    MAX_IMAGE_SIZE = int(os.getenv("MAX_IMAGE_SIZE", 5 * 1024 * 1024))
     ALLOWED_ORIGINS = ["*"]
+
+    # Démarrage : création du dossier d'uploads et route /test-email
+    CREATE_UPLOAD_FOLDER = True
+    ENABLE_TEST_ROUTES = False
+
+
+class DevelopmentConfig(Config):
+    DEBUG = os.getenv("FLASK_DEBUG", "True").lower() in ['true', '1']
+    ENABLE_TEST_ROUTES = True
+    OUTBOX_WORKER_ENABLED = os.getenv("OUTBOX_WORKER_ENABLED", "True").lower() in ['true', '1']
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URI", "sqlite://")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+    LOG_ASYNC = False
+    CACHE_BACKEND = "null"
+    OUTBOX_WORKER_ENABLED = False
+    IMAGE_VARIANTS_ENABLED = False
+    PERF_SERVER_TIMING = False
+    METRICS_ENABLED = False
+
+
+class ProductionConfig(Config):
+    # Secrets obligatoires : create_app refuse de démarrer sans eux
+    SECRET_KEY = os.getenv("SECRET_KEY")
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+    # 5 % des requêtes mesurées, sans exposer les temps internes aux clients
+    PERF_SAMPLE_RATE = float(os.getenv("PERF_SAMPLE_RATE", 0.05))
+    PERF_SERVER_TIMING = os.getenv("PERF_SERVER_TIMING", "False").lower() in ['true', '1']
+    # Le dossier est créé au déploiement (et à la demande par store_upload)
+    CREATE_UPLOAD_FOLDER = False
+    # Plusieurs workers : invalidations du cache partagées via Redis (repli sur
+    # le cache en mémoire, avec avertissement, si l'URL ou le paquet manque)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", os.getenv("REDIS_URL"))
+
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """Classe de configuration de l'environnement ``name`` (défaut : APP_ENV, puis development)."""
+    name = (name or os.getenv("APP_ENV") or os.getenv("FLASK_ENV") or 'development').lower()
+    if name not in config_by_name:
+        raise ValueError(f"Environnement inconnu : {name} ({', '.join(config_by_name)})")
+    return config_by_name[name]
@@ -4,8 +4,12 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_mail import Mail
 
-db = SQLAlchemy()
+from app.utils.cache import ResponseCache
+from app.utils.db_routing import RoutingSession
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 cors = CORS()
-mail = Mail()
\ No newline at end of file
+mail = Mail()
+response_cache = ResponseCache()
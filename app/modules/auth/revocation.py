@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class SQLRevocationBackend:
+    """Révocations partagées via la table revoked_tokens."""
+
+    def add(self, jti, expires_at):
+        db.session.add(RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(expires_at)))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+
+    def is_revoked(self, jti):
+        return db.session.get(RevokedToken, jti) is not None
+
+    def changes_since(self, since):
+        rows = db.session.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+            .where(RevokedToken.revoked_at > datetime.utcfromtimestamp(since))
+            .where(RevokedToken.expires_at > datetime.utcnow())
+        ).all()
+        return [(jti, _epoch(expires_at), _epoch(revoked_at)) for jti, expires_at, revoked_at in rows]
+
+    def purge(self):
+        db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+        db.session.commit()
+
+
+class RedisRevocationBackend:
+    """Révocations partagées via Redis : une clé par JTI expirant avec le jeton,
+    plus un ensemble trié (score = date de révocation) pour la synchronisation."""
+
+    LOG_KEY = 'revoked:log'
+
+    def __init__(self, url):
+        import redis  # dépendance optionnelle
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+
+    def add(self, jti, expires_at):
+        ttl = max(1, int(expires_at - time.time()))
+        pipe = self._client.pipeline()
+        pipe.set(f"revoked:{jti}", 1, ex=ttl)
+        pipe.zadd(self.LOG_KEY, {f"{jti}|{int(expires_at)}": time.time()})
+        pipe.execute()
+
+    def is_revoked(self, jti):
+        return bool(self._client.exists(f"revoked:{jti}"))
+
+    def changes_since(self, since):
+        now = time.time()
+        entries = self._client.zrangebyscore(self.LOG_KEY, f"({since}", '+inf', withscores=True)
+        changes = []
+        for member, revoked_at in entries:
+            jti, expires_at = member.rsplit('|', 1)
+            if int(expires_at) > now:
+                changes.append((jti, int(expires_at), revoked_at))
+        return changes
+
+    def purge(self, max_token_lifetime=timedelta(days=30)):
+        # Le journal n'a plus d'intérêt au-delà de la durée de vie maximale d'un jeton
+        self._client.zremrangebyscore(self.LOG_KEY, '-inf', time.time() - max_token_lifetime.total_seconds())
+
+
+class RevocationStore:
+    """Liste de révocation partagée avec un cache local du processus.
+
+    Le cache contient les JTI révoqués non encore expirés (mémoire bornée par
+    la durée de vie des jetons). Il est rafraîchi de façon incrémentale au plus
+    toutes les ``sync_interval`` secondes : vérifier un jeton ne coûte donc pas
+    un aller-retour réseau par requête. Avec ``sync_interval = 0`` chaque
+    vérification interroge le backend.
+    """
+
+    def __init__(self, app=None):
+        self.backend = SQLRevocationBackend()
+        self.sync_interval = 5
+        self.purge_interval = 3600
+        self._revoked = {}
+        self._watermark = 0
+        self._last_sync = None
+        self._last_purge = time.monotonic()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if app.config.get('REVOCATION_BACKEND', 'sql') == 'redis':
+            self.backend = RedisRevocationBackend(app.config['REVOCATION_REDIS_URL'])
+        else:
+            self.backend = SQLRevocationBackend()
+        self.sync_interval = app.config.get('REVOCATION_SYNC_INTERVAL', 5)
+        self._revoked = {}
+        self._watermark = 0
+        self._last_sync = None
+        app.extensions['revocation_store'] = self
+
+    def revoke(self, jti, expires_at):
+        self.backend.add(jti, expires_at)
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti):
+        if not self.sync_interval:
+            return self.backend.is_revoked(jti)
+        self._sync_if_due()
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def _sync_if_due(self):
+        now = time.monotonic()
+        if self._last_sync is not None and now - self._last_sync < self.sync_interval:
+            return
+        with self._lock:
+            if self._last_sync is not None and now - self._last_sync < self.sync_interval:
+                return
+            self._last_sync = now
+            try:
+                # Léger recouvrement pour tolérer le décalage d'horloge entre nœuds
+                changes = self.backend.changes_since(max(0, self._watermark - 5))
+            except Exception as e:
+                logger.error("Synchronisation des révocations impossible: %s", e)
+                return
+            for jti, expires_at, revoked_at in changes:
+                self._revoked[jti] = expires_at
+                self._watermark = max(self._watermark, revoked_at)
+
+            current = time.time()
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > current}
+
+            if now - self._last_purge >= self.purge_interval:
+                self._last_purge = now
+                try:
+                    self.backend.purge()
+                except Exception as e:
+                    logger.warning("Purge des révocations expirées impossible: %s", e)
+
+
+def _epoch(value):
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+
+revocation_store = RevocationStore()
@@ -1,5 +1,4 @@
 from flask import request, jsonify, current_app
-import smtplib
 from flask_jwt_extended import (
     jwt_required,
     get_jwt_identity,
@@ -9,8 +8,8 @@ from flask_jwt_extended import (
 )
 from datetime import timedelta, datetime
 from itsdangerous import URLSafeTimedSerializer
-from flask_mail import Message
-from app.extensions import db, mail
+from app.extensions import db
+from app.modules.outbox.services import enqueue_email
 from app.modules.user.models import User
 from . import auth_bp
 from .services import (
@@ -50,8 +49,8 @@ def refresh_token():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    jti = get_jwt()["jti"]
-    revoke_token(jti)
+    claims = get_jwt()
+    revoke_token(claims["jti"], claims.get("exp"))
     return jsonify({"message": "Déconnexion réussie"}), 200
 
 @auth_bp.route('/forgot-password', methods=['POST'])
@@ -65,39 +64,20 @@ def forgot_password():
         if not user:
             return jsonify({"message": "Si l'email existe, un code a été envoyé"}), 200
 
-        # Générer et envoyer le code
+        # Générer le code et le mettre en file d'envoi dans la même transaction
         reset_code = user.generate_reset_code()
+        enqueue_email(
+            "Code de réinitialisation",
+            [email],
+            f"Votre code de réinitialisation est : {reset_code}\nValable 10 minutes."
+        )
         db.session.commit()
 
-        # Envoi du code par email
-        with smtplib.SMTP(current_app.config['MAIL_SERVER'], 
-                         current_app.config['MAIL_PORT']) as server:
-            server.starttls()
-            server.login(current_app.config['MAIL_USERNAME'],
-                        current_app.config['MAIL_PASSWORD'])
-            
-            message = f"""Subject: Code de réinitialisation
-From: {current_app.config['MAIL_DEFAULT_SENDER']}
-To: {email}
-
-Votre code de réinitialisation est : {reset_code}
-Valable 10 minutes."""
-            
-            server.sendmail(
-                current_app.config['MAIL_DEFAULT_SENDER'],
-                [email],
-                message.encode('utf-8')
-            )
-
         return jsonify({"message": "Code envoyé par email"}), 200
 
-    except smtplib.SMTPAuthenticationError:
-        return jsonify({
-            "error": "Erreur d'authentification SMTP",
-            "solution": "Vérifiez le mot de passe d'application dans .env"
-        }), 503
     except Exception as e:
-        current_app.logger.error(f"Erreur: {str(e)}")
+        db.session.rollback()
+        current_app.logger.error("Erreur: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @auth_bp.route('/verify-reset-code', methods=['POST'])
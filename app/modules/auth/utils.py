@@ -1,15 +1,33 @@
 from functools import wraps
-from flask import jsonify
+from flask import current_app, jsonify
 from flask_jwt_extended import get_jwt, get_jwt_identity
+import time
+from datetime import timedelta
+from app.extensions import jwt
 from app.modules.user.models import User
+from .revocation import revocation_store
 
-jwt_blocklist = set()
+# Rétention d'une révocation sans expiration connue si les refresh tokens n'expirent jamais
+DEFAULT_REVOCATION_TTL = 365 * 24 * 3600
 
-def revoke_token(jti):
-    jwt_blocklist.add(jti)
+def revocation_ttl():
+    """Durée de vie maximale d'un jeton émis : celle des refresh tokens (JWT_REFRESH_TOKEN_EXPIRES)."""
+    lifetime = current_app.config.get('JWT_REFRESH_TOKEN_EXPIRES', timedelta(days=30))
+    if isinstance(lifetime, timedelta):
+        return lifetime.total_seconds()
+    if lifetime:
+        return float(lifetime)
+    return DEFAULT_REVOCATION_TTL
+
+def revoke_token(jti, expires_at=None):
+    revocation_store.revoke(jti, expires_at or time.time() + revocation_ttl())
 
 def is_token_revoked(jti):
-    return jti in jwt_blocklist
+    return revocation_store.is_revoked(jti)
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    return is_token_revoked(jwt_payload["jti"])
 
 def role_required(required_roles):
     def wrapper(fn):
@@ -3,12 +3,15 @@ from flask_jwt_extended import jwt_required
 from . import category_bp
 from app.modules.category.services import (
     get_all_categories, get_category_by_id,
-    create_category, update_category, delete_category
+    create_category, update_category, delete_category,
+    categories_validators
 )
 from app.modules.auth.utils import role_required
+from app.utils.conditional import conditional
 
 # Route publique - Accès sans authentification
 @category_bp.route('/', methods=['GET'])
+@conditional(categories_validators)
 def list_categories():  # Retiré @jwt_required
     categories = get_all_categories()
     return jsonify([cat.to_dict() for cat in categories]), 200
@@ -1,10 +1,24 @@
 from app.extensions import db
 from .models import Category
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
+from app.utils.conditional import make_etag, request_signature
+
+def event_services():
+    # Import différé : le module des événements importe déjà celui des catégories
+    from app.modules.event import services
+    return services
 
 def get_all_categories():
     return Category.query.all()
 
+def categories_validators():
+    last_modified, count = db.session.query(
+        func.max(func.coalesce(Category.updated_at, Category.created_at)),
+        func.count(Category.id)
+    ).one()
+    return make_etag(last_modified, count, request_signature()), last_modified
+
 def get_category_by_id(category_id):
     return Category.query.get(category_id)
 
@@ -35,8 +49,12 @@ def update_category(category_id, nom=None, description=None):
     if description is not None:
         category.description = description
 
+    # Le nom de la catégorie figure dans les listes et les fiches des événements
+    events = event_services()
+    event_ids = events.public_event_ids(categorie_id=category.id)
     try:
         db.session.commit()
+        events.invalidate_event_lists(event_ids)
         return category
     except IntegrityError:
         db.session.rollback()
@@ -47,9 +65,12 @@ def delete_category(category_id):
     if not category:
         return False
 
+    events = event_services()
+    event_ids = events.public_event_ids(categorie_id=category.id)
     try:
         db.session.delete(category)
         db.session.commit()
+        events.invalidate_event_lists(event_ids)
         return True
     except Exception:
         db.session.rollback()
@@ -0,0 +1,11 @@
+import click
+from flask.cli import AppGroup
+
+from .services import rebuild_counters
+
+dashboard_cli = AppGroup('dashboard', help="Statistiques des tableaux de bord.")
+
+@dashboard_cli.command('rebuild-counters')
+def rebuild():
+    """Recalcule les compteurs matérialisés (à lancer une fois après activation)."""
+    click.echo(f"{rebuild_counters()} compteur(s) écrit(s)")
@@ -0,0 +1,167 @@
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select, update
+
+from app.extensions import db
+from app.modules.user.models import User
+from app.modules.event.models import Event
+from app.modules.registration.models import Registration
+from .models import StatCounter
+
+GLOBAL_SCOPE = 'global'
+SEEDED = '_seeded'
+ORGANIZER_ROLES = ('organizer', 'organisateur')
+PRIVATE_TYPES = ('prive', 'privé')
+ORGANIZER_EVENT_KEYS = ('total_events', 'total_validated_events', 'total_pending_events')
+
+def organizer_scope(organizer_id):
+    return f"organizer:{int(organizer_id)}"
+
+def counters_enabled():
+    return has_app_context() and current_app.config.get('DASHBOARD_COUNTERS_ENABLED', False)
+
+def counters_ready():
+    # Les compteurs ne sont lus qu'après une reconstruction complète (flask dashboard rebuild-counters)
+    return counters_enabled() and db.session.get(StatCounter, (GLOBAL_SCOPE, SEEDED)) is not None
+
+def read_counters(scope, names):
+    values = dict(db.session.execute(
+        select(StatCounter.name, StatCounter.value).where(StatCounter.scope == scope)
+    ).all())
+    return {name: int(values.get(name, 0)) for name in names}
+
+def apply_deltas(connection, scope, deltas):
+    """Ajoute ``deltas`` aux compteurs de ``scope`` par un upsert atomique."""
+    rows = [{"scope": scope, "name": name, "value": int(delta)} for name, delta in deltas.items() if delta]
+    if not rows:
+        return
+
+    table = StatCounter.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['scope', 'name'],
+            set_={"value": table.c.value + stmt.excluded.value}
+        )
+        connection.execute(stmt)
+    elif dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(table).values(rows)
+        connection.execute(stmt.on_duplicate_key_update(value=table.c.value + stmt.inserted.value))
+    else:
+        for row in rows:
+            result = connection.execute(
+                update(table)
+                .where(table.c.scope == row["scope"], table.c.name == row["name"])
+                .values(value=table.c.value + row["value"])
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(row))
+
+def _previous(target, attr):
+    history = inspect(target).attrs[attr].history
+    return history.deleted[0] if history.deleted else getattr(target, attr)
+
+def _event_contrib(type_, est_valide, sign=1):
+    return {
+        'total_events': sign,
+        'total_public_events': sign if type_ == 'public' else 0,
+        'total_private_events': sign if type_ in PRIVATE_TYPES else 0,
+        'total_validated_events': sign if est_valide is True else 0,
+        'total_pending_events': sign if est_valide is False else 0,
+    }
+
+def _organizer_part(contrib):
+    return {key: contrib[key] for key in ORGANIZER_EVENT_KEYS}
+
+def _diff(new, old):
+    return {key: new[key] - old[key] for key in new}
+
+def _event_registrations(connection, event_id):
+    return connection.execute(
+        select(db.func.count(Registration.id)).where(Registration.event_id == event_id)
+    ).scalar()
+
+def _event_organizer(connection, event_id):
+    return connection.execute(
+        select(Event.organisateur_id).where(Event.id == event_id)
+    ).scalar()
+
+# -- Maintenance incrémentale, dans la transaction de l'écriture -------------
+
+@event.listens_for(Event, 'after_insert')
+def _event_inserted(mapper, connection, target):
+    if not counters_enabled():
+        return
+    contrib = _event_contrib(target.type, target.est_valide)
+    apply_deltas(connection, GLOBAL_SCOPE, contrib)
+    apply_deltas(connection, organizer_scope(target.organisateur_id), _organizer_part(contrib))
+
+@event.listens_for(Event, 'after_update')
+def _event_updated(mapper, connection, target):
+    if not counters_enabled():
+        return
+    old = _event_contrib(_previous(target, 'type'), _previous(target, 'est_valide'))
+    new = _event_contrib(target.type, target.est_valide)
+    apply_deltas(connection, GLOBAL_SCOPE, _diff(new, old))
+
+    old_organizer = _previous(target, 'organisateur_id')
+    if old_organizer == target.organisateur_id:
+        apply_deltas(connection, organizer_scope(target.organisateur_id), _organizer_part(_diff(new, old)))
+        return
+
+    registrations = _event_registrations(connection, target.id)
+    apply_deltas(connection, organizer_scope(old_organizer), {
+        **{key: -value for key, value in _organizer_part(old).items()},
+        'total_registrations': -registrations
+    })
+    apply_deltas(connection, organizer_scope(target.organisateur_id), {
+        **_organizer_part(new), 'total_registrations': registrations
+    })
+
+@event.listens_for(Event, 'after_delete')
+def _event_deleted(mapper, connection, target):
+    if not counters_enabled():
+        return
+    contrib = _event_contrib(target.type, target.est_valide, sign=-1)
+    apply_deltas(connection, GLOBAL_SCOPE, contrib)
+    apply_deltas(connection, organizer_scope(target.organisateur_id), _organizer_part(contrib))
+
+def registrations_added(connection, event_id, count):
+    """Ajuste les compteurs d'inscriptions ; utilisé aussi par les insertions en masse."""
+    apply_deltas(connection, GLOBAL_SCOPE, {'total_registrations': count})
+    organizer_id = _event_organizer(connection, event_id)
+    if organizer_id is not None:
+        apply_deltas(connection, organizer_scope(organizer_id), {'total_registrations': count})
+
+@event.listens_for(Registration, 'after_insert')
+def _registration_inserted(mapper, connection, target):
+    if counters_enabled():
+        registrations_added(connection, target.event_id, 1)
+
+@event.listens_for(Registration, 'after_delete')
+def _registration_deleted(mapper, connection, target):
+    if counters_enabled():
+        registrations_added(connection, target.event_id, -1)
+
+def _user_contrib(role, sign=1):
+    return {'total_users': sign, 'total_organizers': sign if role in ORGANIZER_ROLES else 0}
+
+@event.listens_for(User, 'after_insert')
+def _user_inserted(mapper, connection, target):
+    if counters_enabled():
+        apply_deltas(connection, GLOBAL_SCOPE, _user_contrib(target.role))
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    if counters_enabled():
+        apply_deltas(connection, GLOBAL_SCOPE, _diff(_user_contrib(target.role), _user_contrib(_previous(target, 'role'))))
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    if counters_enabled():
+        apply_deltas(connection, GLOBAL_SCOPE, _user_contrib(target.role, sign=-1))
@@ -0,0 +1,9 @@
+from app.extensions import db
+
+class StatCounter(db.Model):
+    """Compteur matérialisé d'un tableau de bord (scope 'global' ou 'organizer:<id>')."""
+    __tablename__ = 'stat_counters'
+
+    scope = db.Column(db.String(50), primary_key=True)
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
@@ -1,47 +1,132 @@
+from sqlalchemy import case, func, select, true
 from app.extensions import db
 from app.modules.user.models import User
 from app.modules.event.models import Event
 from app.modules.registration.models import Registration
+from .counters import (
+    GLOBAL_SCOPE, ORGANIZER_ROLES, PRIVATE_TYPES, SEEDED,
+    counters_ready, organizer_scope, read_counters
+)
+from .models import StatCounter
+
+GLOBAL_STATS = (
+    "total_users", "total_organizers", "total_events", "total_public_events",
+    "total_private_events", "total_validated_events", "total_pending_events",
+    "total_registrations"
+)
+ORGANIZER_STATS = (
+    "total_events", "total_validated_events", "total_pending_events", "total_registrations"
+)
+
+def _count_if(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def compute_global_stats(session=None):
+    # Une seule requête : trois agrégats conditionnels joints entre eux
+    session = session or db.session
+    users = select(
+        func.count(User.id).label("total_users"),
+        _count_if(User.role.in_(ORGANIZER_ROLES)).label("total_organizers")
+    ).subquery()
+    events = select(
+        func.count(Event.id).label("total_events"),
+        _count_if(Event.type == 'public').label("total_public_events"),
+        _count_if(Event.type.in_(PRIVATE_TYPES)).label("total_private_events"),
+        _count_if(Event.est_valide == True).label("total_validated_events"),
+        _count_if(Event.est_valide == False).label("total_pending_events")
+    ).subquery()
+    registrations = select(
+        func.count(Registration.id).label("total_registrations")
+    ).subquery()
+
+    row = session.execute(
+        select(users, events, registrations)
+        .select_from(users.join(events, true()).join(registrations, true()))
+    ).mappings().one()
+    return {name: int(row[name]) for name in GLOBAL_STATS}
+
+def compute_organizer_stats(organizer_id, session=None):
+    session = session or db.session
+    events = select(
+        func.count(Event.id).label("total_events"),
+        _count_if(Event.est_valide == True).label("total_validated_events"),
+        _count_if(Event.est_valide == False).label("total_pending_events")
+    ).where(Event.organisateur_id == organizer_id).subquery()
+    registrations = select(
+        func.count(Registration.id).label("total_registrations")
+    ).join(Event, Registration.event_id == Event.id).where(
+        Event.organisateur_id == organizer_id
+    ).subquery()
+
+    row = session.execute(
+        select(events, registrations).select_from(events.join(registrations, true()))
+    ).mappings().one()
+    return {name: int(row[name]) for name in ORGANIZER_STATS}
 
 def get_global_stats():
     try:
-        stats = {
-            "total_users": User.query.count(),
-            "total_organizers": User.query.filter(User.role.in_(['organizer', 'organisateur'])).count(),
-            "total_events": Event.query.count(),
-            "total_public_events": Event.query.filter_by(type='public').count(),
-            "total_private_events": Event.query.filter_by(type='privé').count(),
-            "total_validated_events": Event.query.filter_by(est_valide=True).count(),
-            "total_pending_events": Event.query.filter_by(est_valide=False).count(),
-            "total_registrations": Registration.query.count()
-        }
-        return stats
+        if counters_ready():
+            return read_counters(GLOBAL_SCOPE, GLOBAL_STATS)
+        return compute_global_stats()
     except Exception as e:
         return {"error": str(e)}
 
 def get_organizer_stats(organizer_id):
     try:
-        events = Event.query.filter_by(organisateur_id=organizer_id).all()
-        return {
-            "total_events": len(events),
-            "total_validated_events": len([e for e in events if e.est_valide]),
-            "total_pending_events": len([e for e in events if not e.est_valide]),
-            "total_registrations": sum(len(e.registrations) for e in events)
-        }
+        if counters_ready():
+            return read_counters(organizer_scope(organizer_id), ORGANIZER_STATS)
+        return compute_organizer_stats(organizer_id)
     except Exception as e:
         return {"error": str(e)}
 
 def get_user_stats(user_id):
     try:
-        registrations = Registration.query.filter_by(user_id=user_id).all()
+        rows = db.session.execute(
+            select(Event.id, Event.titre, Event.date, Event.lieu)
+            .join(Registration, Registration.event_id == Event.id)
+            .where(Registration.user_id == user_id)
+            .order_by(Registration.id)
+        ).all()
         return {
-            "total_registrations": len(registrations),
+            "total_registrations": len(rows),
             "events": [{
-                "event_id": r.event.id,
-                "titre": r.event.titre,
-                "date": r.event.date.strftime('%Y-%m-%d'),
-                "lieu": r.event.lieu
-            } for r in registrations]
+                "event_id": event_id,
+                "titre": titre,
+                "date": date.strftime('%Y-%m-%d'),
+                "lieu": lieu
+            } for event_id, titre, date, lieu in rows]
         }
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+def rebuild_counters(session=None):
+    """Recalcule tous les compteurs matérialisés à partir des tables sources."""
+    session = session or db.session
+    session.query(StatCounter).delete()
+
+    rows = [StatCounter(scope=GLOBAL_SCOPE, name=name, value=value)
+            for name, value in compute_global_stats(session).items()]
+
+    per_organizer = session.execute(
+        select(
+            Event.organisateur_id,
+            func.count(Event.id),
+            _count_if(Event.est_valide == True),
+            _count_if(Event.est_valide == False)
+        ).group_by(Event.organisateur_id)
+    ).all()
+    registrations = dict(session.execute(
+        select(Event.organisateur_id, func.count(Registration.id))
+        .join(Registration, Registration.event_id == Event.id)
+        .group_by(Event.organisateur_id)
+    ).all())
+
+    for organizer_id, total, validated, pending in per_organizer:
+        values = dict(zip(ORGANIZER_STATS, (total, validated, pending, registrations.get(organizer_id, 0))))
+        rows.extend(StatCounter(scope=organizer_scope(organizer_id), name=name, value=value)
+                    for name, value in values.items())
+
+    rows.append(StatCounter(scope=GLOBAL_SCOPE, name=SEEDED, value=1))
+    session.add_all(rows)
+    session.commit()
+    return len(rows)
@@ -0,0 +1,128 @@
+import logging
+from math import ceil
+
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import parse_etags
+
+from app.asgi import image_url_prefix, json_response
+from app.modules.event.models import Event
+from app.modules.event.serializers import PUBLIC_EVENT_FIELDS, loader_options, parse_fields, serialize_events
+from app.modules.event.services import PUBLIC_LIST_NAMESPACE
+from app.modules.event.utils import KEYSET_ORDER, after_cursor, parse_limit, parse_with_total, split_page
+from app.utils.conditional import signature
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_VISIBLE = (Event.type == 'public', Event.est_valide == True)  # noqa: E712
+
+
+def _cache_lookup(cache, request_signature):
+    """``(etag, clé, corps en cache)`` : mêmes valeurs que @conditional + @response_cache.cached."""
+    etag = cache.validator(PUBLIC_LIST_NAMESPACE, request_signature)
+    if etag is None:
+        return None, None, None
+    try:
+        key = cache.key_for(PUBLIC_LIST_NAMESPACE, request_signature)
+        return etag, key, cache.backend.get(key)
+    except Exception as e:
+        logger.warning("Cache indisponible: %s", e)
+        return etag, None, None
+
+
+def _cache_store(cache, key, body):
+    try:
+        cache.backend.set(key, body, cache.default_timeout)
+    except Exception as e:
+        logger.warning("Écriture cache impossible: %s", e)
+
+
+def _with_headers(response, etag, cache_result):
+    if etag is not None and response.status_code in (200, 304):
+        response.headers['ETag'] = f'"{etag}"'
+        response.headers['Cache-Control'] = 'no-cache'
+    if cache_result is not None:
+        response.headers['X-Cache'] = cache_result
+    return response
+
+
+async def get_public_events(request):
+    """Version asynchrone de GET /api/events/public (mêmes paramètres et réponse).
+
+    Même cache de réponses et mêmes ETags que la vue Flask : les deux modes
+    partagent les entrées et renvoient les mêmes en-têtes pour une URL.
+    """
+    cache = request.app.state.flask_app.extensions['response_cache']
+    request_signature = signature(request.url.netloc, request.url.path, request.query_params.multi_items())
+    etag, key, body = await run_in_threadpool(_cache_lookup, cache, request_signature)
+
+    if etag is not None and parse_etags(request.headers.get('if-none-match')).contains(etag):
+        return _with_headers(Response(status_code=304), etag, None)
+    if body is not None:
+        return _with_headers(Response(body, media_type='application/json'), etag, 'HIT')
+
+    response = await _list_public_events(request)
+    if key is not None and response.status_code == 200:
+        await run_in_threadpool(_cache_store, cache, key, response.body)
+    return _with_headers(response, etag, None if key is None else 'MISS')
+
+
+async def _list_public_events(request):
+    args = request.query_params
+    try:
+        fields = parse_fields(args.get('fields'), PUBLIC_EVENT_FIELDS)
+    except ValueError as e:
+        return json_response(request, {"message": str(e)}, 400)
+
+    query = select(Event).options(*loader_options(fields)).where(*PUBLIC_VISIBLE)
+    count_query = select(func.count(Event.id)).where(*PUBLIC_VISIBLE)
+    keyset = 'cursor' in args or 'limit' in args
+    try:
+        async with request.app.state.sessions() as session:
+            if keyset:
+                try:
+                    limit = parse_limit(args.get('limit'))
+                    if args.get('cursor'):
+                        query = query.where(after_cursor(args['cursor']))
+                except ValueError as e:
+                    return json_response(request, {"message": str(e)}, 400)
+                total = await session.scalar(count_query) if parse_with_total(args.get('with_total')) else None
+                events = (await session.scalars(query.order_by(*KEYSET_ORDER).limit(limit + 1))).all()
+                items, next_cursor = split_page(events, limit)
+            else:
+                # Mêmes bornes que Query.paginate(error_out=False)
+                page = max(int(args.get('page', 1)), 1)
+                per_page = int(args.get('per_page', 10))
+                per_page = per_page if per_page > 0 else 20
+                total = await session.scalar(count_query)
+                items = (await session.scalars(query.limit(per_page).offset((page - 1) * per_page))).all()
+
+        prefix = image_url_prefix(request) if 'image_url' in fields or 'image_urls' in fields else ''
+        result = serialize_events(items, fields, prefix=prefix)
+
+        if keyset:
+            return json_response(request, {
+                "events": result,
+                "total": total,
+                "next_cursor": next_cursor
+            })
+
+        return json_response(request, {
+            "events": result,
+            "total": total,
+            "page": page,
+            "pages": ceil(total / per_page) if total else 0
+        })
+
+    except Exception as e:
+        logger.error("Erreur récupération événements publics: %s", e, exc_info=True)
+        return json_response(
+            request, {"message": f"Erreur lors de la récupération des événements publics: {str(e)}"}, 500
+        )
+
+
+routes = [
+    Route('/api/events/public', get_public_events, methods=['GET']),
+]
@@ -0,0 +1,78 @@
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, select, update
+
+from app.extensions import db
+from .geo import encode_geohash
+from .images import DEFAULT_MAX_PIXELS, generate_variants, pillow_available, variant_filename
+from .models import Event
+from .search import event_search
+
+events_cli = AppGroup('events', help="Maintenance des événements.")
+
+@events_cli.command('backfill-geohash')
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--all', 'recompute_all', is_flag=True, help="Recalcule aussi les geohash existants.")
+def backfill_geohash(batch_size, recompute_all):
+    """Calcule le geohash des événements géolocalisés (à lancer après la migration)."""
+    pending = [Event.latitude.isnot(None), Event.longitude.isnot(None)]
+    if not recompute_all:
+        pending.append(Event.geohash.is_(None))
+
+    table = Event.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam('event_id'))
+        # updated_at réaffecté à lui-même : sinon l'onupdate de la colonne s'appliquerait
+        .values(geohash=bindparam('geohash'), updated_at=table.c.updated_at)
+    )
+    last_id, total = 0, 0
+    while True:
+        rows = db.session.execute(
+            select(Event.id, Event.latitude, Event.longitude)
+            .where(Event.id > last_id, *pending)
+            .order_by(Event.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        # UPDATE groupé (executemany) sans passer par l'ORM : updated_at et les ETags sont préservés
+        db.session.execute(stmt, [
+            {"event_id": event_id, "geohash": encode_geohash(lat, lng)} for event_id, lat, lng in rows
+        ])
+        db.session.commit()
+        last_id = rows[-1][0]
+        total += len(rows)
+    click.echo(f"{total} événement(s) mis à jour")
+
+@events_cli.command('rebuild-search')
+def rebuild_search():
+    """Reconstruit l'index de recherche plein texte."""
+    event_search.rebuild()
+    click.echo(f"Index de recherche reconstruit (backend {event_search.backend.name})")
+
+@events_cli.command('generate-images')
+@click.option('--force', is_flag=True, help="Régénère aussi les variantes existantes.")
+def generate_images(force):
+    """Génère les variantes manquantes des images d'événements existantes."""
+    if not pillow_available():
+        raise click.ClickException("Pillow n'est pas installé.")
+    folder = current_app.config['UPLOAD_FOLDER']
+    filenames = db.session.execute(select(Event.image_url).where(Event.image_url.isnot(None)).distinct()).scalars()
+    done = 0
+    for filename in filenames:
+        if not os.path.exists(os.path.join(folder, filename)):
+            continue
+        if not force and os.path.exists(os.path.join(folder, variant_filename(filename, 'thumb', 'jpg'))):
+            continue
+        try:
+            generate_variants(folder, filename, current_app.config.get('IMAGE_WEBP_QUALITY', 80),
+                              current_app.config.get('IMAGE_JPEG_QUALITY', 85),
+                              current_app.config.get('IMAGE_MAX_PIXELS', DEFAULT_MAX_PIXELS))
+            done += 1
+        except Exception as e:
+            click.echo(f"{filename} : {str(e)}", err=True)
+    click.echo(f"Variantes générées pour {done} image(s)")
@@ -0,0 +1,102 @@
+import math
+
+from sqlalchemy import and_, or_, true
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    if latitude is None or longitude is None:
+        return None
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lng_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Dimensions (lat, lng) en degrés d'une cellule geohash de cette précision."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def bounding_box(latitude, longitude, radius_km):
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlng = min(180.0, math.degrees(radius_km / EARTH_RADIUS_KM) / cos_lat)
+    return (
+        max(-90.0, latitude - dlat), max(-180.0, longitude - dlng),
+        min(90.0, latitude + dlat), min(180.0, longitude + dlng)
+    )
+
+
+def covering_prefixes(min_lat, min_lng, max_lat, max_lng, max_cells=16):
+    """Préfixes geohash couvrant la boîte, à la précision la plus fine tenant en ``max_cells``."""
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lng = cell_size(precision)
+        rows = math.floor(max_lat / cell_lat) - math.floor(min_lat / cell_lat) + 1
+        cols = math.floor(max_lng / cell_lng) - math.floor(min_lng / cell_lng) + 1
+        if rows * cols > max_cells:
+            continue
+
+        prefixes = set()
+        for i in range(rows):
+            lat = min(max_lat, min_lat + i * cell_lat)
+            for j in range(cols):
+                lng = min(max_lng, min_lng + j * cell_lng)
+                prefixes.add(encode_geohash(lat, lng, precision))
+        for lat in (min_lat, max_lat):
+            for lng in (min_lng, max_lng):
+                prefixes.add(encode_geohash(lat, lng, precision))
+        return sorted(prefixes)
+    return []
+
+
+def _next_prefix(prefix):
+    # Borne supérieure exclusive : incrément du dernier caractère dans l'alphabet base32
+    while prefix:
+        index = BASE32.index(prefix[-1])
+        if index < len(BASE32) - 1:
+            return prefix[:-1] + BASE32[index + 1]
+        prefix = prefix[:-1]
+    return None
+
+
+def prefix_filter(column, prefixes):
+    """Conditions par intervalle (>= / <) utilisables par l'index sur ``column``.
+
+    Sans préfixe (zone trop vaste pour être découpée) : condition toujours vraie,
+    la boîte englobante reste seule à filtrer.
+    """
+    if not prefixes:
+        return true()
+    clauses = []
+    for prefix in prefixes:
+        upper = _next_prefix(prefix)
+        clauses.append(and_(column >= prefix, column < upper) if upper else column >= prefix)
+    return or_(*clauses)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,222 @@
+import importlib.util
+import logging
+import mimetypes
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from flask import abort, current_app, send_from_directory
+from werkzeug.security import safe_join
+
+logger = logging.getLogger(__name__)
+
+# Variantes générées : largeur cible et recadrage (la miniature a une taille fixe)
+VARIANTS = {
+    'thumb': {"width": 320, "height": 180, "crop": True},
+    'medium': {"width": 800},
+    'large': {"width": 1600},
+}
+FORMATS = {'webp': 'WEBP', 'jpg': 'JPEG'}
+
+# Au-delà, l'image n'est pas décodée (bombe de décompression : petit fichier, énorme bitmap)
+DEFAULT_MAX_PIXELS = 40_000_000
+
+# Noms dont le contenu ne change jamais : uuid4 hex ou empreinte SHA-256
+IMMUTABLE_NAME_RE = re.compile(r'[0-9a-f]{32}|[0-9a-f]{64}')
+
+
+def variant_filename(filename, variant, ext):
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}_{variant}.{ext}"
+
+
+def variant_filenames(filename):
+    return [variant_filename(filename, variant, ext) for variant in VARIANTS for ext in FORMATS]
+
+
+def variant_urls(url):
+    """URLs par variante : l'original et ``?w=`` pour chaque largeur."""
+    urls = {name: f"{url}?w={spec['width']}" for name, spec in VARIANTS.items()}
+    urls['original'] = url
+    return urls
+
+
+def pick_variant(width):
+    """Plus petite variante couvrant ``width`` pixels (la plus grande sinon)."""
+    for name, spec in sorted(VARIANTS.items(), key=lambda item: item[1]['width']):
+        if spec['width'] >= width:
+            return name
+    return max(VARIANTS, key=lambda name: VARIANTS[name]['width'])
+
+
+def resolve_variant(folder, filename, width, accept_webp):
+    """Nom du fichier à servir pour ``?w=`` ; l'original tant que la variante n'existe pas."""
+    variant = pick_variant(width)
+    for ext in (('webp', 'jpg') if accept_webp else ('jpg',)):
+        candidate = variant_filename(filename, variant, ext)
+        if os.path.exists(os.path.join(folder, candidate)):
+            return candidate
+    return filename
+
+
+def is_immutable_name(filename):
+    return IMMUTABLE_NAME_RE.fullmatch(os.path.splitext(filename)[0]) is not None
+
+
+def send_image(folder, filename, immutable=False):
+    """Réponse pour une image du dossier d'uploads, selon IMAGE_SERVE_MODE.
+
+    'direct' : envoi par le worker avec ETag, Last-Modified et requêtes
+    partielles (Range) ; 'x-accel' : en-tête X-Accel-Redirect, nginx envoie
+    le fichier et libère aussitôt le worker ; 'x-sendfile' : équivalent
+    Apache/lighttpd (USE_X_SENDFILE). Les noms immuables reçoivent un
+    Cache-Control d'un an avec ``immutable``.
+    """
+    if filename.startswith('.'):
+        # Fichiers internes (verrou, uploads en cours)
+        abort(404)
+    config = current_app.config
+    max_age = config.get('IMAGE_CACHE_MAX_AGE', 31536000) if immutable else config.get('IMAGE_FALLBACK_MAX_AGE', 300)
+
+    if config.get('IMAGE_SERVE_MODE') == 'x-accel':
+        path = safe_join(folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        response = current_app.response_class(
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        )
+        response.headers['X-Accel-Redirect'] = config.get('IMAGE_ACCEL_PREFIX', '/_uploads/').rstrip('/') + '/' + quote(filename)
+    else:
+        response = send_from_directory(folder, filename, max_age=max_age, conditional=True, etag=True)
+
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+
+def pillow_available():
+    # Pillow est optionnel (sans lui, seul l'original est servi) et n'est importé
+    # qu'à la première génération : le démarrage des workers ne le charge pas
+    return importlib.util.find_spec('PIL') is not None
+
+
+def image_pixels(path):
+    """Nombre de pixels déclaré par l'en-tête, sans décoder l'image ; None sans Pillow.
+
+    Lève ValueError si le fichier n'est pas une image lisible.
+    """
+    if not pillow_available():
+        return None
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+    except Image.DecompressionBombError:
+        # Plus de deux fois Image.MAX_IMAGE_PIXELS : refusé par Pillow dès l'en-tête
+        return float('inf')
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError(f"Image illisible : {e}")
+    return width * height
+
+
+def _render(image, spec):
+    from PIL import Image, ImageOps
+
+    if spec.get('crop'):
+        return ImageOps.fit(image, (spec['width'], spec['height']), Image.LANCZOS)
+    if image.width <= spec['width']:
+        return image.copy()
+    height = round(image.height * spec['width'] / image.width)
+    return image.resize((spec['width'], height), Image.LANCZOS)
+
+
+def generate_variants(folder, filename, webp_quality=80, jpeg_quality=85, max_pixels=DEFAULT_MAX_PIXELS):
+    """Génère les variantes WebP/JPEG d'une image ; retourne le nombre de fichiers écrits."""
+    if not pillow_available():
+        return 0
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    source = os.path.join(folder, filename)
+    written = 0
+    with Image.open(source) as original:
+        # Dimensions lues dans l'en-tête : vérifiées avant tout décodage
+        if original.width * original.height > max_pixels:
+            raise ValueError(f"Image trop grande ({original.width}x{original.height} pixels)")
+        # Orientation EXIF appliquée, puis RGB (JPEG n'a pas de transparence)
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        for variant, spec in VARIANTS.items():
+            rendered = _render(image, spec)
+            for ext, fmt in FORMATS.items():
+                target = os.path.join(folder, variant_filename(filename, variant, ext))
+                tmp = f"{target}.tmp"
+                output = rendered.convert('RGB') if fmt == 'JPEG' else rendered
+                options = {"quality": jpeg_quality, "optimize": True, "progressive": True} \
+                    if fmt == 'JPEG' else {"quality": webp_quality, "method": 4}
+                output.save(tmp, fmt, **options)
+                # Remplacement atomique : un lecteur ne voit jamais un fichier partiel
+                os.replace(tmp, target)
+                written += 1
+    return written
+
+
+def remove_variants(folder, filename):
+    for name in variant_filenames(filename):
+        try:
+            os.remove(os.path.join(folder, name))
+        except FileNotFoundError:
+            pass
+
+
+class ImageProcessor:
+    """Génère les variantes hors du chemin de la requête, dans un pool de threads."""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.workers = 2
+        self.webp_quality = 80
+        self.jpeg_quality = 85
+        self.max_pixels = DEFAULT_MAX_PIXELS
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        available = pillow_available()
+        self.enabled = available and app.config.get('IMAGE_VARIANTS_ENABLED', True)
+        self.workers = app.config.get('IMAGE_WORKERS', 2)
+        self.webp_quality = app.config.get('IMAGE_WEBP_QUALITY', 80)
+        self.jpeg_quality = app.config.get('IMAGE_JPEG_QUALITY', 85)
+        self.max_pixels = app.config.get('IMAGE_MAX_PIXELS', DEFAULT_MAX_PIXELS)
+        if not available:
+            logger.info("Pillow absent : variantes d'images désactivées")
+        app.extensions['image_processor'] = self
+
+    def _run(self, folder, filename):
+        try:
+            count = generate_variants(folder, filename, self.webp_quality, self.jpeg_quality, self.max_pixels)
+            logger.debug("%s variante(s) générée(s) pour %s", count, filename)
+        except Exception as e:
+            logger.error("Génération des variantes impossible pour %s: %s", filename, e)
+
+    def submit(self, folder, filename):
+        if not self.enabled:
+            return None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='images')
+        return self._executor.submit(self._run, folder, filename)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+image_processor = ImageProcessor()
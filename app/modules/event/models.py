@@ -1,8 +1,17 @@
 from datetime import datetime
+from sqlalchemy import DDL, event as sa_event
 from app.extensions import db
+from app.modules.event.geo import encode_geohash
 
 class Event(db.Model):
     __tablename__ = 'events'
+    # Index composites alignés sur les requêtes réelles (filtres d'égalité puis tri date, id)
+    __table_args__ = (
+        db.Index('ix_events_public_listing', 'type', 'est_valide', 'date', 'id'),
+        db.Index('ix_events_organisateur_date', 'organisateur_id', 'date', 'id'),
+        db.Index('ix_events_categorie_date', 'categorie_id', 'date', 'id'),
+        db.Index('ix_events_date', 'date', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     titre = db.Column(db.String(100), nullable=False)
@@ -11,10 +20,17 @@ class Event(db.Model):
     lieu = db.Column(db.String(255), nullable=False)
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
+    # Geohash des coordonnées, indexé pour la recherche de proximité (voir geo.py)
+    geohash = db.Column(db.String(12), nullable=True, index=True)
     image_url = db.Column(db.String(255), nullable=True)
     type = db.Column(db.String(20), default='public')
     est_valide = db.Column(db.Boolean, default=False)
 
+    # Capacité optionnelle (None = illimitée) et compteur de places, mis à jour
+    # uniquement par UPDATE conditionnel (voir registration/services.py)
+    capacity = db.Column(db.Integer, nullable=True)
+    places_reservees = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     categorie_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
     organisateur_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
@@ -23,4 +39,29 @@ class Event(db.Model):
 
     # CORRECTION : Définition explicite des relations
     categorie = db.relationship('Category', backref='events', lazy='joined')
-    organisateur = db.relationship('User', backref='organised_events', lazy='joined')
\ No newline at end of file
+    organisateur = db.relationship('User', backref='organised_events', lazy='joined')
+
+class StoredImage(db.Model):
+    """Fichier image du dossier d'uploads, partagé par les événements au contenu identique."""
+    __tablename__ = 'stored_images'
+
+    filename = db.Column(db.String(255), primary_key=True)
+    # Empreinte SHA-256 du contenu (NULL pour les images antérieures à la déduplication)
+    sha256 = db.Column(db.String(64), nullable=True, unique=True)
+    size = db.Column(db.Integer, nullable=True)
+    ref_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Index plein texte pour la recherche sous MySQL (voir search.py)
+sa_event.listen(
+    Event.__table__, 'after_create',
+    DDL("ALTER TABLE events ADD FULLTEXT INDEX ft_events_text (titre, description, lieu)")
+    .execute_if(dialect=('mysql', 'mariadb'))
+)
+
+@sa_event.listens_for(Event, 'before_insert')
+@sa_event.listens_for(Event, 'before_update')
+def _sync_geohash(mapper, connection, target):
+    geohash = encode_geohash(target.latitude, target.longitude)
+    if target.geohash != geohash:
+        target.geohash = geohash
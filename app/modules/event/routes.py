@@ -1,20 +1,29 @@
-from flask import Blueprint, request, jsonify, current_app, send_from_directory, url_for
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
-from sqlalchemy.orm import joinedload, load_only
 
-from app.extensions import db
+from app.extensions import db, response_cache
 from app.modules.event.models import Event
-from app.modules.category.models import Category
-from app.modules.user.models import User
+from app.modules.event.serializers import (
+    PUBLIC_EVENT_FIELDS, loader_options, parse_fields, serialize_event
+)
 from app.modules.event.services import (
     create_event_service,
+    bulk_create_events_service,
     get_events_service,
     update_event_service,
     delete_event_service,
     valider_event_service,
-    get_public_events_service
+    get_public_events_service,
+    get_nearby_events_service,
+    search_public_events_service,
+    PUBLIC_LIST_NAMESPACE,
+    public_detail_namespace,
+    events_validators,
+    public_events_validators,
+    public_event_validators
 )
+from app.modules.event.images import is_immutable_name, resolve_variant, send_image
+from app.utils.conditional import conditional
 
 event_bp = Blueprint('event', __name__, url_prefix='/api/events')
 
@@ -24,8 +33,15 @@ def create_event():
     user_id = get_jwt_identity()
     return create_event_service(request, user_id)
 
+@event_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_create_events():
+    user_id = get_jwt_identity()
+    return bulk_create_events_service(request, user_id)
+
 @event_bp.route('', methods=['GET'])
 @jwt_required()  # Maintenant protégée par JWT
+@conditional(lambda: events_validators(request, get_jwt_identity()))
 def get_events():
     user_id = get_jwt_identity()
     return get_events_service(request, user_id)
@@ -49,62 +65,51 @@ def valider_event(event_id):
     return valider_event_service(event_id, user_id)
 
 @event_bp.route('/public', methods=['GET'])
+@conditional(lambda: public_events_validators(request))
+@response_cache.cached(PUBLIC_LIST_NAMESPACE)
 def get_public_events():
     return get_public_events_service(request)
 
+@event_bp.route('/public/nearby', methods=['GET'])
+@response_cache.cached(PUBLIC_LIST_NAMESPACE)
+def get_nearby_events():
+    return get_nearby_events_service(request)
+
+@event_bp.route('/public/search', methods=['GET'])
+@response_cache.cached(PUBLIC_LIST_NAMESPACE)
+def search_public_events():
+    return search_public_events_service(request)
+
 @event_bp.route('/public/<int:event_id>', methods=['GET'])
+@conditional(public_event_validators)
+@response_cache.cached(public_detail_namespace)
 def get_public_event_by_id(event_id):
+    try:
+        fields = parse_fields(request.args.get('fields'), PUBLIC_EVENT_FIELDS)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
     # Chargement optimisé avec toutes les relations nécessaires
-    event = db.session.query(Event).options(
-        joinedload(Event.organisateur).load_only(User.id, User.nom, User.email),
-        joinedload(Event.categorie).load_only(Category.id, Category.nom)
-    ).filter(Event.id == event_id, Event.type == 'public', Event.est_valide == True).first()
+    event = db.session.query(Event).options(*loader_options(fields)).filter(
+        Event.id == event_id, Event.type == 'public', Event.est_valide == True
+    ).first()
 
     if not event:
         return jsonify({"message": "Événement non trouvé ou non accessible."}), 404
 
-    statut = "à venir" if event.date > datetime.now() else "passé"
-
-    image_url = url_for('event.get_image', filename=event.image_url, _external=True) if event.image_url else None
-
-    # Organisateur
-    organisateur_info = {
-        "id": event.organisateur.id,
-        "nom": event.organisateur.nom,
-        "email": event.organisateur.email
-    } if event.organisateur else {
-        "id": None,
-        "nom": "Organisateur supprimé",
-        "email": ""
-    }
-
-    # Catégorie
-    categorie_info = {
-        "id": event.categorie.id,
-        "nom": event.categorie.nom
-    } if event.categorie else {
-        "id": None,
-        "nom": "Catégorie supprimée"
-    }
-
-    event_data = {
-        "id": event.id,
-        "titre": event.titre,
-        "description": event.description,
-        "date": event.date.isoformat(),
-        "lieu": event.lieu,
-        "latitude": event.latitude,
-        "longitude": event.longitude,
-        "image_url": image_url,
-        "type": event.type,
-        "statut": statut,
-        "categorie": categorie_info,  # Changé de categorie_id à categorie
-        "organisateur": organisateur_info
-    }
-
-    return jsonify(event_data), 200
+    return jsonify(serialize_event(event, fields)), 200
 
 @event_bp.route('/images/<filename>')
 def get_image(filename):
     upload_folder = current_app.config['UPLOAD_FOLDER']
-    return send_from_directory(upload_folder, filename)
\ No newline at end of file
+    width = request.args.get('w', type=int)
+    if not width:
+        return send_image(upload_folder, filename, immutable=is_immutable_name(filename))
+
+    # Variante la plus proche ; WebP si le client l'accepte
+    accept_webp = 'image/webp' in request.headers.get('Accept', '')
+    served = resolve_variant(upload_folder, filename, width, accept_webp)
+    # Tant que la variante n'existe pas, l'original est servi avec une durée courte
+    response = send_image(upload_folder, served, immutable=served != filename and is_immutable_name(filename))
+    response.vary.add('Accept')
+    return response
\ No newline at end of file
@@ -0,0 +1,422 @@
+import bisect
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from sqlalchemy import event, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, object_session
+
+from app.extensions import db
+from .models import Event
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+MAX_QUERY_TOKENS = 8
+TEXT_FIELDS = ('titre', 'description', 'lieu')
+
+
+def fold(value):
+    """Minuscules sans accents : « Événement privé » -> « evenement prive »."""
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def tokenize(value):
+    return TOKEN_RE.findall(fold(value))
+
+
+def max_typos(term):
+    if len(term) <= 3:
+        return 0
+    return 1 if len(term) <= 7 else 2
+
+
+def edit_distance(a, b, limit):
+    """Distance de Damerau-Levenshtein (transpositions adjacentes), coupée au-delà de ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            )
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def typo_candidates(token, terms):
+    """Termes du vocabulaire à distance d'édition tolérée de ``token``."""
+    limit = max_typos(token)
+    if not limit:
+        return []
+    return [term for term in terms if edit_distance(token, term, limit) <= limit]
+
+
+def _upper_bound(prefix):
+    return prefix + '\U0010ffff'
+
+
+# Schéma FTS5 (migration 0005_events_fts) : table virtuelle, vocabulaire et
+# triggers qui la tiennent à jour, y compris pour les UPDATE hors ORM
+FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE events_fts USING fts5("
+    "titre, description, lieu, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE events_fts_vocab USING fts5vocab(events_fts, row)",
+    "CREATE TRIGGER events_fts_ai AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_fts (rowid, titre, description, lieu) "
+    "VALUES (new.id, new.titre, coalesce(new.description, ''), new.lieu); END",
+    "CREATE TRIGGER events_fts_au AFTER UPDATE OF titre, description, lieu ON events BEGIN "
+    "DELETE FROM events_fts WHERE rowid = old.id; "
+    "INSERT INTO events_fts (rowid, titre, description, lieu) "
+    "VALUES (new.id, new.titre, coalesce(new.description, ''), new.lieu); END",
+    "CREATE TRIGGER events_fts_ad AFTER DELETE ON events BEGIN "
+    "DELETE FROM events_fts WHERE rowid = old.id; END",
+    "INSERT INTO events_fts (rowid, titre, description, lieu) "
+    "SELECT id, titre, coalesce(description, ''), lieu FROM events",
+)
+FTS_DROP = (
+    "DROP TRIGGER IF EXISTS events_fts_ad",
+    "DROP TRIGGER IF EXISTS events_fts_au",
+    "DROP TRIGGER IF EXISTS events_fts_ai",
+    "DROP TABLE IF EXISTS events_fts_vocab",
+    "DROP TABLE IF EXISTS events_fts",
+)
+
+
+class SQLiteFTSBackend:
+    """Index FTS5 (table virtuelle events_fts) tenu à jour par des triggers SQLite.
+
+    Le schéma est créé par la migration 0005_events_fts (ou ``db.create_all``) ;
+    ``flask events rebuild-search`` le recrée et le remplit à nouveau.
+
+    Le tokenizer ``unicode61 remove_diacritics 2`` replie les accents ; la
+    table fts5vocab sert à corriger les fautes de frappe.
+    """
+
+    name = 'fts5'
+    weights = (10.0, 1.0, 5.0)  # titre, description, lieu
+
+    def __init__(self):
+        self._ready = set()
+
+    def _exists(self, connection):
+        key = str(connection.engine.url)
+        if key not in self._ready and connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'events_fts'")).first():
+            self._ready.add(key)
+        return key in self._ready
+
+    def ensure(self):
+        # Pas de DDL pendant une requête : le schéma vient des migrations
+        if not self._exists(db.session.connection()):
+            raise RuntimeError("Index FTS5 absent : exécuter `flask db upgrade` ou `flask events rebuild-search`")
+
+    def rebuild(self):
+        connection = db.session.connection()
+        for statement in FTS_DROP + FTS_SCHEMA:
+            connection.exec_driver_sql(statement)
+        db.session.commit()
+        self._ready.add(str(connection.engine.url))
+
+    def on_write(self, connection, target, deleted=False):
+        pass  # triggers events_fts_*
+
+    def _has_prefix(self, token):
+        return db.session.execute(
+            text("SELECT 1 FROM events_fts_vocab WHERE term >= :lo AND term < :hi LIMIT 1"),
+            {"lo": token, "hi": _upper_bound(token)}
+        ).first() is not None
+
+    def _vocabulary(self, token):
+        # Même première lettre et longueur voisine : bornes exploitables par fts5vocab
+        limit = max_typos(token)
+        return db.session.execute(
+            text("SELECT term FROM events_fts_vocab WHERE term >= :lo AND term < :hi "
+                 "AND length(term) BETWEEN :min_len AND :max_len"),
+            {"lo": token[0], "hi": _upper_bound(token[0]),
+             "min_len": len(token) - limit, "max_len": len(token) + limit}
+        ).scalars()
+
+    def search(self, tokens, limit, offset):
+        self.ensure()
+        clauses = []
+        for token in tokens:
+            alternatives = [f'"{token}"*']
+            if not self._has_prefix(token):
+                alternatives += [f'"{term}"' for term in typo_candidates(token, self._vocabulary(token))]
+            clauses.append('(' + ' OR '.join(alternatives) + ')')
+        params = {"q": ' AND '.join(clauses), "limit": limit, "offset": offset}
+
+        visible = "events_fts MATCH :q AND e.type = 'public' AND e.est_valide = 1"
+        ids = db.session.execute(text(
+            "SELECT e.id FROM events_fts JOIN events e ON e.id = events_fts.rowid "
+            f"WHERE {visible} "
+            f"ORDER BY bm25(events_fts, {', '.join(map(str, self.weights))}), e.id "
+            "LIMIT :limit OFFSET :offset"
+        ), params).scalars().all()
+        total = db.session.execute(text(
+            f"SELECT count(*) FROM events_fts JOIN events e ON e.id = events_fts.rowid WHERE {visible}"
+        ), params).scalar()
+        return ids, total
+
+
+class MySQLFulltextBackend:
+    """Index FULLTEXT InnoDB (ft_events_text, maintenu par MySQL).
+
+    Les collations *_ci ignorent déjà les accents ; la tolérance aux fautes se
+    limite ici à la recherche par préfixe (pas de vocabulaire exploitable).
+    """
+
+    name = 'fulltext'
+    MATCH = "MATCH (titre, description, lieu) AGAINST (:q IN BOOLEAN MODE)"
+
+    def ensure(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def on_write(self, connection, target, deleted=False):
+        pass
+
+    def search(self, tokens, limit, offset):
+        params = {"q": ' '.join(f'+{token}*' for token in tokens), "limit": limit, "offset": offset}
+        visible = f"{self.MATCH} AND type = 'public' AND est_valide = 1"
+        ids = db.session.execute(text(
+            f"SELECT id FROM events WHERE {visible} ORDER BY {self.MATCH} DESC, id LIMIT :limit OFFSET :offset"
+        ), params).scalars().all()
+        total = db.session.execute(text(f"SELECT count(*) FROM events WHERE {visible}"), params).scalar()
+        return ids, total
+
+
+class MemoryIndexBackend:
+    """Index inversé en mémoire, pour les bases sans recherche plein texte.
+
+    Chargé au premier appel, puis mis à jour après chaque commit d'écriture
+    du processus. Les écritures des autres processus sont prises en compte à
+    la reconstruction complète, au plus toutes les ``rebuild_interval`` secondes.
+    """
+
+    name = 'memory'
+    weights = {'titre': 3.0, 'description': 1.0, 'lieu': 2.0}
+
+    def __init__(self, rebuild_interval=300):
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._reset()
+
+    def _reset(self):
+        self._postings = {}   # terme -> {event_id: poids}
+        self._documents = {}  # event_id -> termes indexés
+        self._visible = set()
+        self._terms = None
+
+    def _index(self, event_id, fields, visible):
+        self._remove(event_id)
+        weights = {}
+        for field, value in fields.items():
+            for term in tokenize(value):
+                weights[term] = weights.get(term, 0) + self.weights[field]
+        for term, weight in weights.items():
+            self._postings.setdefault(term, {})[event_id] = weight
+        self._documents[event_id] = set(weights)
+        if visible:
+            self._visible.add(event_id)
+        self._terms = None
+
+    def _remove(self, event_id):
+        for term in self._documents.pop(event_id, ()):
+            postings = self._postings[term]
+            postings.pop(event_id, None)
+            if not postings:
+                del self._postings[term]
+        self._visible.discard(event_id)
+        self._terms = None
+
+    def rebuild(self):
+        rows = db.session.execute(
+            select(Event.id, Event.titre, Event.description, Event.lieu, Event.type, Event.est_valide)
+        ).all()
+        with self._lock:
+            self._reset()
+            for event_id, titre, description, lieu, type_, est_valide in rows:
+                self._index(event_id, {'titre': titre, 'description': description, 'lieu': lieu},
+                            type_ == 'public' and bool(est_valide))
+            self._loaded_at = time.monotonic()
+        logger.info("Index de recherche en mémoire reconstruit (%s événements)", len(rows))
+
+    def ensure(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.rebuild_interval:
+            self.rebuild()
+
+    def on_write(self, connection, target, deleted=False):
+        session = object_session(target)
+        if session is None or self._loaded_at is None:
+            return
+        change = (target.id, None) if deleted else (target.id, (
+            {field: getattr(target, field) for field in TEXT_FIELDS},
+            target.type == 'public' and bool(target.est_valide)
+        ))
+        session.info.setdefault('search_changes', []).append(change)
+
+    def apply(self, changes):
+        with self._lock:
+            for event_id, document in changes:
+                if document is None:
+                    self._remove(event_id)
+                else:
+                    self._index(event_id, *document)
+
+    def _matching_terms(self, token):
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        start = bisect.bisect_left(self._terms, token)
+        end = bisect.bisect_left(self._terms, _upper_bound(token))
+        matches = [(term, 1.0 if term == token else 0.9) for term in self._terms[start:end]]
+        if matches:
+            return matches
+        limit = max_typos(token)
+        nearby = (term for term in self._terms if abs(len(term) - len(token)) <= limit and term[0] == token[0])
+        return [(term, 0.7) for term in typo_candidates(token, nearby)]
+
+    def search(self, tokens, limit, offset):
+        self.ensure()
+        with self._lock:
+            total_docs = max(len(self._documents), 1)
+            scores = None
+            for token in tokens:
+                token_scores = {}
+                for term, factor in self._matching_terms(token):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for event_id, weight in postings.items():
+                        if event_id in self._visible:
+                            score = factor * idf * weight / (weight + 1.2)
+                            if score > token_scores.get(event_id, 0):
+                                token_scores[event_id] = score
+                # Tous les mots de la requête doivent correspondre
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {event_id: score + token_scores[event_id]
+                              for event_id, score in scores.items() if event_id in token_scores}
+                if not scores:
+                    return [], 0
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [event_id for event_id, _ in ranked[offset:offset + limit]], len(ranked)
+
+
+def fts5_available():
+    try:
+        connection = sqlite3.connect(':memory:')
+        connection.execute("CREATE VIRTUAL TABLE probe USING fts5(content)")
+        connection.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+class EventSearch:
+    """Recherche plein texte des événements publics, backend choisi selon la base.
+
+    SEARCH_BACKEND : 'auto' (FTS5 sous SQLite, FULLTEXT sous MySQL, sinon
+    index en mémoire), 'fts5', 'fulltext' ou 'memory'.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        choice = app.config.get('SEARCH_BACKEND', 'auto')
+        if choice == 'auto':
+            dialect = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+            if dialect == 'sqlite' and fts5_available():
+                choice = 'fts5'
+            elif dialect in ('mysql', 'mariadb'):
+                choice = 'fulltext'
+            else:
+                choice = 'memory'
+
+        if choice == 'fts5':
+            self.backend = SQLiteFTSBackend()
+        elif choice == 'fulltext':
+            self.backend = MySQLFulltextBackend()
+        else:
+            self.backend = MemoryIndexBackend(app.config.get('SEARCH_REBUILD_INTERVAL', 300))
+            if not event.contains(Session, 'after_commit', _apply_memory_changes):
+                event.listen(Session, 'after_commit', _apply_memory_changes)
+                event.listen(Session, 'after_soft_rollback', _discard_memory_changes)
+        app.extensions['event_search'] = self
+        logger.debug("Recherche d'événements : backend %s", self.backend.name)
+
+    def search(self, query, limit, offset=0):
+        """Retourne ``(ids classés, total)`` des événements publics validés."""
+        tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+        if not tokens:
+            return [], 0
+        return self.backend.search(tokens, limit, offset)
+
+    def rebuild(self):
+        self.backend.rebuild()
+
+
+event_search = EventSearch()
+
+
+@event.listens_for(Event.__table__, 'after_create')
+def _create_fts_schema(target, connection, **kw):
+    # db.create_all : même schéma que la migration 0005_events_fts
+    if connection.dialect.name == 'sqlite' and fts5_available():
+        for statement in FTS_SCHEMA:
+            connection.exec_driver_sql(statement)
+
+
+def _apply_memory_changes(session):
+    changes = session.info.pop('search_changes', None)
+    if changes and isinstance(event_search.backend, MemoryIndexBackend):
+        event_search.backend.apply(changes)
+
+
+def _discard_memory_changes(session, previous_transaction):
+    session.info.pop('search_changes', None)
+
+
+def _text_changed(target):
+    state = db.inspect(target)
+    return any(state.attrs[field].history.has_changes() for field in TEXT_FIELDS + ('type', 'est_valide'))
+
+
+@event.listens_for(Event, 'after_insert')
+def _event_inserted(mapper, connection, target):
+    if event_search.backend is not None:
+        event_search.backend.on_write(connection, target)
+
+
+@event.listens_for(Event, 'after_update')
+def _event_updated(mapper, connection, target):
+    if event_search.backend is not None and _text_changed(target):
+        event_search.backend.on_write(connection, target)
+
+
+@event.listens_for(Event, 'after_delete')
+def _event_deleted(mapper, connection, target):
+    if event_search.backend is not None:
+        event_search.backend.on_write(connection, target, deleted=True)
@@ -0,0 +1,104 @@
+from datetime import datetime
+from urllib.parse import quote
+
+from flask import url_for
+from sqlalchemy.orm import joinedload, lazyload
+
+from app.modules.category.models import Category
+from app.modules.event.images import variant_urls
+from app.modules.event.models import Event
+from app.modules.user.models import User
+from app.utils.instrumentation import timed
+
+# Champs exposés par les listings ; l'ordre est celui des réponses JSON
+EVENT_FIELDS = (
+    'id', 'titre', 'description', 'date', 'lieu', 'latitude', 'longitude',
+    'image_url', 'image_urls', 'type', 'statut', 'est_valide', 'categorie', 'organisateur'
+)
+PUBLIC_EVENT_FIELDS = tuple(f for f in EVENT_FIELDS if f != 'est_valide')
+
+ORGANISATEUR_SUPPRIME = {"id": None, "nom": "Organisateur supprimé", "email": ""}
+CATEGORIE_SUPPRIMEE = {"id": None, "nom": "Catégorie supprimée"}
+
+
+def parse_fields(value, allowed):
+    """Lit ``?fields=id,titre,date`` ; lève ValueError sur un champ inconnu."""
+    if not value:
+        return allowed
+    fields = tuple(f.strip() for f in value.split(',') if f.strip())
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Champs inconnus : {', '.join(unknown)}")
+    return fields or allowed
+
+
+def loader_options(fields):
+    # Ne joindre organisateur/catégorie que si la réponse les contient
+    return [
+        joinedload(Event.organisateur).load_only(User.id, User.nom, User.email)
+        if 'organisateur' in fields else lazyload(Event.organisateur),
+        joinedload(Event.categorie).load_only(Category.id, Category.nom)
+        if 'categorie' in fields else lazyload(Event.categorie),
+    ]
+
+
+def image_url_prefix():
+    # Un seul url_for par réponse : le nom de fichier est ajouté au préfixe
+    return url_for('event.get_image', filename='_', _external=True)[:-1]
+
+
+def _statut(event, now):
+    if not event.est_valide:
+        return "en attente"
+    return "à venir" if event.date > now else "passé"
+
+
+def _organisateur(event):
+    organisateur = event.organisateur
+    if not organisateur:
+        return dict(ORGANISATEUR_SUPPRIME)
+    return {"id": organisateur.id, "nom": organisateur.nom, "email": organisateur.email}
+
+
+def _categorie(event):
+    categorie = event.categorie
+    if not categorie:
+        return dict(CATEGORIE_SUPPRIMEE)
+    return {"id": categorie.id, "nom": categorie.nom}
+
+
+def _compile(fields, now, prefix):
+    getters = {
+        'id': lambda e: e.id,
+        'titre': lambda e: e.titre,
+        'description': lambda e: e.description,
+        'date': lambda e: e.date.isoformat(),
+        'lieu': lambda e: e.lieu,
+        'latitude': lambda e: e.latitude,
+        'longitude': lambda e: e.longitude,
+        'image_url': lambda e: prefix + quote(e.image_url) if e.image_url else None,
+        'image_urls': lambda e: variant_urls(prefix + quote(e.image_url)) if e.image_url else None,
+        'type': lambda e: e.type,
+        'statut': lambda e: _statut(e, now),
+        'est_valide': lambda e: e.est_valide,
+        'categorie': _categorie,
+        'organisateur': _organisateur,
+    }
+    selected = [(name, getters[name]) for name in fields]
+    return lambda event: {name: get(event) for name, get in selected}
+
+
+def serialize_events(events, fields=EVENT_FIELDS, prefix=None):
+    """Sérialise un lot d'événements avec un convertisseur compilé une seule fois.
+
+    ``prefix`` (URL des images) est calculé par url_for s'il n'est pas fourni.
+    """
+    with timed('serialize'):
+        if prefix is None:
+            prefix = image_url_prefix() if 'image_url' in fields or 'image_urls' in fields else ''
+        convert = _compile(fields, datetime.now(), prefix)
+        return [convert(event) for event in events]
+
+
+def serialize_event(event, fields=EVENT_FIELDS):
+    return serialize_events([event], fields)[0]
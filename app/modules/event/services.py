@@ -1,18 +1,79 @@
 from flask import request, jsonify, current_app, url_for
 from datetime import datetime
-from app.extensions import db
+from app.extensions import db, response_cache
 from app.modules.event.models import Event
 from app.modules.user.models import User
 from app.modules.category.models import Category
-from werkzeug.utils import secure_filename
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload, load_only
+from app.modules.event.utils import keyset_paginate, parse_limit, parse_with_total
+from app.modules.event.serializers import (
+    EVENT_FIELDS, PUBLIC_EVENT_FIELDS, loader_options, parse_fields, serialize_events
+)
+from app.modules.event.search import event_search
+from app.modules.event.images import image_processor, variant_urls
+from app.modules.event.uploads import (
+    UploadError, acquire_image, discard_upload, purge_unreferenced, release_image, store_upload
+)
+from app.modules.event.geo import bounding_box, covering_prefixes, haversine_km, prefix_filter
+from app.utils.bulk import BulkInputError, chunked, read_bulk_rows
+from app.utils.conditional import request_signature
 
-import os
 import logging
-import uuid
 
 logger = logging.getLogger(__name__)
 
+PUBLIC_LIST_NAMESPACE = 'events:public:list'
+# Listes authentifiées (GET /api/events) : non mises en cache, la génération sert d'ETag
+EVENTS_LIST_NAMESPACE = 'events:list'
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+MAX_SEARCH_OFFSET = 1000
+
+def public_detail_namespace(event_id):
+    return f"events:public:{event_id}"
+
+def save_event_image(image):
+    config = current_app.config
+    return store_upload(
+        image,
+        config['UPLOAD_FOLDER'],
+        config['ALLOWED_EXTENSIONS'],
+        config['MAX_IMAGE_SIZE'],
+        config['IMAGE_MAX_PIXELS']
+    )
+
+def is_public_event(event):
+    return event.type == 'public' and bool(event.est_valide)
+
+def public_event_ids(**criteria):
+    return db.session.scalars(
+        select(Event.id).filter_by(type='public', est_valide=True, **criteria)
+    ).all()
+
+def invalidate_event_lists(event_ids=()):
+    # Listes, et fiches publiques de ``event_ids`` quand une donnée jointe
+    # (catégorie, organisateur) change
+    response_cache.invalidate(
+        PUBLIC_LIST_NAMESPACE, EVENTS_LIST_NAMESPACE, *(public_detail_namespace(i) for i in event_ids)
+    )
+
+def invalidate_event_cache(event_id, *visible):
+    # Listes authentifiées : toujours ; cache public seulement si l'événement
+    # était ou devient visible publiquement
+    response_cache.invalidate(EVENTS_LIST_NAMESPACE)
+    if any(visible):
+        response_cache.invalidate(PUBLIC_LIST_NAMESPACE, public_detail_namespace(event_id))
+
+def parse_capacity(value):
+    # Vide ou absent : capacité illimitée
+    if value is None or str(value).strip() == '':
+        return None
+    capacity = int(value)
+    if capacity < 0:
+        raise ValueError
+    return capacity
+
 def normalize_event_type(type_str):
     if not type_str:
         return None
@@ -27,6 +88,7 @@ def normalize_event_type(type_str):
     return mapping.get(type_str, type_str)
 
 def create_event_service(request, user_id):
+    upload = None
     try:
         try:
             user_id_int = int(user_id)
@@ -61,24 +123,21 @@ def create_event_service(request, user_id):
         est_valide_str = request.form.get('est_valide', 'false').lower()
         est_valide = est_valide_str in ['true', '1', 'yes', 'vrai', 'oui']
 
+        try:
+            capacity = parse_capacity(request.form.get('capacity'))
+        except ValueError:
+            return jsonify({"message": "La capacité doit être un entier positif."}), 400
+
         image = request.files.get('image')
         image_filename = None
         if image and image.filename != '':
-            max_size = current_app.config.get('MAX_CONTENT_LENGTH', 10 * 1024 * 1024)
-            if image.content_length > max_size:
-                return jsonify({
-                    "message": f"La taille de l'image dépasse la limite autorisée ({max_size//1024//1024}MB)"
-                }), 413
-
-            filename = secure_filename(image.filename)
-            ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-            unique_filename = f"{uuid.uuid4().hex}.{ext}" if ext else uuid.uuid4().hex
-
-            upload_folder = current_app.config['UPLOAD_FOLDER']
-            os.makedirs(upload_folder, exist_ok=True)
-            image_path = os.path.join(upload_folder, unique_filename)
-            image.save(image_path)
-            image_filename = unique_filename
+            try:
+                upload = save_event_image(image)
+                acquire_image(current_app.config['UPLOAD_FOLDER'], upload)
+            except UploadError as e:
+                db.session.rollback()
+                return jsonify({"message": e.message}), e.status
+            image_filename = upload.filename
 
         event = Event(
             titre=titre,
@@ -90,12 +149,16 @@ def create_event_service(request, user_id):
             image_url=image_filename,
             type=normalized_type,
             est_valide=est_valide,
+            capacity=capacity,
             categorie_id=int(categorie_id),
             organisateur_id=user_id_int
         )
 
         db.session.add(event)
         db.session.commit()
+        invalidate_event_cache(event.id, is_public_event(event))
+        if upload is not None and upload.created:
+            image_processor.submit(current_app.config['UPLOAD_FOLDER'], image_filename)
 
         image_url = url_for('event.get_image', filename=event.image_url, _external=True) if event.image_url else None
 
@@ -104,160 +167,256 @@ def create_event_service(request, user_id):
             "event_id": event.id,
             "type": normalized_type,
             "est_valide": est_valide,
-            "image_url": image_url
+            "capacity": capacity,
+            "image_url": image_url,
+            "image_urls": variant_urls(image_url) if image_url else None
         }), 201
 
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Erreur création événement: {str(e)}", exc_info=True)
+        discard_upload(current_app.config['UPLOAD_FOLDER'], upload)
+        logger.error("Erreur création événement: %s", e, exc_info=True)
         return jsonify({"message": f"Erreur lors de la création : {str(e)}"}), 500
 
-def get_events_service(request, current_user_id=None):
+def validate_event_row(row, category_ids):
+    """Valeurs d'un événement importé, ou ValueError avec le message de la ligne."""
+    if not isinstance(row, dict):
+        raise ValueError("Ligne invalide : objet attendu.")
+    titre, date_str, lieu, categorie_id = (row.get(key) for key in ('titre', 'date', 'lieu', 'categorie_id'))
+    if not all([titre, date_str, lieu, categorie_id]):
+        raise ValueError("Les champs titre, date, lieu et categorie_id sont requis.")
+    if len(str(titre)) > 100:
+        raise ValueError("Le titre ne doit pas dépasser 100 caractères.")
+    try:
+        date = datetime.fromisoformat(str(date_str))
+    except ValueError:
+        raise ValueError("Le format de date est invalide. Utilisez YYYY-MM-DDTHH:MM:SS")
     try:
-        type_filter = request.args.get('type')
-        categorie_id = request.args.get('categorie_id')
+        categorie_id = int(categorie_id)
+    except (TypeError, ValueError):
+        raise ValueError("categorie_id doit être un entier.")
+    if categorie_id not in category_ids:
+        raise ValueError("Catégorie non trouvée.")
+    try:
+        latitude = float(row.get('latitude') or 0)
+        longitude = float(row.get('longitude') or 0)
+    except (TypeError, ValueError):
+        raise ValueError("Latitude et longitude doivent être des nombres.")
+    try:
+        capacity = parse_capacity(row.get('capacity'))
+    except ValueError:
+        raise ValueError("La capacité doit être un entier positif.")
+
+    return {
+        "titre": str(titre),
+        "description": row.get('description') or None,
+        "date": date,
+        "lieu": str(lieu),
+        "latitude": latitude,
+        "longitude": longitude,
+        "type": normalize_event_type(str(row.get('type') or 'public')) or 'public',
+        "est_valide": str(row.get('est_valide', 'false')).lower() in ['true', '1', 'yes', 'vrai', 'oui'],
+        "capacity": capacity,
+        "categorie_id": categorie_id,
+    }
 
-        # Vérifier si l'utilisateur est admin
-        is_admin = False
-        if current_user_id:
-            user = User.query.get(current_user_id)
-            if user and user.role in ['admin', 'super_admin']:
-                is_admin = True
+def bulk_create_events_service(request, user_id):
+    """Import d'événements (JSON ou CSV) avec un résultat par ligne.
 
-        # Chargement optimisé avec toutes les relations nécessaires
-        query = db.session.query(Event).options(
-            joinedload(Event.organisateur).load_only(User.id, User.nom, User.email),
-            joinedload(Event.categorie).load_only(Category.id, Category.nom)
-        )
+    Toutes les lignes sont validées d'abord (catégories chargées en une
+    requête), puis insérées par lots de BULK_CHUNK_SIZE, une transaction par
+    lot. Les insertions passent par l'ORM : l'unité de travail les regroupe
+    en INSERT multi-lignes et les hooks (geohash, index de recherche,
+    compteurs du tableau de bord) restent appliqués.
+    """
+    try:
+        user_id_int = int(user_id)
+    except ValueError:
+        return jsonify({"message": "ID utilisateur invalide."}), 400
 
-        # Appliquer le filtre utilisateur si nécessaire
-        if current_user_id and not is_admin:
-            query = query.filter(Event.organisateur_id == current_user_id)
+    config = current_app.config
+    try:
+        rows, _ = read_bulk_rows(request, 'events', config['BULK_MAX_ROWS'])
+    except BulkInputError as e:
+        return jsonify({"message": e.message}), e.status
 
-        if type_filter:
-            normalized_type = normalize_event_type(type_filter)
-            if normalized_type:
-                query = query.filter(Event.type == normalized_type)
+    requested = set()
+    for row in rows:
+        try:
+            requested.add(int(row.get('categorie_id')))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    category_ids = set(db.session.execute(
+        select(Category.id).where(Category.id.in_(requested))
+    ).scalars()) if requested else set()
+
+    results = [None] * len(rows)
+    valid = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, validate_event_row(row, category_ids)))
+        except ValueError as e:
+            results[index] = {"index": index, "status": 400, "message": str(e)}
+
+    created = 0
+    public_created = False
+    for _, chunk in chunked(valid, config['BULK_CHUNK_SIZE']):
+        events = [Event(organisateur_id=user_id_int, **values) for _, values in chunk]
+        try:
+            db.session.add_all(events)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Erreur import d'événements (lot de %s): %s", len(chunk), e, exc_info=True)
+            for index, _ in chunk:
+                results[index] = {"index": index, "status": 500, "message": "Erreur lors de l'enregistrement du lot."}
+            continue
+        for (index, _), event in zip(chunk, events):
+            results[index] = {"index": index, "status": 201, "event_id": event.id}
+            public_created = public_created or is_public_event(event)
+        created += len(events)
+
+    if public_created:
+        invalidate_event_lists()
+    errors = len(rows) - created
+    logger.info("Import d'événements : %s créé(s), %s erreur(s)", created, errors)
+    status = 201 if not errors else (207 if created else 400)
+    return jsonify({
+        "message": f"{created} événement(s) créé(s), {errors} erreur(s).",
+        "created": created,
+        "errors": errors,
+        "results": results
+    }), status
+
+def build_events_filters(request, current_user_id=None):
+    type_filter = request.args.get('type')
+    categorie_id = request.args.get('categorie_id')
+    filters = []
+
+    # Vérifier si l'utilisateur est admin
+    is_admin = False
+    if current_user_id:
+        user = User.query.get(current_user_id)
+        if user and user.role in ['admin', 'super_admin']:
+            is_admin = True
+
+    # Appliquer le filtre utilisateur si nécessaire
+    if current_user_id and not is_admin:
+        filters.append(Event.organisateur_id == current_user_id)
+
+    if type_filter:
+        normalized_type = normalize_event_type(type_filter)
+        if normalized_type:
+            filters.append(Event.type == normalized_type)
+
+    if categorie_id:
+        try:
+            filters.append(Event.categorie_id == int(categorie_id))
+        except ValueError:
+            pass
 
-        if categorie_id:
-            try:
-                categorie_id_int = int(categorie_id)
-                query = query.filter(Event.categorie_id == categorie_id_int)
-            except ValueError:
-                pass
+    return filters, is_admin
 
-        query = query.order_by(Event.date.desc())
-        events = query.all()
-
-        now = datetime.now()
-        result = []
-        for event in events:
-            statut = "en attente"
-            if event.est_valide:
-                statut = "à venir" if event.date > now else "passé"
-
-            image_url = url_for('event.get_image', filename=event.image_url, _external=True) if event.image_url else None
-
-            # Organisateur
-            organisateur_info = {
-                "id": event.organisateur.id,
-                "nom": event.organisateur.nom,
-                "email": event.organisateur.email
-            } if event.organisateur else {
-                "id": None,
-                "nom": "Organisateur supprimé",
-                "email": ""
-            }
-
-            # Catégorie
-            categorie_info = {
-                "id": event.categorie.id,
-                "nom": event.categorie.nom
-            } if event.categorie else {
-                "id": None,
-                "nom": "Catégorie supprimée"
-            }
-
-            result.append({
-                "id": event.id,
-                "titre": event.titre,
-                "description": event.description,
-                "date": event.date.isoformat(),
-                "lieu": event.lieu,
-                "latitude": event.latitude,
-                "longitude": event.longitude,
-                "image_url": image_url,
-                "type": event.type,
-                "statut": statut,
-                "est_valide": event.est_valide,
-                "categorie": categorie_info,  # Changé de categorie_id à categorie
-                "organisateur": organisateur_info
-            })
+def generation_validators(namespace, *extra):
+    # ETag tiré de la génération du cache (voir ResponseCache.validator). Pas de
+    # Last-Modified : une suppression ne le ferait pas avancer.
+    etag = response_cache.validator(namespace, request_signature(), *extra)
+    return None if etag is None else (etag, None)
 
-        return jsonify({
+def events_validators(request, current_user_id=None):
+    _, is_admin = build_events_filters(request, current_user_id)
+    return generation_validators(EVENTS_LIST_NAMESPACE, current_user_id, is_admin)
+
+def public_events_validators(request):
+    return generation_validators(PUBLIC_LIST_NAMESPACE)
+
+def public_event_validators(event_id):
+    # Même espace de noms que le cache : l'ETag ne peut pas devancer le corps mis en cache
+    return generation_validators(public_detail_namespace(event_id))
+
+def get_events_service(request, current_user_id=None):
+    try:
+        try:
+            fields = parse_fields(request.args.get('fields'), EVENT_FIELDS)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        filters, is_admin = build_events_filters(request, current_user_id)
+
+        # Chargement optimisé avec toutes les relations nécessaires
+        query = db.session.query(Event).options(*loader_options(fields)).filter(*filters)
+
+        # Pagination par curseur si demandée (cursor/limit, total sur with_total=1),
+        # sinon liste complète (compatibilité)
+        next_cursor = None
+        total = None
+        keyset = 'cursor' in request.args or 'limit' in request.args
+        if keyset:
+            try:
+                events, next_cursor, total = keyset_paginate(
+                    query,
+                    cursor=request.args.get('cursor'),
+                    limit=parse_limit(request.args.get('limit')),
+                    with_total=parse_with_total(request.args.get('with_total'))
+                )
+            except ValueError as e:
+                return jsonify({"message": str(e)}), 400
+        else:
+            events = query.order_by(Event.date.desc()).all()
+
+        result = serialize_events(events, fields)
+
+        response = {
             "events": result,
-            "total": len(result),
+            "total": total if keyset else len(result),
             "is_admin": is_admin
-        }), 200
+        }
+        if keyset:
+            response["next_cursor"] = next_cursor
+
+        return jsonify(response), 200
 
     except Exception as e:
-        logger.error(f"Erreur récupération événements: {str(e)}", exc_info=True)
+        logger.error("Erreur récupération événements: %s", e, exc_info=True)
         return jsonify({"message": f"Erreur lors de la récupération des événements: {str(e)}"}), 500
 
 def get_public_events_service(request):
     try:
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
+        try:
+            fields = parse_fields(request.args.get('fields'), PUBLIC_EVENT_FIELDS)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
 
         # Charger aussi la catégorie avec le nom
-        query = Event.query.options(
-            joinedload(Event.organisateur).load_only(User.id, User.nom, User.email),
-            joinedload(Event.categorie).load_only(Category.id, Category.nom)  # Ajouté
-        ).filter_by(type='public', est_valide=True)
-
-        events = query.paginate(page=page, per_page=per_page, error_out=False)
-        now = datetime.now()
-
-        result = []
-        for event in events.items:
-            statut = "à venir" if event.date > now else "passé"
-
-            image_url = url_for('event.get_image', filename=event.image_url, _external=True) if event.image_url else None
-
-            # Organisateur
-            organisateur_info = {
-                "id": event.organisateur.id,
-                "nom": event.organisateur.nom,
-                "email": event.organisateur.email
-            } if event.organisateur else {
-                "id": None,
-                "nom": "Organisateur supprimé",
-                "email": ""
-            }
-            
-            # Nouveau : Information de la catégorie
-            categorie_info = {
-                "id": event.categorie.id,
-                "nom": event.categorie.nom
-            } if event.categorie else {
-                "id": None,
-                "nom": "Catégorie supprimée"
-            }
-
-            result.append({
-                "id": event.id,
-                "titre": event.titre,
-                "description": event.description,
-                "date": event.date.isoformat(),
-                "lieu": event.lieu,
-                "latitude": event.latitude,
-                "longitude": event.longitude,
-                "image_url": image_url,
-                "type": event.type,
-                "statut": statut,
-                "categorie": categorie_info,  # Changé de categorie_id à categorie
-                "organisateur": organisateur_info
-            })
+        query = Event.query.options(*loader_options(fields)).filter_by(type='public', est_valide=True)
+
+        # Pagination par curseur (cursor/limit) : coût constant quelle que soit la page,
+        # total (COUNT(*)) seulement avec with_total=1
+        keyset = 'cursor' in request.args or 'limit' in request.args
+        if keyset:
+            try:
+                items, next_cursor, total = keyset_paginate(
+                    query,
+                    cursor=request.args.get('cursor'),
+                    limit=parse_limit(request.args.get('limit')),
+                    with_total=parse_with_total(request.args.get('with_total'))
+                )
+            except ValueError as e:
+                return jsonify({"message": str(e)}), 400
+        else:
+            page = int(request.args.get('page', 1))
+            per_page = int(request.args.get('per_page', 10))
+            events = query.paginate(page=page, per_page=per_page, error_out=False)
+            items = events.items
+
+        result = serialize_events(items, fields)
+
+        if keyset:
+            return jsonify({
+                "events": result,
+                "total": total,
+                "next_cursor": next_cursor
+            }), 200
 
         return jsonify({
             "events": result,
@@ -267,9 +426,111 @@ def get_public_events_service(request):
         }), 200
 
     except Exception as e:
-        logger.error(f"Erreur récupération événements publics: {str(e)}", exc_info=True)
+        logger.error("Erreur récupération événements publics: %s", e, exc_info=True)
         return jsonify({"message": f"Erreur lors de la récupération des événements publics: {str(e)}"}), 500
 
+def load_ranked_events(event_ids, fields):
+    """Charge les événements en une requête en conservant l'ordre de ``event_ids``."""
+    if not event_ids:
+        return []
+    position = {event_id: index for index, event_id in enumerate(event_ids)}
+    events = Event.query.options(*loader_options(fields)).filter(Event.id.in_(event_ids)).all()
+    return sorted(events, key=lambda event: position[event.id])
+
+def parse_nearby_area(args):
+    """Retourne ``(centre, rayon_km, bbox)`` depuis ``lat``/``lng``/``radius_km`` ou ``bbox``.
+
+    ``bbox`` suit l'ordre GeoJSON : min_lng,min_lat,max_lng,max_lat. Les zones
+    traversant l'antiméridien ne sont pas gérées (la boîte est tronquée).
+    """
+    try:
+        if args.get('bbox'):
+            min_lng, min_lat, max_lng, max_lat = (float(v) for v in args['bbox'].split(','))
+            if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lng <= max_lng <= 180):
+                raise ValueError
+            center = ((min_lat + max_lat) / 2, (min_lng + max_lng) / 2)
+            return center, None, (min_lat, min_lng, max_lat, max_lng)
+
+        lat, lng = float(args['lat']), float(args['lng'])
+        radius_km = float(args.get('radius_km', DEFAULT_RADIUS_KM))
+    except (KeyError, ValueError):
+        raise ValueError("Paramètres requis : 'lat' et 'lng' (et 'radius_km' optionnel), "
+                         "ou 'bbox=min_lng,min_lat,max_lng,max_lat'.")
+
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Coordonnées invalides.")
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValueError(f"'radius_km' doit être compris entre 0 et {MAX_RADIUS_KM}.")
+    return (lat, lng), radius_km, bounding_box(lat, lng, radius_km)
+
+def get_nearby_events_service(request):
+    try:
+        try:
+            fields = parse_fields(request.args.get('fields'), PUBLIC_EVENT_FIELDS)
+            (lat, lng), radius_km, (min_lat, min_lng, max_lat, max_lng) = parse_nearby_area(request.args)
+            limit = parse_limit(request.args.get('limit'))
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        # 1. Élagage par l'index : intervalles de geohash couvrant la zone, puis boîte exacte
+        candidates = db.session.execute(
+            select(Event.id, Event.latitude, Event.longitude).where(
+                Event.type == 'public',
+                Event.est_valide == True,
+                prefix_filter(Event.geohash, covering_prefixes(min_lat, min_lng, max_lat, max_lng)),
+                Event.latitude.between(min_lat, max_lat),
+                Event.longitude.between(min_lng, max_lng)
+            )
+        ).all()
+
+        # 2. Distance exacte sur les seuls candidats
+        matches = []
+        for event_id, event_lat, event_lng in candidates:
+            distance = haversine_km(lat, lng, event_lat, event_lng)
+            if radius_km is None or distance <= radius_km:
+                matches.append((distance, event_id))
+        matches.sort()
+
+        distances = {event_id: distance for distance, event_id in matches[:limit]}
+        events = load_ranked_events(list(distances), fields)
+
+        result = serialize_events(events, fields)
+        for item, event in zip(result, events):
+            item['distance_km'] = round(distances[event.id], 3)
+
+        return jsonify({
+            "events": result,
+            "total": len(matches)
+        }), 200
+
+    except Exception as e:
+        logger.error("Erreur recherche événements à proximité: %s", e, exc_info=True)
+        return jsonify({"message": f"Erreur lors de la recherche des événements à proximité: {str(e)}"}), 500
+
+def search_public_events_service(request):
+    try:
+        query = (request.args.get('q') or '').strip()
+        if not query:
+            return jsonify({"message": "Le paramètre 'q' est requis."}), 400
+        try:
+            fields = parse_fields(request.args.get('fields'), PUBLIC_EVENT_FIELDS)
+            limit = parse_limit(request.args.get('limit'))
+            offset = int(request.args.get('offset', 0))
+            if not 0 <= offset <= MAX_SEARCH_OFFSET:
+                raise ValueError(f"'offset' doit être compris entre 0 et {MAX_SEARCH_OFFSET}.")
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        event_ids, total = event_search.search(query, limit, offset)
+        return jsonify({
+            "events": serialize_events(load_ranked_events(event_ids, fields), fields),
+            "total": total
+        }), 200
+
+    except Exception as e:
+        logger.error("Erreur recherche événements: %s", e, exc_info=True)
+        return jsonify({"message": f"Erreur lors de la recherche des événements: {str(e)}"}), 500
+
 def update_event_service(request, event_id, user_id):
     event = Event.query.get_or_404(event_id)
 
@@ -281,6 +542,9 @@ def update_event_service(request, event_id, user_id):
     if event.organisateur_id != user_id_int:
         return jsonify({"message": "Non autorisé à modifier cet événement."}), 403
 
+    was_public = is_public_event(event)
+    upload = None
+    upload_folder = current_app.config['UPLOAD_FOLDER']
     try:
         data = request.form.to_dict()
         files = request.files
@@ -318,39 +582,41 @@ def update_event_service(request, event_id, user_id):
             except ValueError:
                 pass
 
+        if 'capacity' in data:
+            try:
+                event.capacity = parse_capacity(data['capacity'])
+            except ValueError:
+                return jsonify({"message": "La capacité doit être un entier positif."}), 400
+
+        old_image = None
         if 'image' in files:
             image = files['image']
             if image.filename != '':
-                max_size = current_app.config.get('MAX_CONTENT_LENGTH', 10 * 1024 * 1024)
-                if image.content_length > max_size:
-                    return jsonify({
-                        "message": f"La taille de l'image dépasse la limite autorisée ({max_size//1024//1024}MB)"
-                    }), 413
-
-                if event.image_url:
-                    try:
-                        upload_folder = current_app.config['UPLOAD_FOLDER']
-                        old_image_path = os.path.join(upload_folder, event.image_url)
-                        if os.path.exists(old_image_path):
-                            os.remove(old_image_path)
-                    except Exception as e:
-                        logger.error(f"Erreur suppression ancienne image: {str(e)}")
-
-                filename = secure_filename(image.filename)
-                ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-                unique_filename = f"{uuid.uuid4().hex}.{ext}" if ext else uuid.uuid4().hex
-
-                upload_folder = current_app.config['UPLOAD_FOLDER']
-                os.makedirs(upload_folder, exist_ok=True)
-                image_path = os.path.join(upload_folder, unique_filename)
-                image.save(image_path)
-                event.image_url = unique_filename
+                try:
+                    upload = save_event_image(image)
+                    if upload.filename != event.image_url:
+                        acquire_image(upload_folder, upload)
+                except UploadError as e:
+                    db.session.rollback()
+                    return jsonify({"message": e.message}), e.status
+
+                if upload.filename != event.image_url:
+                    if event.image_url:
+                        release_image(event.image_url)
+                        old_image = event.image_url
+                    event.image_url = upload.filename
 
         if 'est_valide' in data:
             est_valide_str = data['est_valide'].lower()
             event.est_valide = est_valide_str in ['true', '1', 'yes', 'vrai', 'oui']
 
         db.session.commit()
+        invalidate_event_cache(event.id, was_public, is_public_event(event))
+        if upload is not None and upload.created:
+            image_processor.submit(upload_folder, upload.filename)
+        if old_image:
+            # L'ancienne image n'est supprimée que si aucun autre événement ne l'utilise
+            purge_unreferenced(upload_folder, old_image)
 
         image_url = url_for('event.get_image', filename=event.image_url, _external=True) if event.image_url else None
 
@@ -358,12 +624,15 @@ def update_event_service(request, event_id, user_id):
             "message": "Événement mis à jour avec succès.",
             "type": event.type,
             "est_valide": event.est_valide,
-            "image_url": image_url
+            "capacity": event.capacity,
+            "image_url": image_url,
+            "image_urls": variant_urls(image_url) if image_url else None
         }), 200
 
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Erreur mise à jour événement {event_id}: {str(e)}", exc_info=True)
+        discard_upload(current_app.config['UPLOAD_FOLDER'], upload)
+        logger.error("Erreur mise à jour événement %s: %s", event_id, e, exc_info=True)
         return jsonify({"message": f"Erreur lors de la mise à jour : {str(e)}"}), 500
 
 def delete_event_service(event_id, user_id):
@@ -378,22 +647,22 @@ def delete_event_service(event_id, user_id):
         return jsonify({"message": "Non autorisé à supprimer cet événement."}), 403
 
     try:
-        if event.image_url:
-            try:
-                upload_folder = current_app.config['UPLOAD_FOLDER']
-                image_path = os.path.join(upload_folder, event.image_url)
-                if os.path.exists(image_path):
-                    os.remove(image_path)
-            except Exception as e:
-                logger.error(f"Erreur suppression image: {str(e)}")
+        image_filename = event.image_url
+        if image_filename:
+            release_image(image_filename)
 
+        was_public = is_public_event(event)
         db.session.delete(event)
         db.session.commit()
+        invalidate_event_cache(event_id, was_public)
+        if image_filename:
+            # Fichier et variantes supprimés seulement s'ils ne sont plus référencés
+            purge_unreferenced(current_app.config['UPLOAD_FOLDER'], image_filename)
         return jsonify({"message": "Événement supprimé avec succès."}), 200
 
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Erreur suppression événement {event_id}: {str(e)}", exc_info=True)
+        logger.error("Erreur suppression événement %s: %s", event_id, e, exc_info=True)
         return jsonify({"message": f"Erreur lors de la suppression : {str(e)}"}), 500
 
 def valider_event_service(event_id, user_id):
@@ -408,8 +677,10 @@ def valider_event_service(event_id, user_id):
         return jsonify({"message": "Non autorisé à valider cet événement."}), 403
 
     try:
+        was_public = is_public_event(event)
         event.est_valide = True
         db.session.commit()
+        invalidate_event_cache(event.id, was_public, is_public_event(event))
         return jsonify({
             "message": "Événement validé avec succès.",
             "est_valide": True
@@ -417,5 +688,5 @@ def valider_event_service(event_id, user_id):
 
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Erreur validation événement {event_id}: {str(e)}", exc_info=True)
+        logger.error("Erreur validation événement %s: %s", event_id, e, exc_info=True)
         return jsonify({"message": f"Erreur lors de la validation : {str(e)}"}), 500
\ No newline at end of file
@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou limité au processus
+    fcntl = None
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.modules.event.images import image_pixels, remove_variants
+from app.modules.event.models import StoredImage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Signatures reconnues : extension canonique du fichier stocké
+MAGIC_BYTES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+EXTENSION_ALIASES = {'jpeg': 'jpg'}
+LOCK_FILENAME = '.uploads.lock'
+
+_process_lock = threading.Lock()
+
+
+class UploadError(ValueError):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+@dataclass
+class StoredUpload:
+    filename: str
+    sha256: str
+    size: int
+    created: bool  # False si le contenu existait déjà (doublon)
+
+
+@contextmanager
+def uploads_lock(folder):
+    """Verrou du dossier d'uploads (threads et workers) : apparition et suppression des fichiers.
+
+    ``store_upload`` y décide si le contenu existe déjà ; ``purge_unreferenced``
+    y supprime la ligne puis le fichier ; ``acquire_image`` y vérifie que le
+    fichier d'une nouvelle ligne est toujours présent.
+    """
+    with _process_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, LOCK_FILENAME), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def sniff_extension(head):
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for signature, ext in MAGIC_BYTES:
+        if head.startswith(signature):
+            return ext
+    return None
+
+
+def store_upload(file_storage, folder, allowed_extensions, max_size, max_pixels=None):
+    """Enregistre l'image reçue sous ``<sha256>.<ext>`` dans ``folder``.
+
+    Le flux est copié par blocs dans un fichier temporaire du même dossier en
+    calculant l'empreinte : la taille réelle est contrôlée octet par octet et
+    le type est déduit des premiers octets, pas du nom ni du Content-Type
+    fournis par le client. Avec Pillow, les dimensions déclarées sont
+    bornées par ``max_pixels`` avant tout décodage. Un contenu déjà présent
+    n'est pas réécrit.
+    """
+    filename = file_storage.filename or ''
+    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+    allowed = {EXTENSION_ALIASES.get(e, e) for e in allowed_extensions}
+    if EXTENSION_ALIASES.get(ext, ext) not in allowed:
+        raise UploadError(f"Extension non autorisée. Formats acceptés : {', '.join(sorted(allowed_extensions))}", 415)
+
+    os.makedirs(folder, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    head = b''
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.upload-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadError(
+                        f"La taille de l'image dépasse la limite autorisée ({max_size // 1024 // 1024}MB)", 413
+                    )
+                if len(head) < 16:
+                    head += chunk[:16 - len(head)]
+                digest.update(chunk)
+                tmp.write(chunk)
+
+        if size == 0:
+            raise UploadError("Le fichier image est vide.")
+        detected = sniff_extension(head)
+        if detected is None or detected not in allowed:
+            raise UploadError("Le contenu du fichier n'est pas une image autorisée.", 415)
+        if max_pixels:
+            try:
+                pixels = image_pixels(tmp_path)
+            except ValueError:
+                raise UploadError("Le fichier image est illisible.")
+            if pixels is not None and pixels > max_pixels:
+                raise UploadError(f"Dimensions de l'image trop grandes (maximum {max_pixels} pixels).")
+
+        sha256 = digest.hexdigest()
+        stored_name = f"{sha256}.{detected}"
+        target = os.path.join(folder, stored_name)
+        with uploads_lock(folder):
+            if os.path.exists(target):
+                os.remove(tmp_path)
+                return StoredUpload(stored_name, sha256, size, created=False)
+            os.replace(tmp_path, target)
+        return StoredUpload(stored_name, sha256, size, created=True)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def acquire_image(folder, upload):
+    """Ajoute une référence à l'image dans la transaction en cours.
+
+    Lève UploadError (409) si le contenu dédupliqué a été purgé entre
+    ``store_upload`` et cet appel : le client doit renvoyer l'image.
+    """
+    result = db.session.execute(
+        update(StoredImage)
+        .where(StoredImage.filename == upload.filename)
+        .values(ref_count=StoredImage.ref_count + 1)
+    )
+    if result.rowcount:
+        # Ligne verrouillée jusqu'au commit : une purge concurrente ne la supprimera pas
+        return
+    with uploads_lock(folder):
+        if not os.path.exists(os.path.join(folder, upload.filename)):
+            raise UploadError("L'image a été supprimée pendant l'envoi, veuillez la renvoyer.", 409)
+    try:
+        with db.session.begin_nested():
+            db.session.add(StoredImage(filename=upload.filename, sha256=upload.sha256, size=upload.size, ref_count=1))
+    except IntegrityError:
+        # Insertion concurrente du même contenu : l'autre ligne existe désormais
+        db.session.execute(
+            update(StoredImage)
+            .where(StoredImage.filename == upload.filename)
+            .values(ref_count=StoredImage.ref_count + 1)
+        )
+
+
+def release_image(filename):
+    """Retire une référence dans la transaction en cours (voir ``purge_unreferenced``)."""
+    db.session.execute(
+        update(StoredImage)
+        .where(StoredImage.filename == filename)
+        .values(ref_count=StoredImage.ref_count - 1)
+    )
+
+
+def purge_unreferenced(folder, filename):
+    """Après commit : supprime le fichier et ses variantes si plus aucun événement ne l'utilise.
+
+    La ligne et le fichier sont supprimés sous ``uploads_lock`` : un envoi du
+    même contenu voit soit la ligne (et la référence), soit l'absence du fichier.
+    """
+    with uploads_lock(folder):
+        try:
+            deleted = db.session.execute(
+                db.delete(StoredImage).where(StoredImage.filename == filename, StoredImage.ref_count <= 0)
+            ).rowcount
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Nettoyage de l'image %s impossible: %s", filename, e)
+            return False
+        if not deleted:
+            return False
+        try:
+            path = os.path.join(folder, filename)
+            if os.path.exists(path):
+                os.remove(path)
+            remove_variants(folder, filename)
+        except OSError as e:
+            logger.error("Erreur suppression image %s: %s", filename, e)
+    return True
+
+
+def discard_upload(folder, upload):
+    """Annule un enregistrement dont la transaction a échoué (fichier créé par cette requête uniquement)."""
+    if upload is None or not upload.created:
+        return
+    with uploads_lock(folder):
+        if db.session.get(StoredImage, upload.filename) is None:
+            try:
+                os.remove(os.path.join(folder, upload.filename))
+            except OSError:
+                pass
@@ -0,0 +1,81 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from app.modules.event.models import Event
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Ordre de la pagination par curseur (listings WSGI et ASGI)
+KEYSET_ORDER = (Event.date.desc(), Event.id.desc())
+
+
+def str_to_bool(value, default=True):
+    if value is None:
+        return default
+    return str(value).strip().lower() in ['true', '1', 't', 'yes', 'y', 'oui']
+
+
+def encode_cursor(event):
+    # Jeton opaque : position (date, id) du dernier élément de la page
+    payload = json.dumps([event.date.isoformat(), event.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        date_str, event_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(date_str), int(event_id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise ValueError("Curseur de pagination invalide.")
+
+
+def parse_with_total(value):
+    """Paramètre ``with_total`` de la pagination par curseur : le total (COUNT(*)
+    sur tout le filtre) n'est calculé que sur demande explicite (``with_total=1``)."""
+    return str_to_bool(value, default=False)
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE):
+    try:
+        limit = int(value) if value is not None else default
+    except ValueError:
+        raise ValueError("Le paramètre 'limit' doit être un entier.")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_paginate(query, cursor=None, limit=DEFAULT_PAGE_SIZE, with_total=False):
+    """Pagination par curseur sur (Event.date, Event.id), ordre décroissant.
+
+    Le coût d'une page ne dépend pas de sa profondeur : pas d'OFFSET, et le
+    COUNT(*) n'est exécuté que si ``with_total`` est vrai.
+    Retourne ``(events, next_cursor, total)``.
+    """
+    total = query.order_by(None).count() if with_total else None
+
+    if cursor:
+        query = query.filter(after_cursor(cursor))
+
+    events = query.order_by(*KEYSET_ORDER).limit(limit + 1).all()
+    events, next_cursor = split_page(events, limit)
+    return events, next_cursor, total
+
+
+def after_cursor(cursor):
+    """Condition « après le curseur » sur (Event.date, Event.id)."""
+    cursor_date, cursor_id = decode_cursor(cursor)
+    return or_(
+        Event.date < cursor_date,
+        and_(Event.date == cursor_date, Event.id < cursor_id)
+    )
+
+
+def split_page(events, limit):
+    """Tronque ``limit + 1`` résultats à ``limit`` ; retourne ``(events, next_cursor)``."""
+    if len(events) > limit:
+        events = events[:limit]
+        return events, encode_cursor(events[-1])
+    return events, None
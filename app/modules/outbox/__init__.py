@@ -0,0 +1 @@
+from .commands import outbox_cli
@@ -0,0 +1,38 @@
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from .services import outbox_depth
+from .worker import OutboxWorker
+
+outbox_cli = AppGroup('outbox', help="File d'envoi des emails.")
+
+@outbox_cli.command('worker')
+@click.option('--once', is_flag=True, help="Envoie les messages dus puis s'arrête.")
+def run_worker(once):
+    """Lance un worker d'envoi dédié (à préférer au worker intégré en production)."""
+    worker = OutboxWorker(current_app._get_current_object())
+    if once:
+        click.echo(f"{worker.drain()} email(s) envoyé(s)")
+        return
+    worker.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop()
+
+@outbox_cli.command('purge')
+@click.option('--hours', type=int, default=None, help="Âge minimal des emails envoyés (défaut : OUTBOX_RETENTION_HOURS).")
+def purge(hours):
+    """Supprime les emails déjà envoyés de la file."""
+    worker = OutboxWorker(current_app._get_current_object())
+    if hours is not None:
+        worker.retention_hours = hours
+    click.echo(f"{worker.purge()} email(s) supprimé(s)")
+
+@outbox_cli.command('status')
+def status():
+    click.echo(f"Emails en attente : {outbox_depth()}")
@@ -0,0 +1,40 @@
+from datetime import datetime
+from app.extensions import db
+
+STATUT_EN_ATTENTE = 'en_attente'
+STATUT_ENVOI = 'envoi'
+STATUT_ENVOYE = 'envoye'
+STATUT_ECHEC = 'echec'
+
+class OutboxEmail(db.Model):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_statut_next_attempt', 'statut', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    sender = db.Column(db.String(255), nullable=True)
+    recipients = db.Column(db.Text, nullable=False)  # adresses séparées par des virgules
+    body = db.Column(db.Text, nullable=False)
+
+    statut = db.Column(db.String(20), nullable=False, default=STATUT_EN_ATTENTE)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "subject": self.subject,
+            "recipients": self.recipients.split(','),
+            "statut": self.statut,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None
+        }
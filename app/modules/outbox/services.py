@@ -0,0 +1,40 @@
+from sqlalchemy import func
+from app.extensions import db
+from .models import OutboxEmail, STATUT_EN_ATTENTE, STATUT_ENVOYE
+
+def enqueue_email(subject, recipients, body, sender=None, session=None):
+    """Ajoute un email à la file d'envoi dans la transaction de ``session``.
+
+    Rien n'est envoyé ici : le message est persisté avec l'écriture métier
+    (commit par l'appelant) et le worker le délivrera ensuite.
+    """
+    session = session or db.session
+    if isinstance(recipients, str):
+        recipients = [recipients]
+
+    email = OutboxEmail(
+        subject=subject,
+        sender=sender,
+        recipients=','.join(recipients),
+        body=body
+    )
+    session.add(email)
+    # Le worker est réveillé après le commit (voir worker.wake_on_commit)
+    session.info['outbox_pending'] = True
+    return email
+
+def purge_sent(older_than, session=None):
+    """Supprime les emails envoyés avant ``older_than`` ; retourne leur nombre."""
+    session = session or db.session
+    deleted = session.query(OutboxEmail).filter(
+        OutboxEmail.statut == STATUT_ENVOYE,
+        OutboxEmail.sent_at < older_than
+    ).delete(synchronize_session=False)
+    session.commit()
+    return deleted
+
+def outbox_depth(session=None):
+    session = session or db.session
+    return session.query(func.count(OutboxEmail.id)).filter(
+        OutboxEmail.statut == STATUT_EN_ATTENTE
+    ).scalar()
@@ -0,0 +1,264 @@
+import logging
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from sqlalchemy import and_, event, or_, update
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from .models import (
+    OutboxEmail, STATUT_EN_ATTENTE, STATUT_ENVOI, STATUT_ENVOYE, STATUT_ECHEC
+)
+from .services import purge_sent
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPConnection:
+    """Connexion SMTP longue durée, ouverte à la demande et rouverte si coupée."""
+
+    def __init__(self, config):
+        self.host = config.get('MAIL_SERVER')
+        self.port = config.get('MAIL_PORT', 587)
+        self.use_tls = config.get('MAIL_USE_TLS', False)
+        self.use_ssl = config.get('MAIL_USE_SSL', False)
+        self.username = config.get('MAIL_USERNAME')
+        self.password = config.get('MAIL_PASSWORD')
+        self.timeout = config.get('OUTBOX_SMTP_TIMEOUT', 30)
+        self.max_idle = config.get('OUTBOX_SMTP_MAX_IDLE', 60)
+        self._smtp = None
+        self._last_used = 0
+
+    def _connect(self):
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = smtp_class(self.host, self.port, timeout=self.timeout)
+        if self.use_tls and not self.use_ssl:
+            smtp.starttls()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        self._smtp = smtp
+
+    def send(self, message):
+        # Au-delà de max_idle le serveur a probablement fermé la connexion
+        if self._smtp is not None and time.monotonic() - self._last_used > self.max_idle:
+            self.close()
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            self._connect()
+            self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+
+class OutboxWorker:
+    """Vide la table email_outbox avec un pool de threads d'envoi.
+
+    Un thread de répartition réclame les messages dus par UPDATE conditionnel
+    (plusieurs processus peuvent tourner en parallèle sans double envoi), puis
+    les confie au pool ; chaque thread garde sa propre connexion SMTP.
+    Les échecs sont replanifiés avec un délai exponentiel ; les messages
+    envoyés sont purgés après OUTBOX_RETENTION_HOURS.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        config = app.config
+        self.workers = config.get('OUTBOX_WORKERS', 4)
+        self.batch_size = config.get('OUTBOX_BATCH_SIZE', 50)
+        self.poll_interval = config.get('OUTBOX_POLL_INTERVAL', 2)
+        self.max_attempts = config.get('OUTBOX_MAX_ATTEMPTS', 5)
+        self.backoff_base = config.get('OUTBOX_BACKOFF_BASE', 30)
+        self.backoff_max = config.get('OUTBOX_BACKOFF_MAX', 3600)
+        self.lease = config.get('OUTBOX_LEASE_SECONDS', 300)
+        self.default_sender = config.get('MAIL_DEFAULT_SENDER')
+        self.retention_hours = config.get('OUTBOX_RETENTION_HOURS', 24)
+        self.purge_interval = config.get('OUTBOX_PURGE_INTERVAL', 3600)
+        self._last_purge = None
+
+        self._local = threading.local()
+        self._connections = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+
+    # -- Réclamation et envoi ------------------------------------------------
+
+    def claim_batch(self):
+        now = datetime.utcnow()
+        due = or_(
+            and_(OutboxEmail.statut == STATUT_EN_ATTENTE, OutboxEmail.next_attempt_at <= now),
+            # Messages réclamés par un worker arrêté en cours d'envoi
+            and_(OutboxEmail.statut == STATUT_ENVOI, OutboxEmail.locked_at < now - timedelta(seconds=self.lease))
+        )
+        candidates = [row.id for row in db.session.query(OutboxEmail.id).filter(due)
+                      .order_by(OutboxEmail.next_attempt_at).limit(self.batch_size)]
+
+        claimed = []
+        for email_id in candidates:
+            result = db.session.execute(
+                update(OutboxEmail)
+                .where(OutboxEmail.id == email_id, due)
+                .values(statut=STATUT_ENVOI, locked_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                claimed.append(email_id)
+        db.session.commit()
+        return claimed
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = SMTPConnection(self.app.config)
+            self._local.connection = connection
+            self._connections.append(connection)
+        return connection
+
+    def _build_message(self, email):
+        message = EmailMessage()
+        message['Subject'] = email.subject
+        message['From'] = email.sender or self.default_sender
+        message['To'] = ', '.join(email.recipients.split(','))
+        message.set_content(email.body)
+        return message
+
+    def deliver(self, email_id):
+        with self.app.app_context():
+            email = db.session.get(OutboxEmail, email_id)
+            if email is None or email.statut != STATUT_ENVOI:
+                return False
+            try:
+                self._connection().send(self._build_message(email))
+            except Exception as e:
+                email.attempts += 1
+                email.last_error = str(e)[:1000]
+                email.locked_at = None
+                if email.attempts >= self.max_attempts:
+                    email.statut = STATUT_ECHEC
+                    logger.error("Email %s abandonné après %s tentatives: %s", email_id, email.attempts, e)
+                else:
+                    delay = min(self.backoff_base * 2 ** (email.attempts - 1), self.backoff_max)
+                    email.statut = STATUT_EN_ATTENTE
+                    email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+                    logger.warning("Échec envoi email %s, nouvel essai dans %ss: %s", email_id, delay, e)
+                db.session.commit()
+                return False
+
+            email.statut = STATUT_ENVOYE
+            email.sent_at = datetime.utcnow()
+            email.attempts += 1
+            email.locked_at = None
+            email.last_error = None
+            db.session.commit()
+            return True
+
+    def drain(self):
+        """Envoie tous les messages dus ; retourne le nombre d'emails envoyés."""
+        sent = 0
+        executor = self._executor or ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            while True:
+                with self.app.app_context():
+                    claimed = self.claim_batch()
+                if not claimed:
+                    return sent
+                sent += sum(executor.map(self.deliver, claimed))
+        finally:
+            if executor is not self._executor:
+                executor.shutdown()
+                self.close_connections()
+
+    def purge(self):
+        """Supprime les emails envoyés depuis plus de OUTBOX_RETENTION_HOURS."""
+        with self.app.app_context():
+            deleted = purge_sent(datetime.utcnow() - timedelta(hours=self.retention_hours))
+        if deleted:
+            logger.info("%s email(s) envoyé(s) purgé(s) de la file", deleted)
+        return deleted
+
+    def purge_if_due(self):
+        now = time.monotonic()
+        if self._last_purge is not None and now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        self.purge()
+
+    def close_connections(self):
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._local = threading.local()
+
+    # -- Boucle de fond ------------------------------------------------------
+
+    def wake(self):
+        self._wake.set()
+
+    def run_forever(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='outbox')
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.drain()
+                    self.purge_if_due()
+                except Exception as e:
+                    logger.error("Erreur worker email: %s", e, exc_info=True)
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        finally:
+            self._executor.shutdown()
+            self._executor = None
+            self.close_connections()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name='outbox-dispatcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_current_worker = None
+
+
+def _wake_on_commit(session):
+    if session.info.pop('outbox_pending', False) and _current_worker is not None:
+        _current_worker.wake()
+
+
+def init_outbox_worker(app):
+    """Démarre le worker dans le processus web si OUTBOX_WORKER_ENABLED est vrai.
+
+    En production on préférera un processus dédié : ``flask outbox worker``.
+    """
+    global _current_worker
+    if not app.config.get('OUTBOX_WORKER_ENABLED'):
+        return None
+    worker = OutboxWorker(app).start()
+    app.extensions['outbox_worker'] = worker
+    _current_worker = worker
+    if not event.contains(Session, 'after_commit', _wake_on_commit):
+        event.listen(Session, 'after_commit', _wake_on_commit)
+    return worker
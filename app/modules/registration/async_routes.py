@@ -0,0 +1,97 @@
+import logging
+
+from sqlalchemy import select
+from starlette.routing import Route
+
+from app.asgi import AuthError, authenticate, json_response
+from app.modules.event.models import Event
+from app.modules.outbox.services import enqueue_email
+from app.modules.registration.models import Registration, STATUT_LISTE_ATTENTE
+from app.modules.registration.services import confirmation_email, register_user
+from app.modules.user.models import User
+
+logger = logging.getLogger(__name__)
+
+
+async def register_to_event(request):
+    """Version asynchrone de POST /api/registrations.
+
+    La réservation de place et la mise en file de l'email réutilisent les
+    services synchrones via ``AsyncSession.run_sync`` : mêmes requêtes,
+    mêmes garanties (UPDATE conditionnel, contrainte unique), sans bloquer
+    la boucle d'événements pendant les allers-retours avec la base.
+    """
+    flask_app = request.app.state.flask_app
+    # Contexte d'application : configuration JWT, compteurs des tableaux de bord
+    with flask_app.app_context():
+        try:
+            user_id, _ = await authenticate(request, ['user', 'organizer', 'admin', 'super_admin'])
+        except AuthError as e:
+            return json_response(request, e.payload, e.status)
+
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        if not isinstance(data, dict) or not data.get('event_id'):
+            return json_response(request, {"message": "Le champ 'event_id' est requis."}, 400)
+        event_id = data.get('event_id')
+
+        async with request.app.state.sessions() as session:
+            try:
+                event = await session.get(Event, event_id)
+                if not event:
+                    return json_response(request, {"message": "Événement non trouvé."}, 404)
+
+                # Vérification rapide ; la contrainte unique reste la garantie finale
+                existing_registration = await session.scalar(
+                    select(Registration.id).filter_by(user_id=user_id, event_id=event_id)
+                )
+                if existing_registration:
+                    return json_response(request, {"message": "Vous êtes déjà inscrit à cet événement."}, 409)
+
+                user = await session.get(User, user_id)
+                if not user:
+                    return json_response(request, {"message": "Utilisateur non trouvé."}, 404)
+
+                registration, error, status = await session.run_sync(
+                    register_user, user_id, event_id, waitlist=bool(data.get('waitlist', False))
+                )
+                if error:
+                    return json_response(request, {"message": error}, status)
+
+                if registration.statut == STATUT_LISTE_ATTENTE:
+                    await session.commit()
+                    return json_response(request, {
+                        "message": "Événement complet. Vous avez été placé en liste d'attente.",
+                        "registration_id": registration.id,
+                        "statut": registration.statut,
+                        "event_title": event.titre,
+                        "user_email": user.email
+                    }, 202)
+
+                # L'email est mis en file dans la même transaction que l'inscription
+                subject, body = confirmation_email(user, event, registration)
+                await session.run_sync(
+                    lambda sync_session: enqueue_email(subject, [user.email], body, session=sync_session)
+                )
+                await session.commit()
+                logger.info("Email de confirmation mis en file pour %s", user.email)
+
+                return json_response(request, {
+                    "message": "Inscription réussie. Un email de confirmation a été envoyé.",
+                    "registration_id": registration.id,
+                    "statut": registration.statut,
+                    "event_title": event.titre,
+                    "user_email": user.email
+                }, 201)
+
+            except Exception as e:
+                logger.error("Erreur inscription: %s", e, exc_info=True)
+                await session.rollback()
+                return json_response(request, {"message": "Erreur serveur lors de l'inscription"}, 500)
+
+
+routes = [
+    Route('/api/registrations', register_to_event, methods=['POST']),
+]
@@ -1,12 +1,22 @@
 from app.extensions import db
 from datetime import datetime
 
+STATUT_CONFIRMEE = 'confirmee'
+STATUT_LISTE_ATTENTE = 'liste_attente'
+
 class Registration(db.Model):
     __tablename__ = 'registrations'
+    __table_args__ = (
+        # Sert aussi d'index pour les recherches par user_id
+        db.UniqueConstraint('user_id', 'event_id', name='uq_registration_user_event'),
+        # Inscrits d'un événement, liste d'attente dans l'ordre d'arrivée
+        db.Index('ix_registrations_event_statut_created', 'event_id', 'statut', 'created_at', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    statut = db.Column(db.String(20), nullable=False, default=STATUT_CONFIRMEE, server_default=STATUT_CONFIRMEE)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relations
@@ -18,5 +28,6 @@ class Registration(db.Model):
             "id": self.id,
             "user_id": self.user_id,
             "event_id": self.event_id,
+            "statut": self.statut,
             "created_at": self.created_at.isoformat()
         }
@@ -1,18 +1,22 @@
 from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from flask_mail import Message
 from . import registration_bp
 from app.utils.role_required import role_required
-from app.modules.registration.models import Registration
+from app.modules.registration.models import Registration, STATUT_LISTE_ATTENTE
+from app.modules.registration.services import (
+    register_user, unregister, confirmation_email, notify_promotion, bulk_register,
+    stream_export_rows, iter_csv, parse_sort, paginate_rows,
+    USER_REGISTRATIONS_SORTS, EVENT_REGISTRATIONS_SORTS
+)
 from app.modules.event.models import Event
 from app.modules.user.models import User
-from app.extensions import mail
+from app.modules.outbox.services import enqueue_email
+from app.extensions import db
+from app.utils.bulk import BulkInputError, read_bulk_rows
 import logging
-import csv
-from io import StringIO
-from flask import Response
-from sqlalchemy import and_, or_
-from datetime import datetime
+from flask import Response, stream_with_context
+from sqlalchemy import and_, or_, select
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -29,69 +33,107 @@ def register_to_event():
     user_id = int(get_jwt_identity())
     event_id = data.get('event_id')
 
-    new_db_session = current_app.db_session()
-
     try:
-        event = new_db_session.get(Event, event_id)
+        event = db.session.get(Event, event_id)
         if not event:
             return jsonify({"message": "Événement non trouvé."}), 404
 
-        existing_registration = new_db_session.query(Registration).filter_by(
+        # Vérification rapide ; la contrainte unique reste la garantie finale
+        existing_registration = db.session.query(Registration.id).filter_by(
             user_id=user_id,
             event_id=event_id
         ).first()
         if existing_registration:
             return jsonify({"message": "Vous êtes déjà inscrit à cet événement."}), 409
 
-        user = new_db_session.get(User, user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({"message": "Utilisateur non trouvé."}), 404
 
-        registration = Registration(user_id=user_id, event_id=event_id)
-        new_db_session.add(registration)
-        new_db_session.commit()
+        registration, error, status = register_user(
+            db.session, user_id, event_id,
+            waitlist=bool(data.get('waitlist', False))
+        )
+        if error:
+            return jsonify({"message": error}), status
+
+        if registration.statut == STATUT_LISTE_ATTENTE:
+            db.session.commit()
+            return jsonify({
+                "message": "Événement complet. Vous avez été placé en liste d'attente.",
+                "registration_id": registration.id,
+                "statut": registration.statut,
+                "event_title": event.titre,
+                "user_email": user.email
+            }), 202
 
-        # Envoi mail
-        try:
-            event_date = event.date.strftime('%d/%m/%Y à %H:%M') if event.date else 'Date non spécifiée'
-            created_at = registration.created_at.strftime('%d/%m/%Y à %H:%M')
-
-            body = (
-                f"Bonjour {user.nom},\n\n"
-                f"Confirmation de votre inscription à l'événement :\n"
-                f"• Événement: {event.titre}\n"
-                f"• Date: {event_date}\n"
-                f"• Lieu: {event.lieu}\n"
-                f"• ID Inscription: {registration.id}\n"
-                f"• Date d'inscription: {created_at}\n\n"
-                f"Merci pour votre participation !\n\n"
-                f"Cordialement,\n"
-                f"L'équipe des événements"
-            )
-
-            msg = Message(
-                f"Confirmation d'inscription - {event.titre}",
-                recipients=[user.email],
-                body=body
-            )
-            mail.send(msg)
-            logger.info(f"Email de confirmation envoyé à {user.email}")
-        except Exception as email_error:
-            logger.error(f"Erreur envoi email: {str(email_error)}", exc_info=True)
+        # L'email est mis en file dans la même transaction que l'inscription
+        subject, body = confirmation_email(user, event, registration)
+        enqueue_email(subject, [user.email], body, session=db.session)
+        db.session.commit()
+        logger.info("Email de confirmation mis en file pour %s", user.email)
 
         return jsonify({
             "message": "Inscription réussie. Un email de confirmation a été envoyé.",
             "registration_id": registration.id,
+            "statut": registration.statut,
             "event_title": event.titre,
             "user_email": user.email
         }), 201
 
     except Exception as e:
-        logger.error(f"Erreur inscription: {str(e)}", exc_info=True)
-        new_db_session.rollback()
+        logger.error("Erreur inscription: %s", e, exc_info=True)
+        db.session.rollback()
         return jsonify({"message": "Erreur serveur lors de l'inscription"}), 500
-    finally:
-        new_db_session.close()
+
+
+# 📌 Inscription en masse à un événement (organisateur/admin/super_admin)
+@registration_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@role_required(['organizer', 'admin', 'super_admin'])
+def bulk_register_to_event():
+    current_user_id = int(get_jwt_identity())
+    user_role = get_jwt().get("role")
+
+    try:
+        rows, payload = read_bulk_rows(request, 'registrations', current_app.config['BULK_MAX_ROWS'])
+    except BulkInputError as e:
+        return jsonify({"message": e.message}), e.status
+
+    options = payload if isinstance(payload, dict) else request.args
+    try:
+        event_id = int(options.get('event_id'))
+    except (TypeError, ValueError):
+        return jsonify({"message": "Le champ 'event_id' est requis."}), 400
+    waitlist = str(options.get('waitlist', 'false')).lower() in ['true', '1', 'yes', 'oui']
+
+    try:
+        event = db.session.get(Event, event_id)
+        if not event:
+            return jsonify({"message": "Événement non trouvé."}), 404
+        if user_role == "organizer" and event.organisateur_id != current_user_id:
+            return jsonify({"message": "Permission refusée pour cette action."}), 403
+
+        created, results = bulk_register(
+            db.session, event, rows, waitlist=waitlist,
+            chunk_size=current_app.config['BULK_CHUNK_SIZE']
+        )
+        errors = len(rows) - created
+        logger.info("Inscription en masse à l'événement %s : %s inscrit(s), %s erreur(s)", event_id, created, errors)
+
+        status = 201 if not errors else (207 if created else 400)
+        return jsonify({
+            "message": f"{created} inscription(s) enregistrée(s), {errors} erreur(s).",
+            "event_id": event_id,
+            "created": created,
+            "errors": errors,
+            "results": results
+        }), status
+
+    except Exception as e:
+        logger.error("Erreur inscription en masse: %s", e, exc_info=True)
+        db.session.rollback()
+        return jsonify({"message": "Erreur serveur lors de l'inscription en masse"}), 500
 
 
 # 📌 Désinscription par l'utilisateur
@@ -102,15 +144,14 @@ def unregister_from_event(event_id):
     claims = get_jwt()
     user_role = claims.get("role")
 
-    logger.info(f"Désinscription demandée: user_id={user_id}, event_id={event_id}")
-    new_db_session = current_app.db_session()
+    logger.info("Désinscription demandée: user_id=%s, event_id=%s", user_id, event_id)
 
     try:
-        event = new_db_session.get(Event, event_id)
+        event = db.session.get(Event, event_id)
         if not event:
             return jsonify({"message": "Événement non trouvé."}), 404
 
-        registration = new_db_session.query(Registration).filter_by(
+        registration = db.session.query(Registration).filter_by(
             user_id=user_id,
             event_id=event_id
         ).first()
@@ -121,19 +162,18 @@ def unregister_from_event(event_id):
         if registration.user_id != user_id and not is_admin:
             return jsonify({"message": "Permission refusée pour cette action."}), 403
 
-        new_db_session.delete(registration)
-        new_db_session.commit()
+        promoted_id = unregister(db.session, registration)
+        notify_promotion(db.session, promoted_id, event)
+        db.session.commit()
         return jsonify({
             "message": "Désinscription réussie.",
             "event_title": event.titre
         }), 200
 
     except Exception as e:
-        logger.error(f"Erreur désinscription: {str(e)}", exc_info=True)
-        new_db_session.rollback()
+        logger.error("Erreur désinscription: %s", e, exc_info=True)
+        db.session.rollback()
         return jsonify({"message": "Erreur lors de la désinscription"}), 500
-    finally:
-        new_db_session.close()
 
 
 # 📌 Suppression d'une inscription (admin ou organisateur)
@@ -144,10 +184,8 @@ def delete_registration_by_id(registration_id):
     claims = get_jwt()
     user_role = claims.get("role")
 
-    new_db_session = current_app.db_session()
-
     try:
-        registration = new_db_session.get(Registration, registration_id)
+        registration = db.session.get(Registration, registration_id)
         if not registration:
             return jsonify({"message": "Inscription non trouvée."}), 404
 
@@ -163,17 +201,16 @@ def delete_registration_by_id(registration_id):
         else:
             return jsonify({"message": "Permission refusée pour supprimer cette inscription."}), 403
 
-        new_db_session.delete(registration)
-        new_db_session.commit()
+        promoted_id = unregister(db.session, registration)
+        notify_promotion(db.session, promoted_id, event)
+        db.session.commit()
         return jsonify({
             "message": "Inscription supprimée avec succès.",
             "event_title": event.titre
         }), 200
     except Exception as e:
-        new_db_session.rollback()
+        db.session.rollback()
         return jsonify({"message": "Erreur lors de la suppression"}), 500
-    finally:
-        new_db_session.close()
 
 
 # 📌 Récupérer toutes les inscriptions de l'utilisateur (ou toutes pour admin)
@@ -184,70 +221,82 @@ def get_user_registrations():
     user_id = int(get_jwt_identity())
     claims = get_jwt()
     role = claims.get("role")
-
-    new_db_session = current_app.db_session()
+    include_users = role in ["admin", "super_admin"] and request.args.get("all") == "1"
 
     try:
-        # Base query
-        query = new_db_session.query(Registration)
-
-        if role not in ["admin", "super_admin"] or request.args.get("all") != "1":
-            query = query.filter(Registration.user_id == user_id)
+        # Une seule requête : colonnes utiles, jointure Event unique, User seulement si affiché
+        columns = [
+            Registration.id, Registration.statut, Registration.created_at,
+            Event.id, Event.titre, Event.date, Event.lieu
+        ]
+        if include_users:
+            columns += [User.id, User.nom, User.email]
+
+        stmt = select(*columns).join(Event, Registration.event_id == Event.id)
+        if include_users:
+            stmt = stmt.join(User, Registration.user_id == User.id)
+        else:
+            stmt = stmt.where(Registration.user_id == user_id)
 
         # 🔍 Filtres dynamiques
         if "event_title" in request.args:
-            query = query.join(Event).filter(Event.titre.ilike(f"%{request.args['event_title']}%"))
+            stmt = stmt.where(Event.titre.ilike(f"%{request.args['event_title']}%"))
 
         if "event_lieu" in request.args:
-            query = query.join(Event).filter(Event.lieu.ilike(f"%{request.args['event_lieu']}%"))
+            stmt = stmt.where(Event.lieu.ilike(f"%{request.args['event_lieu']}%"))
 
         if "event_date_from" in request.args:
             try:
                 date_from = datetime.strptime(request.args["event_date_from"], '%Y-%m-%d')
-                query = query.join(Event).filter(Event.date >= date_from)
+                stmt = stmt.where(Event.date >= date_from)
             except ValueError:
                 return jsonify({"message": "Format de 'event_date_from' invalide. Utilisez YYYY-MM-DD"}), 400
 
         if "event_date_to" in request.args:
             try:
                 date_to = datetime.strptime(request.args["event_date_to"], '%Y-%m-%d')
-                query = query.join(Event).filter(Event.date <= date_to)
+                stmt = stmt.where(Event.date <= date_to)
             except ValueError:
                 return jsonify({"message": "Format de 'event_date_to' invalide. Utilisez YYYY-MM-DD"}), 400
 
-        if role in ["admin", "super_admin"] and "user_name" in request.args and request.args.get("all") == "1":
-            query = query.join(User).filter(User.nom.ilike(f"%{request.args['user_name']}%"))
+        if include_users and "user_name" in request.args:
+            stmt = stmt.where(User.nom.ilike(f"%{request.args['user_name']}%"))
 
-        registrations = query.all()
+        try:
+            stmt = stmt.order_by(*parse_sort(request.args.get('sort'), USER_REGISTRATIONS_SORTS))
+            rows, pagination = paginate_rows(db.session, stmt, request.args)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
 
         results = []
-        for reg in registrations:
-            event = reg.event
-            user = reg.user
-
+        for row in rows:
+            reg_id, statut, created_at, event_id, titre, date, lieu = row[:7]
             reg_data = {
-                "registration_id": reg.id,
-                "event_id": event.id,
-                "event_title": event.titre,
-                "event_date": event.date.strftime('%Y-%m-%d') if event.date else None,
-                "event_lieu": event.lieu,
-                "registered_at": reg.created_at.isoformat()
+                "registration_id": reg_id,
+                "event_id": event_id,
+                "event_title": titre,
+                "event_date": date.strftime('%Y-%m-%d') if date else None,
+                "event_lieu": lieu,
+                "statut": statut,
+                "registered_at": created_at.isoformat()
             }
 
-            if role in ["admin", "super_admin"] and request.args.get("all") == "1":
-                reg_data["user_id"] = user.id
-                reg_data["user_name"] = user.nom
-                reg_data["user_email"] = user.email
+            if include_users:
+                reg_data["user_id"], reg_data["user_name"], reg_data["user_email"] = row[7:]
 
             results.append(reg_data)
 
-        return jsonify(results), 200
+        # La liste reste le corps de la réponse ; la pagination passe par les en-têtes
+        response = jsonify(results)
+        if pagination:
+            response.headers['X-Total-Count'] = str(pagination['total'])
+            response.headers['X-Page'] = str(pagination['page'])
+            response.headers['X-Per-Page'] = str(pagination['per_page'])
+        return response, 200
 
     except Exception as e:
-        logger.error(f"Erreur récupération inscriptions: {str(e)}")
+        logger.error("Erreur récupération inscriptions: %s", e)
         return jsonify({"message": "Erreur serveur"}), 500
-    finally:
-        new_db_session.close()
 # 📌 Récupérer les inscriptions à un événement (organisateur/admin/super_admin)
 @registration_bp.route('/event/<int:event_id>', methods=['GET'])
 @jwt_required()
@@ -257,88 +306,75 @@ def get_event_registrations(event_id):
     claims = get_jwt()
     user_role = claims.get("role")
 
-    new_db_session = current_app.db_session()
-
     try:
-        event = new_db_session.get(Event, event_id)
+        event = db.session.execute(
+            select(Event.id, Event.titre, Event.organisateur_id).where(Event.id == event_id)
+        ).first()
         if not event:
             return jsonify({"message": "Événement non trouvé."}), 404
 
         if user_role == "organizer" and event.organisateur_id != current_user_id:
             return jsonify({"message": "Accès non autorisé aux inscriptions."}), 403
 
-        registrations = new_db_session.query(Registration).filter_by(event_id=event_id).all()
-
-        results = []
-        for reg in registrations:
-            user = reg.user
-            results.append({
-                "registration_id": reg.id,
-                "user_id": user.id,
-                "user_name": user.nom,
-                "user_email": user.email,
-                "registered_at": reg.created_at.isoformat()
-            })
+        stmt = select(
+            Registration.id, Registration.statut, Registration.created_at,
+            User.id, User.nom, User.email
+        ).join(User, Registration.user_id == User.id).where(Registration.event_id == event_id)
 
-        return jsonify({
+        try:
+            stmt = stmt.order_by(*parse_sort(request.args.get('sort'), EVENT_REGISTRATIONS_SORTS))
+            rows, pagination = paginate_rows(db.session, stmt, request.args)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+        results = [{
+            "registration_id": reg_id,
+            "user_id": user_id,
+            "user_name": nom,
+            "user_email": email,
+            "statut": statut,
+            "registered_at": created_at.isoformat()
+        } for reg_id, statut, created_at, user_id, nom, email in rows]
+
+        response = {
             "event_id": event.id,
             "event_titre": event.titre,
-            "total_registrations": len(results),
+            "total_registrations": pagination['total'] if pagination else len(results),
             "registrations": results
-        }), 200
+        }
+        if pagination:
+            response["page"] = pagination['page']
+            response["per_page"] = pagination['per_page']
+        return jsonify(response), 200
     except Exception as e:
-        logger.error(f"Erreur récupération inscriptions: {str(e)}")
+        logger.error("Erreur récupération inscriptions: %s", e)
         return jsonify({"message": "Erreur serveur"}), 500
-    finally:
-        new_db_session.close()
         
-# 📌 Exporter les inscriptions au format CSV
+# 📌 Exporter les inscriptions au format CSV (flux, une seule requête jointe)
 @registration_bp.route('/export', methods=['GET'])
 @jwt_required()
 @role_required(['admin', 'super_admin'])
 def export_registrations_csv():
-    new_db_session = current_app.db_session()
+    filters = []
     try:
-        registrations = new_db_session.query(Registration).all()
-
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        # En-têtes
-        writer.writerow([
-            'registration_id',
-            'event_id',
-            'event_title',
-            'event_date',
-            'event_lieu',
-            'user_id',
-            'user_name',
-            'user_email',
-            'registered_at'
-        ])
-
-        # Données
-        for reg in registrations:
-            writer.writerow([
-                reg.id,
-                reg.event.id,
-                reg.event.titre,
-                reg.event.date.strftime('%Y-%m-%d %H:%M') if reg.event.date else '',
-                reg.event.lieu,
-                reg.user.id,
-                reg.user.nom,
-                reg.user.email,
-                reg.created_at.strftime('%Y-%m-%d %H:%M')
-            ])
-        
-        output.seek(0)
-        return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={"Content-Disposition": "attachment;filename=inscriptions.csv"}
-        )
-    except Exception as e:
-        logger.error(f"Erreur export CSV: {str(e)}", exc_info=True)
-        return jsonify({"message": "Erreur serveur lors de l'export CSV"}), 500
-    finally:
-        new_db_session.close()
+        if request.args.get('event_id'):
+            filters.append(Registration.event_id == int(request.args['event_id']))
+        if request.args.get('event_date_from'):
+            filters.append(Event.date >= datetime.strptime(request.args['event_date_from'], '%Y-%m-%d'))
+        if request.args.get('event_date_to'):
+            date_to = datetime.strptime(request.args['event_date_to'], '%Y-%m-%d')
+            filters.append(Event.date < date_to + timedelta(days=1))
+    except ValueError:
+        return jsonify({"message": "Paramètres invalides. 'event_id' doit être un entier et les dates au format YYYY-MM-DD"}), 400
+
+    compress = request.args.get('gzip', '').lower() in ['1', 'true', 'yes', 'oui']
+    filename = 'inscriptions.csv.gz' if compress else 'inscriptions.csv'
+
+    # stream_with_context garde le contexte (et la session) jusqu'à la fin du flux
+    rows = stream_export_rows(db.session, filters, current_app.config.get('EXPORT_YIELD_PER', 1000))
+
+    return Response(
+        stream_with_context(iter_csv(rows, compress=compress)),
+        mimetype='application/gzip' if compress else 'text/csv',
+        headers={"Content-Disposition": f"attachment;filename={filename}"}
+    )
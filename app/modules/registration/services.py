@@ -0,0 +1,397 @@
+import csv
+import logging
+import zlib
+from io import StringIO
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.modules.event.models import Event
+from app.modules.user.models import User
+from app.modules.outbox.services import enqueue_email
+from app.modules.dashboard.counters import counters_enabled, registrations_added
+from app.modules.registration.models import (
+    Registration, STATUT_CONFIRMEE, STATUT_LISTE_ATTENTE
+)
+
+logger = logging.getLogger(__name__)
+
+# Tris autorisés : nom public -> colonne ; préfixe '-' pour l'ordre décroissant
+USER_REGISTRATIONS_SORTS = {
+    'registered_at': Registration.created_at,
+    'event_date': Event.date,
+    'event_title': Event.titre,
+}
+EVENT_REGISTRATIONS_SORTS = {
+    'registered_at': Registration.created_at,
+    'user_name': User.nom,
+}
+MAX_PER_PAGE = 200
+
+EXPORT_HEADER = [
+    'registration_id',
+    'event_id',
+    'event_title',
+    'event_date',
+    'event_lieu',
+    'user_id',
+    'user_name',
+    'user_email',
+    'registered_at'
+]
+
+
+def reserve_seat(session, event_id):
+    """Réserve une place par UPDATE conditionnel ; False si l'événement est complet.
+
+    La condition et l'incrément sont évalués par la base dans une seule
+    instruction : deux workers concurrents ne peuvent pas dépasser la capacité.
+    ``updated_at`` est conservé pour ne pas invalider les ETags publics.
+    """
+    result = session.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .where(or_(Event.capacity.is_(None), Event.places_reservees < Event.capacity))
+        .values(places_reservees=Event.places_reservees + 1, updated_at=Event.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def reserve_seats(session, event_id, wanted, attempts=5):
+    """Réserve jusqu'à ``wanted`` places en une mise à jour ; retourne le nombre obtenu.
+
+    Comme ``reserve_seat``, la capacité est vérifiée par la base dans l'UPDATE
+    (SQLite ignore FOR UPDATE) : si une inscription concurrente a pris des
+    places entre la lecture et l'écriture, le lot est réduit et retenté.
+    """
+    for _ in range(attempts):
+        capacity, reserved = session.execute(
+            select(Event.capacity, Event.places_reservees).where(Event.id == event_id).with_for_update()
+        ).one()
+        granted = wanted if capacity is None else max(0, min(wanted, capacity - reserved))
+        if not granted:
+            return 0
+        result = session.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            .where(or_(Event.capacity.is_(None), Event.places_reservees + granted <= Event.capacity))
+            .values(places_reservees=Event.places_reservees + granted, updated_at=Event.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            return granted
+    return 0
+
+
+def release_seat(session, event_id):
+    """Libère une place : la transmet au premier inscrit en liste d'attente, sinon décrémente."""
+    candidates = session.query(Registration.id).filter(
+        Registration.event_id == event_id,
+        Registration.statut == STATUT_LISTE_ATTENTE
+    ).order_by(Registration.created_at, Registration.id).limit(5).all()
+
+    for (candidate_id,) in candidates:
+        promoted = session.execute(
+            update(Registration)
+            .where(Registration.id == candidate_id, Registration.statut == STATUT_LISTE_ATTENTE)
+            .values(statut=STATUT_CONFIRMEE)
+            .execution_options(synchronize_session=False)
+        )
+        if promoted.rowcount == 1:
+            return candidate_id
+
+    session.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.places_reservees > 0)
+        .values(places_reservees=Event.places_reservees - 1, updated_at=Event.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return None
+
+
+def register_user(session, user_id, event_id, waitlist=False):
+    """Inscrit un utilisateur dans la transaction courante de ``session``.
+
+    Retourne ``(registration, error, status)``. En cas d'erreur la transaction
+    est annulée, y compris la place éventuellement réservée.
+    """
+    statut = STATUT_CONFIRMEE
+    if not reserve_seat(session, event_id):
+        if not waitlist:
+            session.rollback()
+            return None, "Événement complet.", 409
+        statut = STATUT_LISTE_ATTENTE
+
+    registration = Registration(user_id=user_id, event_id=event_id, statut=statut)
+    session.add(registration)
+    try:
+        # La contrainte unique (user_id, event_id) tranche entre requêtes concurrentes
+        session.flush()
+    except IntegrityError:
+        session.rollback()
+        return None, "Vous êtes déjà inscrit à cet événement.", 409
+
+    return registration, None, 201
+
+
+def resolve_bulk_users(session, rows):
+    """Associe chaque ligne (id, ``{"user_id"}`` ou ``{"email"}``) à un utilisateur.
+
+    Deux requêtes au plus pour tout le lot. Retourne ``(users, results)`` :
+    ``users`` liste ``(index, user)`` et ``results`` les erreurs par index.
+    """
+    keys, results = [], {}
+    for index, row in enumerate(rows):
+        if isinstance(row, dict):
+            value = row.get('user_id') or row.get('email')
+        else:
+            value = row
+        if isinstance(value, str) and '@' in value:
+            keys.append((index, 'email', value.strip().lower()))
+            continue
+        try:
+            keys.append((index, 'id', int(value)))
+        except (TypeError, ValueError):
+            results[index] = {"index": index, "status": 400, "message": "user_id ou email requis."}
+
+    ids = {value for _, kind, value in keys if kind == 'id'}
+    emails = {value for _, kind, value in keys if kind == 'email'}
+    by_id, by_email = {}, {}
+    if ids:
+        by_id = {user.id: user for user in session.execute(
+            select(User.id, User.nom, User.email).where(User.id.in_(ids))
+        )}
+    if emails:
+        by_email = {user.email.lower(): user for user in session.execute(
+            select(User.id, User.nom, User.email).where(func.lower(User.email).in_(emails))
+        )}
+
+    users, seen = [], set()
+    for index, kind, value in keys:
+        user = (by_id if kind == 'id' else by_email).get(value)
+        if user is None:
+            results[index] = {"index": index, "status": 404, "message": "Utilisateur non trouvé."}
+        elif user.id in seen:
+            results[index] = {"index": index, "status": 409, "message": "Utilisateur présent plusieurs fois dans la requête."}
+        else:
+            seen.add(user.id)
+            users.append((index, user))
+    return users, results
+
+
+def _insert_registration_chunk(session, event, chunk, waitlist, results):
+    """Inscrit un lot dans la transaction courante ; retourne le nombre d'inscriptions."""
+    already = set(session.execute(
+        select(Registration.user_id).where(
+            Registration.event_id == event.id,
+            Registration.user_id.in_([user.id for _, user in chunk])
+        )
+    ).scalars())
+    pending = []
+    for index, user in chunk:
+        if user.id in already:
+            results[index] = {"index": index, "status": 409, "message": "Déjà inscrit à cet événement."}
+        else:
+            pending.append((index, user))
+    if not pending:
+        return 0
+
+    granted = reserve_seats(session, event.id, len(pending))
+    if granted < len(pending) and not waitlist:
+        for index, _ in pending[granted:]:
+            results[index] = {"index": index, "status": 409, "message": "Événement complet."}
+        pending = pending[:granted]
+        if not pending:
+            return 0
+
+    session.execute(insert(Registration), [{
+        "user_id": user.id,
+        "event_id": event.id,
+        "statut": STATUT_CONFIRMEE if position < granted else STATUT_LISTE_ATTENTE
+    } for position, (_, user) in enumerate(pending)])
+    if counters_enabled():
+        registrations_added(session.connection(), event.id, len(pending))
+
+    registrations = {row.user_id: row for row in session.execute(
+        select(Registration.id, Registration.user_id, Registration.statut, Registration.created_at).where(
+            Registration.event_id == event.id,
+            Registration.user_id.in_([user.id for _, user in pending])
+        )
+    )}
+    for index, user in pending:
+        registration = registrations[user.id]
+        if registration.statut == STATUT_CONFIRMEE:
+            # Emails mis en file avec le lot, envoyés par le worker après le commit
+            subject, body = confirmation_email(user, event, registration)
+            enqueue_email(subject, [user.email], body, session=session)
+        results[index] = {
+            "index": index,
+            "status": 201 if registration.statut == STATUT_CONFIRMEE else 202,
+            "registration_id": registration.id,
+            "user_id": user.id,
+            "statut": registration.statut
+        }
+    return len(pending)
+
+
+def bulk_register(session, event, rows, waitlist=False, chunk_size=500):
+    """Inscrit en masse à ``event``, une transaction par lot de ``chunk_size``.
+
+    Retourne ``(created, results)`` avec un résultat par ligne d'entrée.
+    """
+    users, errors = resolve_bulk_users(session, rows)
+    results = [errors.get(index) for index in range(len(rows))]
+    created = 0
+    for start in range(0, len(users), chunk_size):
+        chunk = users[start:start + chunk_size]
+        for attempt in (1, 2):
+            try:
+                count = _insert_registration_chunk(session, event, chunk, waitlist, results)
+                session.commit()
+                created += count
+                break
+            except IntegrityError:
+                # Inscription concurrente d'un membre du lot : nouvelle tentative sans lui
+                session.rollback()
+                if attempt == 2:
+                    for index, _ in chunk:
+                        results[index] = {"index": index, "status": 409, "message": "Conflit d'inscription, réessayez."}
+            except Exception as e:
+                session.rollback()
+                logger.error("Erreur inscription en masse (lot de %s): %s", len(chunk), e, exc_info=True)
+                for index, _ in chunk:
+                    results[index] = {"index": index, "status": 500, "message": "Erreur lors de l'enregistrement du lot."}
+                break
+    return created, results
+
+
+def unregister(session, registration):
+    """Supprime une inscription et libère sa place si elle était confirmée."""
+    session.delete(registration)
+    session.flush()
+    if registration.statut == STATUT_CONFIRMEE:
+        return release_seat(session, registration.event_id)
+    return None
+
+
+def parse_sort(value, allowed):
+    """Convertit ``?sort=-event_date`` en clauses ORDER BY (id en départage)."""
+    if not value:
+        return [Registration.id]
+    descending = value.startswith('-')
+    column = allowed.get(value.lstrip('-'))
+    if column is None:
+        raise ValueError(f"Tri invalide. Valeurs possibles : {', '.join(allowed)}")
+    if descending:
+        return [column.desc(), Registration.id.desc()]
+    return [column.asc(), Registration.id.asc()]
+
+
+def paginate_rows(session, stmt, args):
+    """Pagine ``stmt`` si ``page`` ou ``per_page`` est fourni, sinon retourne tout.
+
+    Retourne ``(rows, pagination)`` avec ``pagination`` à None sans pagination.
+    """
+    if 'page' not in args and 'per_page' not in args:
+        return session.execute(stmt).all(), None
+
+    try:
+        page = max(1, int(args.get('page', 1)))
+        per_page = max(1, min(int(args.get('per_page', 20)), MAX_PER_PAGE))
+    except ValueError:
+        raise ValueError("Les paramètres 'page' et 'per_page' doivent être des entiers.")
+
+    total = session.execute(
+        select(func.count()).select_from(stmt.order_by(None).subquery())
+    ).scalar()
+    rows = session.execute(stmt.limit(per_page).offset((page - 1) * per_page)).all()
+    return rows, {"page": page, "per_page": per_page, "total": total}
+
+
+def confirmation_email(user, event, registration):
+    event_date = event.date.strftime('%d/%m/%Y à %H:%M') if event.date else 'Date non spécifiée'
+    created_at = registration.created_at.strftime('%d/%m/%Y à %H:%M')
+
+    body = (
+        f"Bonjour {user.nom},\n\n"
+        f"Confirmation de votre inscription à l'événement :\n"
+        f"• Événement: {event.titre}\n"
+        f"• Date: {event_date}\n"
+        f"• Lieu: {event.lieu}\n"
+        f"• ID Inscription: {registration.id}\n"
+        f"• Date d'inscription: {created_at}\n\n"
+        f"Merci pour votre participation !\n\n"
+        f"Cordialement,\n"
+        f"L'équipe des événements"
+    )
+    return f"Confirmation d'inscription - {event.titre}", body
+
+
+def notify_promotion(session, registration_id, event):
+    """Prévient l'inscrit passé de la liste d'attente à une place confirmée."""
+    if registration_id is None:
+        return
+    registration = session.get(Registration, registration_id)
+    session.refresh(registration)
+    _, body = confirmation_email(registration.user, event, registration)
+    enqueue_email(f"Place disponible - {event.titre}", [registration.user.email], body, session=session)
+
+
+def stream_export_rows(session, filters, yield_per=1000):
+    """Une seule requête jointe, lue par lots côté serveur (stream_results)."""
+    stmt = (
+        select(
+            Registration.id, Event.id, Event.titre, Event.date, Event.lieu,
+            User.id, User.nom, User.email, Registration.created_at
+        )
+        .join(Event, Registration.event_id == Event.id)
+        .join(User, Registration.user_id == User.id)
+        .where(*filters)
+        .order_by(Registration.id)
+        .execution_options(yield_per=yield_per)
+    )
+    return session.execute(stmt)
+
+
+def iter_csv(rows, compress=False, chunk_rows=500):
+    """Génère le CSV par morceaux de ``chunk_rows`` lignes, éventuellement gzippés."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def flush():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    try:
+        writer.writerow(EXPORT_HEADER)
+        for count, (reg_id, event_id, titre, date, lieu, user_id, nom, email, created_at) in enumerate(rows, 1):
+            writer.writerow([
+                reg_id,
+                event_id,
+                titre,
+                date.strftime('%Y-%m-%d %H:%M') if date else '',
+                lieu,
+                user_id,
+                nom,
+                email,
+                created_at.strftime('%Y-%m-%d %H:%M') if created_at else ''
+            ])
+            if count % chunk_rows == 0:
+                chunk = flush()
+                if chunk:
+                    yield chunk
+
+        chunk = flush()
+        if compressor:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
+    except Exception as e:
+        logger.error("Erreur export CSV: %s", e, exc_info=True)
+        raise
+    finally:
+        rows.close()
@@ -2,6 +2,11 @@ from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from .models import User
 
+def event_services():
+    # Import différé : le module des événements importe déjà celui des utilisateurs
+    from app.modules.event import services
+    return services
+
 def get_all_users():
     return User.query.all()
 
@@ -39,12 +44,21 @@ def update_user(user_id, **kwargs):
         return None
 
     allowed_fields = {'nom', 'email', 'telephone', 'role'}
+    # Nom et email de l'organisateur figurent dans les listes et les fiches des événements
+    organizer_changed = any(
+        key in kwargs and kwargs[key] is not None and kwargs[key] != getattr(user, key)
+        for key in ('nom', 'email')
+    )
     for key, value in kwargs.items():
         if key in allowed_fields and value is not None:
             setattr(user, key, value)
 
+    events = event_services()
+    event_ids = events.public_event_ids(organisateur_id=user.id) if organizer_changed else None
     try:
         db.session.commit()
+        if event_ids is not None:
+            events.invalidate_event_lists(event_ids)
         return user
     except IntegrityError:
         db.session.rollback()
@@ -54,9 +68,12 @@ def delete_user(user_id):
     user = get_user_by_id(user_id)
     if not user:
         return False
+    events = event_services()
+    event_ids = events.public_event_ids(organisateur_id=user.id)
     try:
         db.session.delete(user)
         db.session.commit()
+        events.invalidate_event_lists(event_ids)
         return True
     except Exception:
         db.session.rollback()
@@ -2,14 +2,7 @@ from functools import wraps
 from flask import jsonify
 from flask_jwt_extended import get_jwt, get_jwt_identity
 from app.modules.user.models import User
-
-jwt_blocklist = set()
-
-def revoke_token(jti):
-    jwt_blocklist.add(jti)
-
-def is_token_revoked(jti):
-    return jti in jwt_blocklist
+from app.modules.auth.utils import revoke_token, is_token_revoked
 
 def role_required(required_roles):
     def wrapper(fn):
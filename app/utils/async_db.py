@@ -0,0 +1,60 @@
+from sqlalchemy.engine import make_url
+
+from app.utils.db_pool import build_engine_options, instrument_engine
+
+try:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+except ImportError:  # greenlet absent : pas de moteur asynchrone
+    create_async_engine = None
+
+# Pilote asynchrone utilisé à la place du pilote synchrone de DATABASE_URI
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'mysql': 'asyncmy',
+    'mariadb': 'asyncmy',
+    'postgresql': 'asyncpg',
+}
+
+
+def async_database_uri(uri):
+    """``mysql+pymysql://...`` -> ``mysql+asyncmy://...`` (même base, pilote asynchrone)."""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Pas de pilote asynchrone connu pour {backend} (voir requirements-asgi.txt)")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def async_engine_options(config, url):
+    """Réglages DB_* du pool synchrone, transposés au pool asynchrone."""
+    options = build_engine_options(config, url.render_as_string(hide_password=False))
+    # TimedQueuePool est un pool synchrone : SQLAlchemy choisit AsyncAdaptedQueuePool
+    options.pop('poolclass', None)
+    connect_args = options.pop('connect_args', None)
+    if connect_args:
+        backend = url.get_backend_name()
+        if backend == 'postgresql':
+            # asyncpg ne comprend pas « options » : paramètre de session équivalent
+            timeout_ms = int(config.get('DB_STATEMENT_TIMEOUT_MS') or 0)
+            options['connect_args'] = {"server_settings": {"statement_timeout": str(timeout_ms)}}
+        else:
+            options['connect_args'] = connect_args
+    return options
+
+
+def init_async_db(app):
+    """Moteur et fabrique de sessions asynchrones sur la base primaire de ``app``.
+
+    Les modèles sont ceux de Flask-SQLAlchemy : seules la connexion et la
+    session changent. Le pool est instrumenté comme les pools synchrones
+    (nom « async » dans /health/db-pool et /metrics).
+    """
+    if create_async_engine is None:
+        raise RuntimeError("SQLAlchemy asyncio indisponible : installer greenlet")
+    url = async_database_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+    engine = create_async_engine(url, **async_engine_options(app.config, url))
+    app.extensions.setdefault('db_pool_metrics', {})['async'] = instrument_engine(engine.sync_engine, 'async')
+    # Pas d'expiration au commit : un attribut rechargé hors greenlet lèverait MissingGreenlet
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    app.extensions['async_db'] = sessions
+    return engine, sessions
@@ -0,0 +1,53 @@
+import csv
+from io import StringIO
+
+
+class BulkInputError(ValueError):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def read_bulk_rows(request, key, max_rows):
+    """Lignes d'une requête d'import : JSON (liste ou ``{key: [...]}``) ou CSV.
+
+    Le CSV est accepté en corps ``text/csv`` ou en fichier multipart ``file``
+    (première ligne = noms de colonnes). Retourne ``(rows, payload)`` où
+    ``payload`` est l'objet JSON d'origine (None pour un CSV), pour les
+    paramètres communs à toutes les lignes.
+    """
+    upload = request.files.get('file')
+    if upload is not None or request.mimetype in ('text/csv', 'application/csv'):
+        raw = upload.read() if upload is not None else request.get_data()
+        try:
+            text = raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise BulkInputError("Le fichier CSV doit être encodé en UTF-8.")
+        sample = text[:4096]
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        rows = [
+            {name.strip(): (value.strip() if isinstance(value, str) else value)
+             for name, value in row.items() if name}
+            for row in csv.DictReader(StringIO(text), dialect=dialect)
+        ]
+        payload = None
+    else:
+        payload = request.get_json(silent=True)
+        rows = payload.get(key) if isinstance(payload, dict) else payload
+        if not isinstance(rows, list):
+            raise BulkInputError(f"Corps attendu : une liste JSON, un objet {{'{key}': [...]}} ou un fichier CSV.")
+
+    if not rows:
+        raise BulkInputError("Aucune ligne à importer.")
+    if len(rows) > max_rows:
+        raise BulkInputError(f"Trop de lignes : {len(rows)} (maximum {max_rows} par requête).", 413)
+    return rows, payload
+
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
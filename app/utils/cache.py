@@ -0,0 +1,249 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, has_app_context, make_response
+
+from app.utils.conditional import make_etag, request_signature
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Cache en mémoire du processus, éviction LRU et expiration TTL."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        # Compteurs de génération : hors LRU, une éviction ferait ressurgir des entrées périmées
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires_at = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+
+class RedisBackend:
+    """Même interface que MemoryBackend, partagée entre workers via Redis."""
+
+    def __init__(self, url):
+        import redis  # dépendance optionnelle
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, timeout=None):
+        self._client.set(key, value, ex=timeout or None)
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*keys)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def clear(self):
+        self._client.flushdb()
+
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, timeout=None):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def incr(self, key):
+        return 0
+
+    def clear(self):
+        pass
+
+
+class ResponseCache:
+    """Cache de réponses JSON en lecture directe, invalidé par espace de noms.
+
+    Chaque espace de noms porte un numéro de génération inclus dans les clés :
+    l'invalider revient à incrémenter ce numéro, les anciennes entrées n'étant
+    plus jamais lues puis évincées par LRU/TTL. Avec des réplicas, les réponses
+    recalculées moins de REPLICA_STICKY_SECONDS après une invalidation sont lues
+    sur le primaire.
+    """
+
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self.default_timeout = 60
+        self.key_prefix = 'cache:'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('CACHE_BACKEND', 'memory')
+        self.default_timeout = app.config.get('CACHE_DEFAULT_TIMEOUT', 60)
+        self.key_prefix = app.config.get('CACHE_KEY_PREFIX', 'cache:')
+
+        if backend == 'redis':
+            self.backend = self._redis_backend(app)
+        elif backend == 'memory':
+            self.backend = MemoryBackend(app.config.get('CACHE_MAX_ENTRIES', 1024))
+        else:
+            self.backend = NullBackend()
+
+        if isinstance(self.backend, MemoryBackend) and app.config.get('WEB_CONCURRENCY', 1) > 1:
+            logger.warning(
+                "Cache en mémoire avec %s workers : les invalidations ne sont pas partagées, "
+                "utiliser CACHE_BACKEND=redis", app.config['WEB_CONCURRENCY']
+            )
+
+        app.extensions['response_cache'] = self
+
+    def _redis_backend(self, app):
+        # Sans URL ou sans le paquet redis, l'application démarre avec le cache en mémoire
+        url = app.config.get('CACHE_REDIS_URL')
+        if not url:
+            logger.warning("CACHE_REDIS_URL non défini : repli sur le cache en mémoire")
+        else:
+            try:
+                return RedisBackend(url)
+            except ImportError:
+                logger.warning("Paquet redis absent : repli sur le cache en mémoire")
+        return MemoryBackend(app.config.get('CACHE_MAX_ENTRIES', 1024))
+
+    def _generation_key(self, namespace):
+        return f"{self.key_prefix}gen:{namespace}"
+
+    def _fresh_key(self, namespace):
+        return f"{self.key_prefix}fresh:{namespace}"
+
+    def _replica_router(self):
+        router = current_app.extensions.get('replica_router') if has_app_context() else None
+        return router if router is not None and router.bind_keys else None
+
+    def _generation(self, namespace):
+        value = self.backend.get(self._generation_key(namespace))
+        return int(value) if value else 0
+
+    def generation(self, namespace):
+        """Génération courante de ``namespace`` (validateur sans requête), None sans cache."""
+        if isinstance(self.backend, NullBackend):
+            return None
+        try:
+            return self._generation(namespace)
+        except Exception as e:
+            logger.warning("Cache indisponible: %s", e)
+            return None
+
+    def validator(self, namespace, signature, *extra):
+        """ETag dérivé de la génération de ``namespace`` (aucune requête), None sans cache.
+
+        La fenêtre de ``default_timeout`` secondes renouvelle l'ETag des
+        représentations qui évoluent avec le temps (statut des événements).
+        """
+        generation = self.generation(namespace)
+        if generation is None:
+            return None
+        window = int(time.time() // max(self.default_timeout, 1))
+        return make_etag(generation, window, signature, *extra)
+
+    def key_for(self, namespace, signature):
+        # Les URLs d'images sont absolues : l'hôte fait partie de la signature
+        digest = hashlib.sha1(signature.encode('utf-8')).hexdigest()
+        return f"{self.key_prefix}{namespace}:{self._generation(namespace)}:{digest}"
+
+    def make_key(self, namespace):
+        return self.key_for(namespace, request_signature())
+
+    def invalidate(self, *namespaces):
+        router = self._replica_router()
+        try:
+            for namespace in namespaces:
+                self.backend.incr(self._generation_key(namespace))
+                if router is not None:
+                    # Les réplicas peuvent servir l'état antérieur pendant REPLICA_STICKY_SECONDS
+                    self.backend.set(self._fresh_key(namespace), 1, router.sticky_seconds)
+        except Exception as e:
+            logger.warning("Invalidation du cache impossible: %s", e)
+
+    def recently_invalidated(self, namespace):
+        """Vrai si ``namespace`` a été invalidé depuis moins de REPLICA_STICKY_SECONDS."""
+        if self._replica_router() is None:
+            return False
+        return self.backend.get(self._fresh_key(namespace)) is not None
+
+    def cached(self, namespace, timeout=None):
+        """Décorateur de vue ; ``namespace`` peut être une fonction des kwargs de la vue."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if isinstance(self.backend, NullBackend):
+                    return view(*args, **kwargs)
+
+                ns = namespace(**kwargs) if callable(namespace) else namespace
+                try:
+                    key = self.make_key(ns)
+                    body = self.backend.get(key)
+                    fresh = body is None and self.recently_invalidated(ns)
+                except Exception as e:
+                    logger.warning("Cache indisponible: %s", e)
+                    return view(*args, **kwargs)
+
+                if body is not None:
+                    response = current_app.response_class(body, mimetype='application/json')
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                if fresh:
+                    # Ne pas mettre en cache une lecture d'un réplica en retard sur l'écriture
+                    from app.utils.db_routing import use_primary  # import circulaire
+                    use_primary()
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200:
+                    try:
+                        self.backend.set(key, response.get_data(), timeout or self.default_timeout)
+                    except Exception as e:
+                        logger.warning("Écriture cache impossible: %s", e)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
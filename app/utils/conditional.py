@@ -0,0 +1,70 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+
+def make_etag(*parts):
+    raw = '|'.join('' if p is None else str(p) for p in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def signature(host, path, args):
+    # Les arguments et l'hôte (URLs d'images absolues) font partie de la représentation
+    query = '&'.join(f"{k}={v}" for k, v in sorted(args))
+    return f"{host}{path}?{query}"
+
+
+def request_signature():
+    return signature(request.host, request.path, request.args.items(multi=True))
+
+
+def _to_http_datetime(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def is_not_modified(etag, last_modified=None):
+    # If-None-Match est prioritaire sur If-Modified-Since (RFC 9110)
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional(validators):
+    """Décorateur de vue GET gérant ETag / Last-Modified et les réponses 304.
+
+    ``validators`` reçoit les kwargs de la vue et retourne ``(etag, last_modified)``,
+    ou ``None`` pour laisser la vue répondre normalement (404, paramètres invalides).
+    La vue n'est pas appelée quand le client possède déjà la représentation.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            result = validators(**kwargs)
+            if result is None:
+                return view(*args, **kwargs)
+
+            etag, last_modified = result
+            last_modified = _to_http_datetime(last_modified)
+
+            if is_not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,164 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Compteurs d'un pool de connexions, propres au processus."""
+
+    def __init__(self, name):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.held_total = 0.0
+        self.held_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_held(self, seconds):
+        with self._lock:
+            self.held_total += seconds
+            self.held_max = max(self.held_max, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            stats = {
+                "name": self.name,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "held_avg_ms": round(self.held_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "held_max_ms": round(self.held_max * 1000, 3),
+            }
+        if isinstance(self.pool, QueuePool):
+            stats.update(
+                size=self.pool.size(),
+                checked_in=self.pool.checkedin(),
+                checked_out=self.pool.checkedout(),
+                overflow=self.pool.overflow()
+            )
+        return stats
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool mesurant le temps d'attente d'une connexion (pool saturé)."""
+
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def build_engine_options(config, uri=None):
+    """SQLALCHEMY_ENGINE_OPTIONS à partir des réglages DB_* de la configuration."""
+    url = make_url(uri or config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}
+
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": config.get('DB_POOL_SIZE', 5),
+        "max_overflow": config.get('DB_MAX_OVERFLOW', 10),
+        "pool_timeout": config.get('DB_POOL_TIMEOUT', 30),
+        "pool_recycle": config.get('DB_POOL_RECYCLE', 1800),
+        "pool_pre_ping": config.get('DB_POOL_PRE_PING', True),
+    }
+
+    timeout_ms = int(config.get('DB_STATEMENT_TIMEOUT_MS') or 0)
+    if timeout_ms:
+        if backend == 'mysql':
+            # SELECT uniquement (MySQL >= 5.7.8)
+            options["connect_args"] = {"init_command": f"SET SESSION max_execution_time={timeout_ms}"}
+        elif backend == 'mariadb':
+            options["connect_args"] = {"init_command": f"SET SESSION max_statement_time={timeout_ms / 1000}"}
+        elif backend == 'postgresql':
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+        elif backend == 'sqlite':
+            # Pas de délai par requête sous SQLite : attente maximale sur un verrou
+            options["connect_args"] = {"timeout": timeout_ms / 1000}
+    return options
+
+
+def instrument_engine(engine, name):
+    metrics = PoolMetrics(name)
+    metrics.pool = engine.pool
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.metrics = metrics
+
+    @event.listens_for(engine, 'connect')
+    def _connect(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.connects += 1
+
+    @event.listens_for(engine, 'checkout')
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        with metrics._lock:
+            metrics.checkouts += 1
+
+    @event.listens_for(engine, 'checkin')
+    def _checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop('checked_out_at', None)
+        if started is not None:
+            metrics.record_held(time.perf_counter() - started)
+
+    @event.listens_for(engine, 'invalidate')
+    def _invalidate(dbapi_connection, connection_record, exception):
+        with metrics._lock:
+            metrics.invalidations += 1
+
+    @event.listens_for(engine, 'engine_disposed')
+    def _disposed(engine):
+        metrics.pool = engine.pool
+
+    return metrics
+
+
+def init_pool_metrics(app, db):
+    """Instrumente les pools de tous les moteurs de ``db`` pour cette application."""
+    with app.app_context():
+        registry = {
+            name or 'default': instrument_engine(engine, name or 'default')
+            for name, engine in db.engines.items()
+        }
+    app.extensions['db_pool_metrics'] = registry
+    return registry
+
+
+def pool_stats(app):
+    return [metrics.snapshot() for metrics in app.extensions.get('db_pool_metrics', {}).values()]
@@ -0,0 +1,137 @@
+import itertools
+import logging
+import threading
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from app.utils.cache import MemoryBackend, NullBackend
+from app.utils.db_pool import build_engine_options
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRouter:
+    """Répartit les lectures des requêtes GET entre les réplicas (tourniquet).
+
+    Les écritures, les SELECT ... FOR UPDATE et tout ce qui suit une écriture
+    dans la même requête restent sur le primaire. Après un commit, le client
+    (utilisateur JWT et adresse IP) lit sur le primaire pendant
+    REPLICA_STICKY_SECONDS : il relit ainsi ses propres écritures malgré le
+    retard de réplication. Le marquage passe par le backend du cache de
+    réponses (Redis pour le partager entre processus).
+    """
+
+    def __init__(self, app):
+        uris = [uri.strip() for uri in (app.config.get('DATABASE_REPLICA_URIS') or '').split(',') if uri.strip()]
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        self.bind_keys = []
+        for index, uri in enumerate(uris):
+            key = f"replica_{index}"
+            binds[key] = {"url": uri, **build_engine_options(app.config, uri)}
+            self.bind_keys.append(key)
+        self.sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', 5)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._local_backend = MemoryBackend()
+        app.extensions['replica_router'] = self
+        if self.bind_keys:
+            logger.info("%s réplica(s) en lecture configuré(s)", len(self.bind_keys))
+
+    def _next_key(self):
+        with self._lock:
+            return self.bind_keys[next(self._counter) % len(self.bind_keys)]
+
+    def _backend(self):
+        cache = current_app.extensions.get('response_cache')
+        if cache is None or isinstance(cache.backend, NullBackend):
+            return self._local_backend
+        return cache.backend
+
+    def _client_keys(self):
+        keys = []
+        try:
+            from flask_jwt_extended import get_jwt_identity
+            identity = get_jwt_identity()
+        except Exception:
+            identity = None
+        if identity is not None:
+            keys.append(f"user:{identity}")
+        keys.append(f"ip:{request.remote_addr}")
+        return keys
+
+    def mark_written(self):
+        try:
+            backend = self._backend()
+            for key in self._client_keys():
+                backend.set(f"db:sticky:{key}", 1, self.sticky_seconds)
+        except Exception as e:
+            logger.warning("Marquage lecture-après-écriture impossible: %s", e)
+
+    def is_sticky(self):
+        key = self._client_keys()[0]
+        cached = g.get('_db_sticky')
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        try:
+            sticky = self._backend().get(f"db:sticky:{key}") is not None
+        except Exception as e:
+            logger.warning("Lecture du marquage impossible, lecture sur le primaire: %s", e)
+            sticky = True
+        g._db_sticky = (key, sticky)
+        return sticky
+
+    def route(self, session, mapper, clause):
+        """Moteur réplica pour ``clause``, ou None pour le primaire."""
+        info = session.info
+        is_read = (
+            clause is not None
+            and getattr(clause, 'is_select', False)
+            and getattr(clause, '_for_update_arg', None) is None
+        )
+        if not is_read:
+            # Écriture (flush, DML) ou connexion explicite : le reste de la requête sur le primaire
+            info['use_primary'] = True
+            if mapper is not None or clause is not None:
+                info['wrote'] = True
+            return None
+
+        if info.get('use_primary') or request.method not in READ_METHODS or g.get('db_use_primary'):
+            return None
+        if self.is_sticky():
+            info['use_primary'] = True
+            return None
+
+        key = info.get('replica_bind')
+        if key is None:
+            key = info['replica_bind'] = self._next_key()
+        return session._db.engines[key]
+
+
+class RoutingSession(Session):
+    """Session Flask-SQLAlchemy consultant le ReplicaRouter de l'application."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            router = current_app.extensions.get('replica_router')
+            if router is not None and router.bind_keys:
+                engine = router.route(self, mapper, clause)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    if session.info.pop('wrote', False) and has_request_context():
+        router = current_app.extensions.get('replica_router')
+        if router is not None and router.bind_keys:
+            router.mark_written()
+
+
+def use_primary():
+    """Force le primaire pour le reste de la requête (lecture qui doit être fraîche)."""
+    g.db_use_primary = True
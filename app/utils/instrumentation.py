@@ -0,0 +1,175 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request, request_finished, request_started
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('app.slow_queries')
+
+
+class RequestStats:
+    """Mesures d'une requête échantillonnée."""
+
+    __slots__ = ('start', 'queries', 'db_time', 'timings', 'statements')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.timings = {}
+        self.statements = {}
+
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def most_repeated(self):
+        if not self.statements:
+            return None, 0
+        statement = max(self.statements, key=self.statements.get)
+        return statement, self.statements[statement]
+
+
+def current_stats():
+    return g.get('_perf') if has_request_context() else None
+
+
+@contextmanager
+def timed(name):
+    """Ajoute la durée du bloc à la mesure ``name`` de la requête (si échantillonnée)."""
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add(name, time.perf_counter() - start)
+
+
+def route_name():
+    rule = request.url_rule
+    return rule.rule if rule is not None else request.path
+
+
+class Instrumentation:
+    """Nombre de requêtes SQL, temps base / sérialisation / total par requête HTTP.
+
+    Une fraction PERF_SAMPLE_RATE des requêtes est mesurée : en-tête
+    Server-Timing, ligne de log ``app.utils.instrumentation`` et alerte si une
+    même instruction est répétée (N+1). Indépendamment de l'échantillonnage,
+    toute requête SQL plus lente que SLOW_QUERY_MS est journalisée dans
+    ``app.slow_queries`` avec son SQL paramétré et la route.
+    """
+
+    def __init__(self, app=None):
+        self.sample_rate = 0.0
+        self.slow_query = 0.0
+        self.slow_request = 0.0
+        self.n_plus_one = 10
+        self.server_timing = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('PERF_INSTRUMENTATION', True):
+            return
+        self.sample_rate = float(app.config.get('PERF_SAMPLE_RATE', 1.0))
+        self.slow_query = app.config.get('SLOW_QUERY_MS', 200) / 1000
+        self.slow_request = app.config.get('SLOW_REQUEST_MS', 1000) / 1000
+        self.n_plus_one = app.config.get('PERF_N_PLUS_ONE_THRESHOLD', 10)
+        self.server_timing = app.config.get('PERF_SERVER_TIMING', True)
+        app.extensions['instrumentation'] = self
+
+        # Écouteurs au niveau de la classe Engine : primaire et réplicas
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+        request_started.connect(self._request_started, app)
+        request_finished.connect(self._request_finished, app)
+
+    def _request_started(self, sender, **extra):
+        if self.sample_rate >= 1 or (self.sample_rate > 0 and random.random() < self.sample_rate):
+            g._perf = RequestStats()
+
+    def _request_finished(self, sender, response, **extra):
+        stats = g.get('_perf')
+        if stats is None:
+            return
+        route, method, status = route_name(), request.method, response.status_code
+        if self.server_timing:
+            total = time.perf_counter() - stats.start
+            metrics = [f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} SQL"']
+            metrics += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in stats.timings.items()]
+            metrics.append(f'total;dur={total * 1000:.1f}')
+            response.headers['Server-Timing'] = ', '.join(metrics)
+
+        if response.is_streamed:
+            # Corps en flux (export CSV) : bilan à la fermeture, requêtes du flux comprises
+            response.call_on_close(lambda: self._log(stats, route, method, status))
+        else:
+            self._log(stats, route, method, status)
+
+    def _log(self, stats, route, method, status):
+        total = time.perf_counter() - stats.start
+        level = logging.WARNING if self.slow_request and total >= self.slow_request else logging.INFO
+        statement, repeats = stats.most_repeated()
+        if not logger.isEnabledFor(level) and not (repeats >= self.n_plus_one and logger.isEnabledFor(logging.WARNING)):
+            return
+        perf = {
+            "route": route,
+            "method": method,
+            "status": status,
+            "queries": stats.queries,
+            "db_ms": round(stats.db_time * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+            **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in stats.timings.items()},
+        }
+        logger.log(level, "perf %s %s %s queries=%s db=%sms total=%sms",
+                   method, route, status, stats.queries, perf['db_ms'], perf['total_ms'], extra={"perf": perf})
+        if repeats >= self.n_plus_one:
+            logger.warning("N+1 probable sur %s %s : %s exécutions de « %s »", method, route, repeats, statement,
+                           extra={"perf": {**perf, "repeated_statement": statement, "repeats": repeats}})
+
+
+instrumentation = Instrumentation()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    stats = current_stats()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+    if instrumentation.slow_query and elapsed >= instrumentation.slow_query:
+        route = f"{request.method} {route_name()}" if has_request_context() else '-'
+        # SQL paramétré uniquement : les valeurs (emails, mots de passe) ne sont pas journalisées
+        slow_query_logger.warning(
+            "Requête lente (%.1f ms) sur %s : %s", elapsed * 1000, route, ' '.join(statement.split()),
+            extra={"perf": {"route": route, "duration_ms": round(elapsed * 1000, 2), "statement": statement,
+                            "executemany": executemany}}
+        )
+
+
+def _handle_error(exception_context):
+    # Requête en échec : pas d'after_cursor_execute, on retire son horodatage
+    connection = exception_context.connection
+    if connection is not None and exception_context.cursor is not None:
+        starts = connection.info.get('_query_start')
+        if starts:
+            starts.pop()
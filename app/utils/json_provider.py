@@ -0,0 +1,30 @@
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils.instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Encodeur JSON basé sur orjson, avec repli sur les conversions de Flask."""
+
+    option = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        with timed('json'):
+            body = orjson.dumps(obj, default=self.default, option=self.option)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,146 @@
+import atexit
+import json
+import logging
+import queue
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Identifiant fourni par le proxy accepté tel quel s'il est raisonnable
+VALID_REQUEST_ID = re.compile(r'[A-Za-z0-9._:-]{1,128}')
+
+# Attributs standard d'un LogRecord : tout le reste vient de ``extra``
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id'}
+
+TEXT_FORMAT = '%(asctime)s [%(levelname)s] %(name)s [%(request_id)s]: %(message)s'
+
+# Bibliothèques bavardes, indépendamment de LOG_LEVEL
+LIBRARY_LEVELS = {'sqlalchemy.engine': 'WARNING', 'werkzeug': 'INFO', 'urllib3': 'WARNING'}
+
+
+class RequestIdFilter(logging.Filter):
+    """Ajoute ``request_id`` à chaque enregistrement, dans le thread émetteur."""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = g.get('request_id', '-') if has_request_context() else '-'
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement ; les champs ``extra`` sont repris tels quels."""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, 'request_id', '-'),
+            "pid": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler qui laisse le formatage au thread d'écriture.
+
+    Seuls le message (``%`` appliqué une fois) et la trace d'exception sont
+    figés avant la mise en file ; les champs ``extra`` restent disponibles
+    pour le formateur JSON.
+    """
+
+    def prepare(self, record):
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LoggingSetup:
+    def __init__(self):
+        self.listener = None
+        self.handlers = []
+
+    def configure(self, app):
+        """Configure la journalisation racine à partir de LOG_LEVEL / LOG_FORMAT / LOG_ASYNC."""
+        self.shutdown()
+        root = logging.getLogger()
+        level = logging.getLevelName(str(app.config.get('LOG_LEVEL', 'INFO')).upper())
+
+        output = logging.StreamHandler(sys.stderr)
+        if app.config.get('LOG_FORMAT', 'text') == 'json':
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        if app.config.get('LOG_ASYNC', True):
+            # Les requêtes ne font qu'empiler ; un thread dédié écrit sur stderr
+            log_queue = queue.SimpleQueue()
+            handler = DeferredQueueHandler(log_queue)
+            self.listener = QueueListener(log_queue, output, respect_handler_level=True)
+            self.listener.start()
+        else:
+            handler = output
+        handler.addFilter(RequestIdFilter())
+
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level)
+        self.handlers = [handler]
+
+        for name, library_level in app.config.get('LOG_LIBRARY_LEVELS', LIBRARY_LEVELS).items():
+            logging.getLogger(name).setLevel(library_level)
+
+        app.before_request(assign_request_id)
+        app.after_request(expose_request_id)
+
+    def shutdown(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        root = logging.getLogger()
+        for handler in self.handlers:
+            root.removeHandler(handler)
+        self.handlers = []
+
+
+def assign_request_id():
+    incoming = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = incoming if VALID_REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+
+
+def expose_request_id(response):
+    request_id = g.get('request_id')
+    if request_id:
+        response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
+
+logging_setup = LoggingSetup()
+# Vide la file avant l'arrêt du processus
+atexit.register(logging_setup.shutdown)
+
+
+def configure_logging(app):
+    logging_setup.configure(app)
+    return logging_setup
@@ -0,0 +1,137 @@
+import logging
+import os
+import time
+
+from flask import g, jsonify, request, request_finished, request_started
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # prometheus_client est optionnel : /metrics répond 501
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+def multiprocess_dir():
+    return os.getenv('PROMETHEUS_MULTIPROC_DIR') or os.getenv('prometheus_multiproc_dir')
+
+
+class OutboxCollector:
+    """Profondeur de la file d'emails, lue en base au moment de la collecte."""
+
+    def collect(self):
+        from app.modules.outbox.services import outbox_depth
+
+        family = GaugeMetricFamily('email_outbox_pending', "Emails en attente d'envoi dans la file")
+        try:
+            family.add_metric([], outbox_depth())
+        except Exception as e:
+            logger.warning("Profondeur de la file d'emails indisponible: %s", e)
+            return []
+        return [family]
+
+
+class Metrics:
+    """Métriques Prometheus exposées sur /metrics.
+
+    Sous gunicorn, PROMETHEUS_MULTIPROC_DIR (vidé au démarrage, voir
+    gunicorn.conf.py) fait écrire chaque worker dans des fichiers mmap
+    agrégés à la collecte : le worker qui répond à /metrics renvoie les
+    totaux de tous les processus. Les jauges du pool de connexions sont
+    sommées sur les workers vivants (livesum).
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self._metrics = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['metrics'] = self
+        app.add_url_rule('/metrics', 'metrics', self.view)
+        self.enabled = prometheus_client is not None and app.config.get('METRICS_ENABLED', True)
+        if not self.enabled:
+            if prometheus_client is None:
+                logger.info("prometheus_client absent : /metrics désactivé")
+            return
+
+        if self._metrics is None:
+            # Créées une seule fois par processus (registre global de prometheus_client)
+            self._metrics = {
+                'latency': Histogram(
+                    'http_request_duration_seconds', "Durée des requêtes HTTP",
+                    ['method', 'blueprint', 'route'], buckets=LATENCY_BUCKETS
+                ),
+                'requests': Counter(
+                    'http_requests_total', "Requêtes HTTP par statut", ['method', 'route', 'status']
+                ),
+                'cache': Counter(
+                    'response_cache_requests_total', "Consultations du cache de réponses", ['route', 'result']
+                ),
+                'pool': {
+                    name: Gauge(
+                        f'db_pool_{name}', description, ['pool'], multiprocess_mode='livesum'
+                    )
+                    for name, description in (
+                        ('size', "Taille configurée du pool"),
+                        ('checked_out', "Connexions en cours d'utilisation"),
+                        ('checked_in', "Connexions libres dans le pool"),
+                        ('overflow', "Connexions au-delà de pool_size"),
+                        ('timeouts', "Attentes de connexion ayant expiré"),
+                    )
+                },
+            }
+        request_started.connect(self._request_started, app)
+        request_finished.connect(self._request_finished, app)
+
+    def _request_started(self, sender, **extra):
+        g._metrics_start = time.perf_counter()
+
+    def _request_finished(self, sender, response, **extra):
+        start = g.get('_metrics_start')
+        if start is None:
+            return
+        # Gabarit de route (et non le chemin) pour borner la cardinalité des labels
+        route = request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+        metrics = self._metrics
+        metrics['latency'].labels(request.method, request.blueprint or '', route).observe(time.perf_counter() - start)
+        metrics['requests'].labels(request.method, route, str(response.status_code)).inc()
+
+        cache_result = response.headers.get('X-Cache')
+        if cache_result:
+            metrics['cache'].labels(route, cache_result.lower()).inc()
+        self._update_pool_gauges(sender)
+
+    def _update_pool_gauges(self, app):
+        from app.utils.db_pool import pool_stats
+
+        gauges = self._metrics['pool']
+        for stats in pool_stats(app):
+            for name, gauge in gauges.items():
+                if name in stats:
+                    gauge.labels(stats['name']).set(stats[name])
+
+    def registry(self):
+        registry = CollectorRegistry()
+        path = multiprocess_dir()
+        if path:
+            multiprocess.MultiProcessCollector(registry, path=path)
+        else:
+            registry.register(prometheus_client.REGISTRY)
+        registry.register(OutboxCollector())
+        return registry
+
+    def view(self):
+        if not self.enabled:
+            return jsonify({"message": "Métriques indisponibles : installer prometheus_client."}), 501
+        body = prometheus_client.generate_latest(self.registry())
+        return body, 200, {'Content-Type': prometheus_client.CONTENT_TYPE_LATEST}
+
+
+metrics = Metrics()
@@ -10,21 +10,26 @@ ROLES_MAPPING = {
     "visitor": ["visitor", "visiteur"]
 }
 
+def has_role(user_role, allowed_roles):
+    """Vérifie si le rôle est dans les rôles autorisés (alias de ROLES_MAPPING compris)."""
+    for role_group in allowed_roles:
+        if role_group in ROLES_MAPPING:
+            if user_role in ROLES_MAPPING[role_group]:
+                return True
+        elif user_role == role_group:
+            return True
+    return False
+
 def role_required(allowed_roles):
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
             claims = get_jwt()
             user_role = claims.get("role")
-            
-            # Vérifie si le rôle est dans les rôles autorisés
-            for role_group in allowed_roles:
-                if role_group in ROLES_MAPPING:
-                    if user_role in ROLES_MAPPING[role_group]:
-                        return fn(*args, **kwargs)
-                elif user_role == role_group:
-                    return fn(*args, **kwargs)
-            
+
+            if has_role(user_role, allowed_roles):
+                return fn(*args, **kwargs)
+
             return jsonify({
                 "message": "Accès refusé : rôle insuffisant.",
                 "required_roles": allowed_roles,
@@ -0,0 +1,12 @@
+import os
+
+# Même configuration par défaut que gunicorn.conf.py : production
+os.environ.setdefault('APP_ENV', 'production')
+# uvicorn n'a pas de processus maître où lancer `flask outbox worker` : worker
+# d'envoi intégré à chaque processus (réclamations sans double envoi)
+os.environ.setdefault('OUTBOX_WORKER_ENABLED', 'True')
+
+from app.asgi import create_asgi_app  # noqa: E402
+
+# Mode ASGI (voir app/asgi.py) : uvicorn asgi:app --workers 4
+app = create_asgi_app()
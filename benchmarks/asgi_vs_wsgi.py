@@ -0,0 +1,212 @@
+"""Comparaison WSGI (gunicorn, threads) / ASGI (uvicorn, vues asynchrones).
+
+Remplit une base dédiée (voir seed.py), démarre successivement les deux
+serveurs sur cette base avec le même nombre de processus, puis maintient
+N requêtes simultanées pendant --duration secondes pour chaque niveau de
+--concurrency :
+
+    python benchmarks/asgi_vs_wsgi.py --workers 2 --threads 8 --concurrency 10,100,500
+    python benchmarks/asgi_vs_wsgi.py --database-uri mysql+pymysql://.../bench --json asgi.json
+
+Scénarios : listing public paginé par curseur (GET /api/events/public) et
+inscription avec liste d'attente (POST /api/registrations, 201/202/409
+attendus). Nécessite gunicorn, uvicorn, starlette, httpx et le pilote
+asynchrone de la base (aiosqlite, asyncmy). Latences en millisecondes et
+débit (requêtes/s) par mode, scénario et concurrence ; --compare/--threshold
+comme micro.py.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from results import ROOT, environment_info, report_comparison, summarize, write_results  # noqa: E402
+from seed import ORGANIZER_EVERY, add_arguments, make_app, reset_and_seed  # noqa: E402
+
+SCENARIOS = ('public', 'register')
+EXPECTED_STATUS = {'public': {200}, 'register': {201, 202, 409}}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser, events=5000, registrations=10000, users=2000)
+    parser.add_argument('--workers', type=int, default=2, help="Processus par serveur")
+    parser.add_argument('--threads', type=int, default=8, help="Threads par worker gunicorn (mode WSGI)")
+    parser.add_argument('--concurrency', default='10,100,500', help="Requêtes simultanées, séparées par des virgules")
+    parser.add_argument('--duration', type=float, default=10, help="Durée de chaque mesure (s)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--only', help="Modes et/ou scénarios à exécuter (wsgi, asgi, public, register)")
+    parser.add_argument('--json', dest='json_path', help="Écrit les résultats dans ce fichier")
+    parser.add_argument('--compare', help="Résultats de référence à comparer")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Hausse tolérée de la médiane (0.15 = 15 %%)")
+    return parser.parse_args()
+
+
+def server_command(mode, args):
+    bind = f"127.0.0.1:{args.port}"
+    if mode == 'wsgi':
+        return [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--threads', str(args.threads),
+                '--bind', bind, '--log-level', 'warning', 'run:app']
+    return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--workers', str(args.workers),
+            '--host', '127.0.0.1', '--port', str(args.port), '--log-level', 'warning', '--no-access-log']
+
+
+def server_env(database_uri):
+    env = dict(os.environ)
+    env.update({
+        'APP_ENV': 'production',
+        'DATABASE_URI': database_uri,
+        'LOG_LEVEL': 'WARNING',
+        'PERF_INSTRUMENTATION': 'False',
+        'METRICS_ENABLED': 'False',
+        'CACHE_BACKEND': 'null',
+        'OUTBOX_WORKER_ENABLED': 'False',
+        'OUTBOX_WORKER_PROCESS': 'False',
+    })
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    return env
+
+
+async def wait_until_ready(client, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get('/health/live')).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Le serveur n'a pas démarré")
+
+
+def build_requests(app, args):
+    """Générateurs de requêtes par scénario : ``() -> (méthode, url, kwargs)``."""
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import select
+
+    from app.extensions import db
+    from app.modules.event.models import Event
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        event_ids = db.session.execute(
+            select(Event.id).where(Event.type == 'public', Event.est_valide == True).limit(500)  # noqa: E712
+        ).scalars().all()
+        users = [i for i in range(2, args.users + 1) if i % ORGANIZER_EVERY][:500]
+        tokens = [
+            {'Authorization': f"Bearer {create_access_token(identity=str(i), additional_claims={'role': 'user'})}"}
+            for i in users
+        ]
+
+    def public():
+        return 'GET', '/api/events/public?limit=20&with_total=0', {}
+
+    def register():
+        body = {'event_id': rng.choice(event_ids), 'waitlist': True}
+        return 'POST', '/api/registrations', {'json': body, 'headers': rng.choice(tokens)}
+
+    return {'public': public, 'register': register}
+
+
+async def run_load(client, make_request, scenario, concurrency, duration):
+    durations, statuses = [], Counter()
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            method, url, kwargs = make_request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                statuses[response.status_code] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+                continue
+            durations.append(time.perf_counter() - start)
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.monotonic() - start
+
+    stats = summarize(durations) if durations else {"runs": 0}
+    stats["throughput_rps"] = round(len(durations) / elapsed, 1)
+    stats["errors"] = sum(n for status, n in statuses.items() if status not in EXPECTED_STATUS[scenario])
+    stats["statuses"] = {str(status): n for status, n in statuses.items()}
+    return stats
+
+
+async def bench_mode(mode, args, database_uri, requests, scenarios, levels):
+    import httpx
+
+    server = subprocess.Popen(server_command(mode, args), cwd=ROOT, env=server_env(database_uri))
+    results = {}
+    try:
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await wait_until_ready(client)
+            for scenario in scenarios:
+                for level in levels:
+                    # Échauffement court : connexions du pool et caches du serveur
+                    await run_load(client, requests[scenario], scenario, min(level, 10), 1)
+                    name = f"{mode}.{scenario}.c{level}"
+                    results[name] = stats = await run_load(client, requests[scenario], scenario, level, args.duration)
+                    print(f"{name:<28} médiane {stats.get('median_ms', 0):>9.2f} ms   "
+                          f"p95 {stats.get('p95_ms', 0):>9.2f} ms   {stats['throughput_rps']:>8.1f} req/s   "
+                          f"erreurs {stats['errors']}")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return results
+
+
+def main():
+    args = parse_args()
+    only = set(args.only.split(',')) if args.only else set()
+    modes = [m for m in ('wsgi', 'asgi') if not only & {'wsgi', 'asgi'} or m in only]
+    scenarios = [s for s in SCENARIOS if not only & set(SCENARIOS) or s in only]
+    levels = [int(level) for level in args.concurrency.split(',')]
+
+    # Secrets communs au processus de remplissage (jetons) et aux serveurs
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret')
+    os.environ.setdefault('JWT_SECRET_KEY', 'benchmark-jwt-secret-0123456789abcdef')
+    app = make_app(args.database_uri)
+    database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+
+    print(f"Remplissage : {args.users} utilisateurs, {args.events} événements, {args.registrations} inscriptions...")
+    print(f"  terminé en {reset_and_seed(app, args):.1f}s")
+
+    from app.extensions import db
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    requests = build_requests(app, args)
+
+    results = {}
+    for mode in modes:
+        results.update(asyncio.run(bench_mode(mode, args, database_uri, requests, scenarios, levels)))
+
+    payload = {
+        "meta": environment_info(dialect),
+        "params": {
+            "users": args.users, "events": args.events, "registrations": args.registrations,
+            "workers": args.workers, "threads": args.threads, "concurrency": levels,
+            "duration": args.duration, "seed": args.seed
+        },
+        "results": results
+    }
+    if args.json_path:
+        write_results(args.json_path, payload)
+    if args.compare and report_comparison(payload, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
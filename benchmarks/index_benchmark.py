@@ -0,0 +1,163 @@
+"""Mesure l'effet des index composites (migration 0003) sur les requêtes chaudes.
+
+Remplit une base dédiée avec un jeu de données volumineux, puis exécute
+chaque requête sans les index composites (« avant ») et avec (« après ») :
+plan d'exécution (EXPLAIN) et temps médian.
+
+    python benchmarks/index_benchmark.py --events 200000 --registrations 500000
+    python benchmarks/index_benchmark.py --database-uri mysql+pymysql://.../bench --json resultats.json
+
+Sans --database-uri, une base SQLite temporaire est utilisée. La base ciblée
+est vidée : ne jamais pointer vers une base de production.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from results import environment_info, write_results  # noqa: E402
+from seed import add_arguments, make_app, seed  # noqa: E402
+
+BENCH_INDEXES = (
+    'ix_events_public_listing',
+    'ix_events_organisateur_date',
+    'ix_events_categorie_date',
+    'ix_events_date',
+    'ix_registrations_event_statut_created',
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=20, help="Exécutions par requête")
+    parser.add_argument('--json', dest='json_path', help="Écrit aussi les résultats dans ce fichier")
+    return parser.parse_args()
+
+
+def hot_queries(args):
+    """Formes de requêtes réellement émises par les services."""
+    from sqlalchemy import func, select
+
+    from app.modules.event.models import Event
+    from app.modules.registration.models import Registration
+
+    public = (Event.type == 'public', Event.est_valide == True)
+    middle = datetime.utcnow()
+    event_id = args.events // 2
+    return {
+        'liste publique (1re page)': select(Event.id).where(*public)
+            .order_by(Event.date.desc(), Event.id.desc()).limit(20),
+        'liste publique (curseur)': select(Event.id).where(*public)
+            .where((Event.date < middle) | ((Event.date == middle) & (Event.id < event_id)))
+            .order_by(Event.date.desc(), Event.id.desc()).limit(20),
+        'validateurs ETag publics': select(func.count(Event.id), func.sum(Event.date > middle)).where(*public),
+        'événements d\'un organisateur': select(Event.id).where(Event.organisateur_id == 25)
+            .order_by(Event.date.desc(), Event.id.desc()).limit(20),
+        'événements d\'une catégorie': select(Event.id).where(Event.categorie_id == 1)
+            .order_by(Event.date.desc(), Event.id.desc()).limit(20),
+        'liste admin (toutes dates)': select(Event.id)
+            .order_by(Event.date.desc(), Event.id.desc()).limit(20),
+        'inscrits d\'un événement': select(Registration.id).where(Registration.event_id == event_id)
+            .order_by(Registration.created_at, Registration.id),
+        'promotion liste d\'attente': select(Registration.id)
+            .where(Registration.event_id == event_id, Registration.statut == 'liste_attente')
+            .order_by(Registration.created_at, Registration.id).limit(5),
+        'inscriptions d\'un utilisateur': select(Registration.id).where(Registration.user_id == 10),
+    }
+
+
+def explain(connection, stmt):
+    dialect = connection.dialect
+    compiled = stmt.compile(dialect=dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = connection.exec_driver_sql(prefix + str(compiled), params).all()
+    if dialect.name == 'sqlite':
+        return [row[-1] for row in rows]
+    return [' | '.join(str(value) for value in row) for row in rows]
+
+
+def timed(connection, stmt, repeat):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(stmt).all()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def analyze(connection):
+    if connection.dialect.name in ('mysql', 'mariadb'):
+        connection.exec_driver_sql('ANALYZE TABLE events, registrations')
+    else:
+        connection.exec_driver_sql('ANALYZE')
+
+
+def measure(connection, queries, repeat):
+    return {
+        name: {"plan": explain(connection, stmt), "median_ms": round(timed(connection, stmt, repeat), 3)}
+        for name, stmt in queries.items()
+    }
+
+
+def main():
+    args = parse_args()
+    app = make_app(args.database_uri)
+
+    from app.extensions import db
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        indexes = [index for table in db.metadata.sorted_tables for index in table.indexes
+                   if index.name in BENCH_INDEXES]
+
+        with db.engine.begin() as connection:
+            print(f"Remplissage : {args.events} événements, {args.registrations} inscriptions...")
+            start = time.perf_counter()
+            seed(connection, args)
+            print(f"  terminé en {time.perf_counter() - start:.1f}s")
+
+        queries = hot_queries(args)
+        dialect = db.engine.dialect.name
+        with db.engine.connect() as connection:
+            for index in indexes:
+                index.drop(bind=connection)
+            analyze(connection)
+            connection.commit()
+            before = measure(connection, queries, args.repeat)
+
+            for index in indexes:
+                index.create(bind=connection)
+            analyze(connection)
+            connection.commit()
+            after = measure(connection, queries, args.repeat)
+
+    results = []
+    for name in queries:
+        speedup = before[name]["median_ms"] / after[name]["median_ms"] if after[name]["median_ms"] else None
+        results.append({"query": name, "before": before[name], "after": after[name],
+                        "speedup": round(speedup, 1) if speedup else None})
+        print(f"\n== {name}")
+        print(f"  avant : {before[name]['median_ms']:>9.3f} ms  {' / '.join(before[name]['plan'])}")
+        print(f"  après : {after[name]['median_ms']:>9.3f} ms  {' / '.join(after[name]['plan'])}")
+        if speedup:
+            print(f"  gain  : x{speedup:.1f}")
+
+    if args.json_path:
+        write_results(args.json_path, {
+            "meta": environment_info(dialect),
+            "params": {"events": args.events, "registrations": args.registrations, "repeat": args.repeat},
+            "results": results
+        })
+
+
+if __name__ == '__main__':
+    main()
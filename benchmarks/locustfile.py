@@ -0,0 +1,110 @@
+"""Profil de charge Locust : listing public, inscription et connexion.
+
+Nécessite ``pip install locust`` et une API servant une base remplie par
+seed.py (mêmes --users / --events que ci-dessous) :
+
+    python benchmarks/seed.py --database-uri mysql+pymysql://.../bench --users 5000 --events 100000
+    BENCH_USERS=5000 BENCH_EVENTS=100000 locust -f benchmarks/locustfile.py \\
+        --host http://localhost:5000 --headless -u 200 -r 20 -t 5m --csv resultats/charge --json > resultats/charge.json
+
+Répartition : 70 % de visiteurs anonymes (listing paginé, détail, recherche,
+proximité), 25 % d'utilisateurs connectés qui s'inscrivent puis se
+désinscrivent, 5 % de connexions seules (coût du hachage scrypt).
+Les fichiers --csv (stats, percentiles, échecs) et --json sont les
+résultats exploitables d'une version à l'autre.
+"""
+import os
+import random
+
+from locust import HttpUser, between, task
+
+from seed import BENCH_PASSWORD, ORGANIZER_EVERY, bench_email
+
+USERS = int(os.getenv('BENCH_USERS', 5000))
+EVENTS = int(os.getenv('BENCH_EVENTS', 100000))
+SEARCH_TERMS = ('concert', 'atelier musique', 'festival cuisine', 'conferense', 'football douala')
+CITIES = ((3.848, 11.502), (4.051, 9.768), (5.478, 10.418))
+
+
+def random_user_id():
+    while True:
+        user_id = random.randint(2, USERS)
+        if user_id % ORGANIZER_EVERY:
+            return user_id
+
+
+class PublicVisitor(HttpUser):
+    weight = 14
+    wait_time = between(0.5, 2)
+
+    @task(6)
+    def browse_listing(self):
+        response = self.client.get('/api/events/public?limit=20', name='/api/events/public')
+        # Deux pages suivantes par curseur, comme un défilement infini
+        for _ in range(2):
+            cursor = response.json().get('next_cursor') if response.ok else None
+            if not cursor:
+                break
+            response = self.client.get(f'/api/events/public?limit=20&cursor={cursor}', name='/api/events/public?cursor')
+
+    @task(3)
+    def event_detail(self):
+        with self.client.get(f'/api/events/public/{random.randint(1, EVENTS)}',
+                             name='/api/events/public/[id]', catch_response=True) as response:
+            # Événement privé ou non validé : 404 attendu
+            if response.status_code == 404:
+                response.success()
+
+    @task(2)
+    def search(self):
+        self.client.get('/api/events/public/search', params={"q": random.choice(SEARCH_TERMS)},
+                        name='/api/events/public/search')
+
+    @task(1)
+    def nearby(self):
+        lat, lng = random.choice(CITIES)
+        self.client.get('/api/events/public/nearby', params={"lat": lat, "lng": lng, "radius_km": 10},
+                        name='/api/events/public/nearby')
+
+
+class RegisteringUser(HttpUser):
+    weight = 5
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        response = self.client.post('/api/auth/login', name='/api/auth/login', json={
+            "email": bench_email(random_user_id()), "password": BENCH_PASSWORD
+        })
+        token = response.json().get('access_token') if response.ok else None
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    @task(3)
+    def register_and_unregister(self):
+        event_id = random.randint(1, EVENTS)
+        with self.client.post('/api/registrations', json={"event_id": event_id, "waitlist": True},
+                              headers=self.headers, name='/api/registrations', catch_response=True) as response:
+            # Déjà inscrit ou événement absent : réponses normales du flux
+            if response.status_code in (404, 409):
+                response.success()
+                return
+        self.client.delete(f'/api/registrations/event/{event_id}', headers=self.headers,
+                           name='/api/registrations/event/[id]')
+
+    @task(1)
+    def my_registrations(self):
+        self.client.get('/api/registrations', headers=self.headers, name='/api/registrations (liste)')
+
+    @task(1)
+    def my_dashboard(self):
+        self.client.get('/api/dashboard/user', headers=self.headers, name='/api/dashboard/user')
+
+
+class LoginOnly(HttpUser):
+    weight = 1
+    wait_time = between(1, 5)
+
+    @task
+    def login(self):
+        self.client.post('/api/auth/login', name='/api/auth/login', json={
+            "email": bench_email(random_user_id()), "password": BENCH_PASSWORD
+        })
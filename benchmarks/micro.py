@@ -0,0 +1,195 @@
+"""Microbenchmarks des chemins chauds de l'API, via le client de test Flask.
+
+Remplit une base dédiée (voir seed.py), puis mesure chaque cas plusieurs
+fois après un échauffement : sérialiseurs d'événements, listings publics,
+recherche, proximité, tableaux de bord, connexion et inscription.
+
+    python benchmarks/micro.py --json resultats.json
+    python benchmarks/micro.py --json nouveau.json --compare resultats.json --threshold 0.2
+    python benchmarks/micro.py --only public,dashboard --repeat 100
+
+Les résultats JSON (médiane, p95, débit par cas et environnement) servent de
+référence entre deux versions : avec --compare, le code de sortie vaut 1 si
+un cas a ralenti au-delà du seuil. Le cache de réponses est désactivé par
+défaut pour mesurer le chemin base de données (--cache memory pour l'inverse).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from results import environment_info, report_comparison, summarize, write_results  # noqa: E402
+from seed import BENCH_PASSWORD, add_arguments, bench_email, make_app, reset_and_seed  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser, events=20000, registrations=60000, users=2000)
+    parser.add_argument('--repeat', type=int, default=50, help="Mesures par cas")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--cache', default='none', help="CACHE_BACKEND pendant les mesures (none, memory, redis)")
+    parser.add_argument('--only', help="Groupes à exécuter, séparés par des virgules")
+    parser.add_argument('--json', dest='json_path', help="Écrit les résultats dans ce fichier")
+    parser.add_argument('--compare', help="Résultats de référence à comparer")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Hausse tolérée de la médiane (0.15 = 15 %%)")
+    return parser.parse_args()
+
+
+class Context:
+    """Données partagées par les cas : client, jetons et identifiants de référence."""
+
+    def __init__(self, app, args):
+        from flask_jwt_extended import create_access_token
+        from sqlalchemy import select
+
+        from app.extensions import db
+        from app.modules.event.models import Event
+        from app.modules.user.models import User
+
+        self.app = app
+        self.client = app.test_client()
+        with app.app_context():
+            admin, organizer, user = (db.session.get(User, user_id) for user_id in (1, 25, 2))
+            self.tokens = {
+                u.role: {'Authorization': f"Bearer {create_access_token(identity=str(u.id), additional_claims={'role': u.role})}"}
+                for u in (admin, organizer, user)
+            }
+            self.user_email = user.email
+            self.public_event_id = db.session.execute(
+                select(Event.id).where(Event.type == 'public', Event.est_valide == True, Event.capacity.is_(None))
+                .order_by(Event.id).limit(1)
+            ).scalar()
+            self.events = db.session.execute(
+                select(Event).options(*self.loader_options()).order_by(Event.date.desc(), Event.id.desc()).limit(100)
+            ).unique().scalars().all()
+            db.session.expunge_all()
+        first_page = self.client.get('/api/events/public?limit=20').get_json()
+        self.cursor = first_page.get('next_cursor')
+
+    @staticmethod
+    def loader_options():
+        from app.modules.event.serializers import EVENT_FIELDS, loader_options
+        return loader_options(EVENT_FIELDS)
+
+    def get(self, url, role=None):
+        return self.client.get(url, headers=self.tokens.get(role, {}))
+
+
+def expect(response, *statuses):
+    if response.status_code not in statuses:
+        raise RuntimeError(f"Statut inattendu {response.status_code} : {response.get_data(as_text=True)[:200]}")
+
+
+def serializer_cases(ctx):
+    from app.modules.event.serializers import serialize_events
+
+    def full():
+        with ctx.app.test_request_context():
+            serialize_events(ctx.events)
+
+    def light():
+        with ctx.app.test_request_context():
+            serialize_events(ctx.events, ('id', 'titre', 'date', 'lieu'))
+
+    return {
+        'serializer: 100 événements, tous les champs': full,
+        'serializer: 100 événements, 4 champs': light,
+    }
+
+
+def public_cases(ctx):
+    def get(url):
+        return lambda: expect(ctx.get(url), 200)
+
+    return {
+        'public: liste page 1 (limit=20)': get('/api/events/public?limit=20'),
+        'public: liste page 2 (curseur)': get(f'/api/events/public?limit=20&cursor={ctx.cursor}'),
+        'public: liste limit=100': get('/api/events/public?limit=100'),
+        'public: liste avec total': get('/api/events/public?limit=20&with_total=true'),
+        'public: détail': get(f'/api/events/public/{ctx.public_event_id}'),
+        'public: recherche': get('/api/events/public/search?q=concert+musique'),
+        'public: recherche avec faute': get('/api/events/public/search?q=conferense'),
+        'public: proximité 10 km': get('/api/events/public/nearby?lat=3.848&lng=11.502&radius_km=10'),
+    }
+
+
+def dashboard_cases(ctx):
+    return {
+        'dashboard: global (admin)': lambda: expect(ctx.get('/api/dashboard/global', 'admin'), 200),
+        'dashboard: organisateur': lambda: expect(ctx.get('/api/dashboard/organizer', 'organizer'), 200),
+        'dashboard: utilisateur': lambda: expect(ctx.get('/api/dashboard/user', 'user'), 200),
+    }
+
+
+def flow_cases(ctx):
+    def login():
+        expect(ctx.client.post('/api/auth/login', json={"email": ctx.user_email, "password": BENCH_PASSWORD}), 200)
+
+    def register_cycle():
+        headers = ctx.tokens['user']
+        expect(ctx.client.post('/api/registrations', json={"event_id": ctx.public_event_id}, headers=headers), 201, 409)
+        expect(ctx.client.delete(f'/api/registrations/event/{ctx.public_event_id}', headers=headers), 200)
+
+    return {
+        'flux: connexion (scrypt)': login,
+        'flux: inscription + désinscription': register_cycle,
+        'flux: mes inscriptions': lambda: expect(ctx.get('/api/registrations', 'user'), 200),
+    }
+
+
+GROUPS = {
+    'serializer': serializer_cases,
+    'public': public_cases,
+    'dashboard': dashboard_cases,
+    'flow': flow_cases,
+}
+
+
+def run_case(fn, repeat, warmup):
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+
+def main():
+    args = parse_args()
+    app = make_app(args.database_uri, cache_backend=args.cache)
+
+    print(f"Remplissage : {args.users} utilisateurs, {args.events} événements, {args.registrations} inscriptions...")
+    print(f"  terminé en {reset_and_seed(app, args):.1f}s")
+
+    from app.extensions import db
+    with app.app_context():
+        dialect = db.engine.dialect.name
+
+    ctx = Context(app, args)
+    groups = args.only.split(',') if args.only else list(GROUPS)
+    results = {}
+    for group in groups:
+        for name, fn in GROUPS[group](ctx).items():
+            results[name] = stats = run_case(fn, args.repeat, args.warmup)
+            print(f"{name:<45} médiane {stats['median_ms']:>9.3f} ms   p95 {stats['p95_ms']:>9.3f} ms")
+
+    payload = {
+        "meta": environment_info(dialect),
+        "params": {
+            "users": args.users, "events": args.events, "registrations": args.registrations,
+            "repeat": args.repeat, "warmup": args.warmup, "cache": args.cache, "seed": args.seed
+        },
+        "results": results
+    }
+    if args.json_path:
+        write_results(args.json_path, payload)
+    if args.compare and report_comparison(payload, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Résultats de benchmark au format JSON et comparaison entre deux exécutions."""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from importlib.metadata import version
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info(dialect=None):
+    return {
+        "date": datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "flask": version('flask'),
+        "sqlalchemy": version('sqlalchemy'),
+        "database": dialect,
+    }
+
+
+def summarize(durations):
+    """Statistiques (millisecondes) d'une série de durées en secondes."""
+    values = sorted(d * 1000 for d in durations)
+    p95 = values[min(len(values) - 1, round(0.95 * (len(values) - 1)))]
+    median = statistics.median(values)
+    return {
+        "runs": len(values),
+        "median_ms": round(median, 3),
+        "mean_ms": round(statistics.fmean(values), 3),
+        "p95_ms": round(p95, 3),
+        "min_ms": round(values[0], 3),
+        "ops_per_s": round(1000 / median, 1) if median else None,
+    }
+
+
+def write_results(path, payload):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(current, baseline, threshold=0.15, metric='median_ms'):
+    """Lignes de comparaison et nombre de régressions (hausse > ``threshold``)."""
+    lines, regressions = [], 0
+    previous = baseline.get('results', {})
+    for name, stats in current.get('results', {}).items():
+        old = previous.get(name, {}).get(metric)
+        new = stats.get(metric)
+        if not old or new is None:
+            lines.append(f"  {name:<40} {new:>10} ms  (nouveau)")
+            continue
+        change = new / old - 1
+        flag = ''
+        if change > threshold:
+            flag = '  RÉGRESSION'
+            regressions += 1
+        elif change < -threshold:
+            flag = '  amélioration'
+        lines.append(f"  {name:<40} {old:>10.3f} -> {new:>10.3f} ms  {change:+.1%}{flag}")
+    return lines, regressions
+
+
+def report_comparison(current, baseline_path, threshold):
+    baseline = load_results(baseline_path)
+    lines, regressions = compare_results(current, baseline, threshold)
+    print(f"\nComparaison avec {baseline_path} ({baseline.get('meta', {}).get('git') or '?'}) :")
+    print('\n'.join(lines))
+    if regressions:
+        print(f"{regressions} régression(s) au-delà de {threshold:.0%}", file=sys.stderr)
+    return regressions
@@ -0,0 +1,168 @@
+"""Jeu de données reproductible pour les benchmarks et les tests de charge.
+
+    python benchmarks/seed.py --database-uri mysql+pymysql://.../bench --users 5000 --events 100000
+
+Les tables sont recréées puis remplies par insertions en masse (aucun hook
+ORM). Tous les comptes partagent le mot de passe BENCH_PASSWORD :
+``user<i>@bench.local`` ; l'utilisateur 1 est admin, un sur 25 organisateur.
+La base ciblée est vidée : ne jamais pointer vers une base de production.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_PASSWORD = 'benchmark'
+BENCH_DOMAIN = 'bench.local'
+ORGANIZER_EVERY = 25
+CITIES = (
+    ('Yaoundé', 3.848, 11.502),
+    ('Douala', 4.051, 9.768),
+    ('Bafoussam', 5.478, 10.418),
+    ('Garoua', 9.301, 13.398),
+    ('Kribi', 2.939, 9.910),
+)
+WORDS = (
+    'concert', 'atelier', 'conférence', 'festival', 'marché', 'tournoi', 'salon',
+    'formation', 'exposition', 'rencontre', 'musique', 'cuisine', 'danse', 'théâtre',
+    'numérique', 'football', 'littérature', 'cinéma', 'santé', 'entrepreneuriat',
+)
+
+
+def bench_email(user_id):
+    return f"user{user_id}@{BENCH_DOMAIN}"
+
+
+def add_arguments(parser, events=100000, registrations=300000, users=5000, categories=20):
+    parser.add_argument('--database-uri', help="Base dédiée au benchmark (SQLite temporaire par défaut)")
+    parser.add_argument('--events', type=int, default=events)
+    parser.add_argument('--registrations', type=int, default=registrations)
+    parser.add_argument('--users', type=int, default=users)
+    parser.add_argument('--categories', type=int, default=categories)
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def make_app(database_uri, cache_backend=None):
+    """Application configurée sur la base de benchmark, logs applicatifs coupés."""
+    os.environ['DATABASE_URI'] = database_uri or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    if cache_backend is not None:
+        os.environ['CACHE_BACKEND'] = cache_backend
+    # Pas d'envoi d'emails pendant les mesures
+    os.environ.setdefault('OUTBOX_WORKER_ENABLED', 'False')
+
+    import logging
+    from app import create_app
+
+    app = create_app()
+    logging.disable(logging.INFO)
+    return app
+
+
+def seed(connection, args, chunk=10000):
+    from sqlalchemy import func, select, update
+    from werkzeug.security import generate_password_hash
+
+    from app.modules.category.models import Category
+    from app.modules.event.geo import encode_geohash
+    from app.modules.event.models import Event
+    from app.modules.registration.models import Registration
+    from app.modules.user.models import User
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    # Un seul hachage scrypt pour tous les comptes : le remplissage reste rapide
+    password = generate_password_hash(BENCH_PASSWORD, method='scrypt')
+
+    def insert(table, rows):
+        for start in range(0, len(rows), chunk):
+            connection.execute(table.insert(), rows[start:start + chunk])
+
+    def role(user_id):
+        if user_id == 1:
+            return 'admin'
+        return 'organizer' if user_id % ORGANIZER_EVERY == 0 else 'user'
+
+    insert(User.__table__, [{
+        "id": i, "nom": f"Utilisateur {i}", "email": bench_email(i), "password": password,
+        "role": role(i), "is_active": True, "created_at": now
+    } for i in range(1, args.users + 1)])
+    insert(Category.__table__, [{
+        "id": i, "nom": f"Catégorie {i}", "created_at": now, "updated_at": now
+    } for i in range(1, args.categories + 1)])
+
+    organizers = [i for i in range(1, args.users + 1) if i % ORGANIZER_EVERY == 0] or [1]
+    events = []
+    for i in range(1, args.events + 1):
+        city, lat, lng = rng.choice(CITIES)
+        latitude, longitude = lat + rng.uniform(-0.2, 0.2), lng + rng.uniform(-0.2, 0.2)
+        words = rng.sample(WORDS, 3)
+        events.append({
+            "id": i,
+            "titre": f"{words[0].capitalize()} {words[1]} {i}",
+            "description": f"Un {words[0]} autour de {words[1]} et {words[2]} à {city}.",
+            "date": now + timedelta(minutes=rng.randint(-525600, 525600)),
+            "lieu": city,
+            "latitude": latitude,
+            "longitude": longitude,
+            "geohash": encode_geohash(latitude, longitude),
+            "type": 'public' if rng.random() < 0.7 else 'prive',
+            "est_valide": rng.random() < 0.8,
+            "capacity": rng.choice((None, None, 50, 200)),
+            "places_reservees": 0,
+            "categorie_id": rng.randint(1, args.categories),
+            "organisateur_id": rng.choice(organizers),
+            "created_at": now,
+            "updated_at": now
+        })
+    insert(Event.__table__, events)
+
+    pairs = set()
+    target = min(args.registrations, args.events * args.users)
+    while len(pairs) < target:
+        pairs.add((rng.randint(1, args.users), rng.randint(1, args.events)))
+    insert(Registration.__table__, [{
+        "user_id": user_id, "event_id": event_id,
+        "statut": 'liste_attente' if rng.random() < 0.1 else 'confirmee',
+        "created_at": now - timedelta(minutes=rng.randint(0, 100000))
+    } for user_id, event_id in sorted(pairs)])
+
+    # Compteur de places aligné sur les inscriptions confirmées (capacité ignorée)
+    confirmed = (
+        select(func.count(Registration.id))
+        .where(Registration.event_id == Event.id, Registration.statut == 'confirmee')
+        .scalar_subquery()
+    )
+    connection.execute(update(Event.__table__).values(places_reservees=confirmed))
+
+
+def reset_and_seed(app, args):
+    from app.extensions import db
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        with db.engine.begin() as connection:
+            start = time.perf_counter()
+            seed(connection, args)
+            elapsed = time.perf_counter() - start
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    app = make_app(args.database_uri)
+    print(f"Remplissage : {args.users} utilisateurs, {args.events} événements, {args.registrations} inscriptions...")
+    elapsed = reset_and_seed(app, args)
+    print(f"  terminé en {elapsed:.1f}s ({app.config['SQLALCHEMY_DATABASE_URI']})")
+
+
+if __name__ == '__main__':
+    main()
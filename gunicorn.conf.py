@@ -0,0 +1,64 @@
+"""Configuration gunicorn : gunicorn -c gunicorn.conf.py "run:app"
+
+APP_ENV vaut « production » par défaut (ProductionConfig, voir app/config.py).
+
+Les métriques Prometheus sont agrégées entre workers via des fichiers mmap
+dans PROMETHEUS_MULTIPROC_DIR : le dossier est vidé au démarrage du maître
+et les fichiers d'un worker arrêté sont retirés des jauges « livesum ».
+
+Le maître lance aussi le worker d'envoi des emails (`flask outbox worker`)
+dans un processus dédié, arrêté avec lui ; OUTBOX_WORKER_PROCESS=False le
+désactive (worker lancé à part, ou OUTBOX_WORKER_ENABLED dans chaque worker).
+"""
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import sys
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+os.environ.setdefault('APP_ENV', 'production')
+# Nombre de workers visible de l'application (cache en mémoire, voir app/config.py)
+os.environ['WEB_CONCURRENCY'] = str(workers)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join('/tmp', 'event-api-metrics'))
+
+
+outbox_process = None
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def when_ready(server):
+    global outbox_process
+    if os.getenv('OUTBOX_WORKER_PROCESS', 'True').lower() not in ['true', '1']:
+        return
+    outbox_process = subprocess.Popen([sys.executable, '-m', 'flask', '--app', 'run:app', 'outbox', 'worker'])
+    server.log.info("Worker d'envoi des emails démarré (pid %s)", outbox_process.pid)
+
+
+def on_exit(server):
+    if outbox_process is None or outbox_process.poll() is not None:
+        return
+    # SIGINT : arrêt propre (fin des envois en cours, connexions SMTP fermées)
+    outbox_process.send_signal(signal.SIGINT)
+    try:
+        outbox_process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        outbox_process.kill()
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,68 @@
+"""events_fts full-text index (SQLite FTS5)
+
+Revision ID: 0005_events_fts
+Revises: 0004_stored_images
+Create Date: 2026-10-18 05:40:12.418305
+
+"""
+import sqlite3
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_events_fts'
+down_revision = '0004_stored_images'
+branch_labels = None
+depends_on = None
+
+# Copie de app/modules/event/search.py (FTS_SCHEMA / FTS_DROP) à la date de la migration
+FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE events_fts USING fts5("
+    "titre, description, lieu, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE VIRTUAL TABLE events_fts_vocab USING fts5vocab(events_fts, row)",
+    "CREATE TRIGGER events_fts_ai AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_fts (rowid, titre, description, lieu) "
+    "VALUES (new.id, new.titre, coalesce(new.description, ''), new.lieu); END",
+    "CREATE TRIGGER events_fts_au AFTER UPDATE OF titre, description, lieu ON events BEGIN "
+    "DELETE FROM events_fts WHERE rowid = old.id; "
+    "INSERT INTO events_fts (rowid, titre, description, lieu) "
+    "VALUES (new.id, new.titre, coalesce(new.description, ''), new.lieu); END",
+    "CREATE TRIGGER events_fts_ad AFTER DELETE ON events BEGIN "
+    "DELETE FROM events_fts WHERE rowid = old.id; END",
+    "INSERT INTO events_fts (rowid, titre, description, lieu) "
+    "SELECT id, titre, coalesce(description, ''), lieu FROM events",
+)
+FTS_DROP = (
+    "DROP TRIGGER IF EXISTS events_fts_ad",
+    "DROP TRIGGER IF EXISTS events_fts_au",
+    "DROP TRIGGER IF EXISTS events_fts_ai",
+    "DROP TABLE IF EXISTS events_fts_vocab",
+    "DROP TABLE IF EXISTS events_fts",
+)
+
+
+def fts5_available():
+    try:
+        connection = sqlite3.connect(':memory:')
+        connection.execute("CREATE VIRTUAL TABLE probe USING fts5(content)")
+        connection.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def upgrade():
+    # MySQL : index FULLTEXT créé par 0002 ; autres bases : index en mémoire
+    if op.get_bind().dialect.name != 'sqlite' or not fts5_available():
+        return
+    # Table éventuellement créée à la volée par une version antérieure de la recherche
+    for statement in FTS_DROP + FTS_SCHEMA:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in FTS_DROP:
+        op.execute(statement)
@@ -1,9 +1,10 @@
-from app import create_app, db
-from flask_migrate import Migrate
+import os
 
+from app import create_app
+
+# APP_ENV=production pour la configuration de production (voir app/config.py)
 app = create_app()
-migrate = Migrate(app, db)
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)  # Change port if needed
-    # Note: In production, you would typically not run the app with debug=True
+    # Serveur de développement uniquement ; en production : gunicorn -c gunicorn.conf.py "run:app"
+    app.run(debug=app.config['DEBUG'], port=int(os.getenv('PORT', 5000)))